@@ -0,0 +1,101 @@
+import json
+import atexit
+import contextvars
+from contextlib import contextmanager
+
+import chains
+import risk_store
+from config import WALLET_ADDRESS, PRIVATE_KEY
+
+# Wallet accounts run by one process. Everything per-wallet (signing key,
+# nonce, risk state, SQLite DB, equity history) hangs off an Account; code
+# finds the account it is running for through a context variable, so the
+# same task functions serve every wallet while candles, indicators, prices
+# and RPC connections stay shared.
+#
+# Without ACCOUNTS_FILE there is exactly one account, DEFAULT, built from
+# WALLET_ADDRESS / PRIVATE_KEY and using the original file names. With it,
+# each entry of the JSON list
+#
+#   [{"name": "alpha", "wallet": "0x...", "private_key": "0x..."}, ...]
+#
+# gets its own namespaced files: trader-alpha.db, state-alpha.json,
+# portfolio_equity-alpha.bin (under chains/<name>/ off the default chain).
+
+ACCOUNTS_FILE = chains.env("ACCOUNTS_FILE")
+
+
+class Account:
+    def __init__(self, name, wallet, private_key, db_file=None, state_file=None, equity_file=None):
+        self.name = name
+        self.wallet = wallet
+        self.private_key = private_key
+        # None = the module defaults (state.DB_FILE, risk_store.STATE_FILE, ...)
+        self.db_file = db_file
+        self.state_file = state_file
+        self.equity_file = equity_file
+        self._store = None
+
+    @property
+    def store(self):
+        """This account's RiskStore (risk_store.store forwards here)."""
+        if self.state_file is None:
+            return risk_store.default_store
+        if self._store is None:
+            self._store = risk_store.RiskStore(self.state_file)
+            atexit.register(self._store.flush)
+        return self._store
+
+    def __repr__(self):
+        return f"Account({self.name}, {self.wallet})"
+
+
+DEFAULT = Account("main", WALLET_ADDRESS, PRIVATE_KEY)
+
+_current = contextvars.ContextVar("account", default=DEFAULT)
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def use(account):
+    token = _current.set(account)
+    try:
+        yield account
+    finally:
+        _current.reset(token)
+
+
+def bound(account, fn):
+    """Wraps fn so it always runs as `account` (scheduler lanes are plain threads)."""
+    def run(*args, **kwargs):
+        with use(account):
+            return fn(*args, **kwargs)
+    run.__name__ = getattr(fn, "__name__", "task")
+    return run
+
+
+def namespaced(account):
+    def path(stem, ext):
+        return chains.data_path(f"{stem}-{account['name']}{ext}")
+    return Account(
+        account["name"],
+        account["wallet"],
+        account["private_key"],
+        db_file=path("trader", ".db"),
+        state_file=path("state", ".json"),
+        equity_file=path("portfolio_equity", ".bin"),
+    )
+
+
+def load(path=ACCOUNTS_FILE):
+    if not path:
+        return [DEFAULT]
+    with open(path) as f:
+        entries = json.load(f)
+    names = [a["name"] for a in entries]
+    if len(set(names)) != len(names):
+        raise RuntimeError(f"Duplicate account names in {path}")
+    return [namespaced(a) for a in entries]
@@ -0,0 +1,318 @@
+import time
+import asyncio
+
+from web3 import Web3
+
+import bot
+import fills
+import metrics
+from bot import (
+    log_activity, rsi_hook, get_active_positions,
+    RUNTIME, TOKENS_TO_TRACK, PORTFOLIO_TRAILING_PCT, TRAILING_PAUSE,
+    EXIT_INTERVAL, TRAILING_INTERVAL, RISK_INTERVAL, SNAPSHOT_TASK_INTERVAL,
+    ENTRY_CANDLE_SECONDS, ENTRY_CANDLE_OFFSET, BALANCE_SYNC_INTERVAL, METRICS_INTERVAL,
+    WALLET_INDEX_INTERVAL, PAIR_INDEX_INTERVAL, CHAIN_STATUS_INTERVAL
+)
+from async_uniswap_v3 import AsyncUniswapV3Client
+from async_market import get_price, get_prices, load_many, close_session
+from price_feed import get_quotes_async
+from pair_scanner import get_safe_pairs
+from strategy import exit_levels
+from risk import can_trade
+from state import init_db, record_trade, set_meta, get_meta, set_balance
+from baseline import calculate_trade_size, get_or_init_baseline
+from portfolio import get_portfolio_value
+from token_list import TOKEN_BY_SYMBOL
+from uniswap_abi import ERC20_ABI
+from config import WALLET_ADDRESS, USDC, NATIVE
+
+# asyncio variant of bot.py: every RPC/HTTP wait in a cycle overlaps, so cycle
+# wall time tracks the slowest single call instead of the sum of all calls.
+# SQLite writes stay synchronous and run via asyncio.to_thread.
+
+client = None
+_sync_requested = asyncio.Event()
+_asset_locks = {}
+
+# ================= HELPERS =================
+
+async def sync_balances():
+    log_activity("🔄 Syncing wallet balances (async)...")
+    # Pinned to one block so the wallet indexer can continue right after it
+    head = await client.w3.eth.block_number
+
+    async def read_balance(symbol, token_addr, decimals):
+        if token_addr == NATIVE:
+            return await client.w3.eth.get_balance(WALLET_ADDRESS, block_identifier=head) / 1e18
+        erc20 = client.w3.eth.contract(address=Web3.to_checksum_address(token_addr), abi=ERC20_ABI)
+        return await erc20.functions.balanceOf(WALLET_ADDRESS).call(block_identifier=head) / (10 ** decimals)
+
+    symbols = [t[0] for t in TOKENS_TO_TRACK]
+    balances, prices = await asyncio.gather(
+        asyncio.gather(*(read_balance(*t) for t in TOKENS_TO_TRACK), return_exceptions=True),
+        get_prices(symbols)
+    )
+    rows = []
+    for symbol, bal in zip(symbols, balances):
+        if isinstance(bal, Exception):
+            log_activity(f"⚠️ Sync error {symbol}: {bal}")
+            continue
+        rows.append((symbol, bal, prices[symbol]))
+    if not await asyncio.to_thread(write_reconciled, rows, head):
+        _sync_requested.set()
+
+
+def write_reconciled(rows, head):
+    """
+    Absolute balances at `head` + the index cursor, never mid-range (see
+    bot.sync_balances); False if a newer fill made the snapshot stale.
+    """
+    with bot.indexer.lock:
+        if bot.indexer.stale(head):
+            log_activity(f"🔁 A fill confirmed after block {head}, balance snapshot dropped")
+            return False
+        for symbol, bal, price in rows:
+            set_balance(symbol, bal, price)
+        bot.indexer.reconciled(head)
+    return True
+
+
+def asset_lock(symbol):
+    """Twin of bot.asset_lock: exits, the trailing stop and entries never trade one asset at once."""
+    if symbol not in _asset_locks:
+        _asset_locks[symbol] = asyncio.Lock()
+    return _asset_locks[symbol]
+
+
+async def execute(symbol, side, amount):
+    """Sends one swap and waits for its receipt; returns (tx hash, receipt) on success."""
+    token = TOKEN_BY_SYMBOL[symbol]
+    if side == "SELL":
+        tx = await client.sell_for_usdc(token, amount)
+    else:
+        tx = await client.buy_with_usdc(token, amount)
+
+    log_activity(f"⏳ Waiting for receipt: {tx}")
+    receipt = await client.wait_for_receipt(tx)
+    if receipt.status != 1:
+        log_activity(f"❌ Transaction REVERTED on-chain: {tx}")
+        return None
+    log_activity(f"✅ Transaction confirmed successful: {tx}")
+    return tx, receipt
+
+
+async def record_fill(symbol, side, tx, receipt, estimate, strategy_tag=None):
+    """Async twin of bot.record_fill: exact fill from the receipt logs, else the estimate (returns None)."""
+    token = TOKEN_BY_SYMBOL[symbol]
+    token_in, token_out = (USDC, token) if side == "BUY" else (token, USDC)
+    try:
+        decimals_in, decimals_out = await asyncio.gather(
+            client.token_decimals(token_in), client.token_decimals(token_out)
+        )
+        fill = fills.decode_fill(receipt, token_in, token_out, decimals_in, decimals_out)
+    except Exception as e:
+        log_activity(f"⚠️ Fill decode failed {tx}: {e}")
+        fill = None
+
+    if fill is None:
+        await asyncio.to_thread(record_trade, f"{symbol}/USDC", side, *estimate, tx, strategy_tag=strategy_tag)
+        return None
+    await asyncio.to_thread(bot.apply_fill, fill, symbol, side, strategy_tag)
+    return fill
+
+
+async def sell_positions(positions, prices, label):
+    """Sells many positions concurrently; fills are recorded as they confirm."""
+    async def sell_one(pos):
+        symbol = pos['asset']
+        async with asset_lock(symbol):
+            # The other sell loop may have closed it while we waited
+            pos = await asyncio.to_thread(bot.get_position, symbol)
+            if not pos:
+                return True
+            try:
+                sent = await execute(symbol, "SELL", pos['amount'])
+                if sent:
+                    price = prices.get(symbol, 0.0)
+                    fill = await record_fill(symbol, "SELL", *sent, (0, pos['amount'] * price, price))
+                    return fill is not None
+            except Exception as e:
+                log_activity(f"⚠️ {label} failed {symbol}: {e}")
+        return False
+
+    # Exact fills already moved the balances; only a miss needs a resync
+    results = await asyncio.gather(*(sell_one(p) for p in positions))
+    if not all(results):
+        _sync_requested.set()
+    return all(results)
+
+# ================= TASKS =================
+
+async def task_exits():
+    positions = await asyncio.to_thread(get_active_positions)
+    if not positions:
+        return
+    quotes = await get_quotes_async(p['asset'] for p in positions)
+    prices = {s: q.price for s, q in quotes.items()}
+
+    to_sell = []
+    for pos in positions:
+        quote = quotes[pos['asset']]
+        entry_price = pos['price']
+        if not entry_price:
+            continue
+        cur_price = bot.exit_check_price(pos['asset'], quote, RUNTIME)
+        if cur_price is None:
+            continue
+
+        current_sl = exit_levels(entry_price)['sl']
+        if (cur_price - entry_price) / entry_price > 0.009:
+            current_sl = max(current_sl, entry_price * 1.001)
+
+        if cur_price <= current_sl:
+            to_sell.append(pos)
+
+    if to_sell:
+        await sell_positions(to_sell, prices, "Exit")
+
+
+async def task_trailing_stop():
+    portfolio_value = await asyncio.to_thread(get_portfolio_value)
+    ath = await asyncio.to_thread(get_meta, "portfolio_ath", 0)
+    if portfolio_value > ath:
+        await asyncio.to_thread(set_meta, "portfolio_ath", portfolio_value)
+        ath = portfolio_value
+
+    if not (ath > 0 and portfolio_value <= ath * (1 - PORTFOLIO_TRAILING_PCT)):
+        return
+
+    log_activity(f"🚨 PORTFOLIO TRAILING STOP HIT")
+    positions = await asyncio.to_thread(get_active_positions)
+    prices = await get_prices(p['asset'] for p in positions)
+    if not await sell_positions(positions, prices, "Emergency sell"):
+        await sync_balances()
+    await asyncio.to_thread(set_meta, "portfolio_ath", await asyncio.to_thread(get_portfolio_value))
+    RUNTIME["entries_paused_until"] = time.time() + TRAILING_PAUSE
+    log_activity(f"⏸️ Entries paused for {TRAILING_PAUSE}s. Exits remain active.")
+
+
+async def task_entries():
+    if RUNTIME["trading_halted"]:
+        log_activity("🚫 Skipping scan: Daily loss limit active.")
+        return
+    if time.time() < RUNTIME["entries_paused_until"]:
+        log_activity("⏸️ Skipping scan: portfolio trailing stop cooldown.")
+        return
+    if not can_trade():
+        return
+
+    log_activity("🔍 --- Starting New Entry Scan (async) ---")
+    active_assets = {ap['asset'] for ap in await asyncio.to_thread(get_active_positions)}
+
+    symbols = []
+    for p in get_safe_pairs() or []:
+        pair_symbols = [p["token0"]["symbol"], p["token1"]["symbol"]]
+        if "USDC" not in pair_symbols: continue
+        symbol = pair_symbols[0] if pair_symbols[1] == "USDC" else pair_symbols[1]
+        if symbol not in active_assets and symbol in TOKEN_BY_SYMBOL:
+            symbols.append(symbol)
+
+    frames = await load_many(symbols, "15m")
+
+    hooked = []
+    for symbol, df in frames.items():
+        if df is None or len(df) < 20: continue
+        is_hook, rsi_val = rsi_hook(df)
+        if is_hook:
+            log_activity(f"🎯 RSI Hook Detected for {symbol} at {rsi_val:.2f}")
+            hooked.append(symbol)
+        else:
+            log_activity(f"🔍 {symbol} | RSI: {rsi_val:.1f} (No Hook)")
+
+    if not hooked:
+        return
+
+    usdc_amount = await asyncio.to_thread(calculate_trade_size)
+    if usdc_amount < 1:
+        return
+
+    async def buy_one(symbol):
+        async with asset_lock(symbol):
+            if await asyncio.to_thread(bot.get_position, symbol):
+                return
+            try:
+                sent = await execute(symbol, "BUY", usdc_amount)
+                if sent:
+                    price = await get_price(symbol)
+                    fill = await record_fill(symbol, "BUY", *sent, (usdc_amount, 0, price),
+                                             strategy_tag="rsi_hook_scalp")
+                    if fill is None:
+                        _sync_requested.set()
+            except Exception as e:
+                log_activity(f"⚠️ Buy failed {symbol}: {e}")
+
+    await asyncio.gather(*(buy_one(s) for s in hooked))
+
+
+async def task_balance_sync():
+    try:
+        await asyncio.wait_for(_sync_requested.wait(), timeout=BALANCE_SYNC_INTERVAL)
+    except asyncio.TimeoutError:
+        pass
+    _sync_requested.clear()
+    await sync_balances()
+
+# ================= LOOP =================
+
+async def run_every(name, fn, interval=None, align=None, offset=0.0):
+    """Runs one task forever on its own cadence; failures never stop the other loops."""
+    while True:
+        start = time.time()
+        try:
+            await fn()
+        except Exception as e:
+            metrics.inc("task_failures", task=name)
+            log_activity(f"❌ Task {name} failed: {e}")
+
+        duration = time.time() - start
+        metrics.observe("task", duration, task=name)
+        if interval and duration > interval:
+            metrics.inc("cycle_overruns", task=name)
+
+        if align:
+            now = time.time()
+            await asyncio.sleep(((now - offset) // align + 1) * align + offset - now)
+        elif interval:
+            await asyncio.sleep(max(0.0, interval - (time.time() - start)))
+
+
+async def main():
+    global client
+    init_db()
+    bot.track_tradable()
+    client = AsyncUniswapV3Client()
+    log_activity("✅ Async bot started with Tiered Exit Strategy & RSI Hook Logic")
+
+    baseline = await asyncio.to_thread(get_or_init_baseline)
+    log_activity(f"📊 Portfolio baseline initialized at ${baseline:.2f}")
+    await sync_balances()
+
+    try:
+        await asyncio.gather(
+            run_every("exits", task_exits, interval=EXIT_INTERVAL),
+            run_every("trailing_stop", task_trailing_stop, interval=TRAILING_INTERVAL),
+            run_every("risk", lambda: asyncio.to_thread(bot.task_risk), interval=RISK_INTERVAL),
+            run_every("snapshot", lambda: asyncio.to_thread(bot.task_snapshot), interval=SNAPSHOT_TASK_INTERVAL),
+            run_every("balance_sync", task_balance_sync),
+            run_every("wallet_index", lambda: asyncio.to_thread(bot.indexer.poll), interval=WALLET_INDEX_INTERVAL),
+            run_every("entries", task_entries, align=ENTRY_CANDLE_SECONDS, offset=ENTRY_CANDLE_OFFSET),
+            run_every("pair_index", lambda: asyncio.to_thread(bot.task_pair_index), interval=PAIR_INDEX_INTERVAL),
+            run_every("metrics", lambda: asyncio.to_thread(metrics.write_snapshot), interval=METRICS_INTERVAL),
+            run_every("chain_status", lambda: asyncio.to_thread(bot.task_chain_status), interval=CHAIN_STATUS_INTERVAL),
+        )
+    finally:
+        await close_session()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
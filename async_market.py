@@ -0,0 +1,108 @@
+import time
+import asyncio
+import aiohttp
+
+from ohlcv import (
+    BINANCE_KLINES, BINANCE_KLINES_WEIGHT, OKX_TICKER,
+    okx_inst_id, parse_okx_ticker, klines_params, klines_to_df
+)
+from market_http import get_client, backoff, MarketDataError, MAX_ATTEMPTS, RETRY_STATUS
+from recorder import recorder, route
+
+# ================= SESSION =================
+
+_session = None
+
+async def get_session() -> aiohttp.ClientSession:
+    """One keep-alive session per event loop, shared by all fetchers."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def get_json(url, params=None, timeout=10, cost=1):
+    """Async counterpart of MarketHTTP.get_json sharing its rate limits and histograms."""
+    http = get_client()
+    bucket = http.bucket(url)
+    session = await get_session()
+    last_error = None
+
+    for attempt in range(MAX_ATTEMPTS):
+        blocked = bucket.blocked_for()
+        if blocked:
+            raise MarketDataError(f"{url}: venue asked us to back off for another {blocked:.0f}s")
+        wait = bucket.reserve(cost)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        start = time.monotonic()
+        try:
+            async with session.get(route(url), params=params, timeout=aiohttp.ClientTimeout(total=timeout)) as res:
+                http.observe(url, time.monotonic() - start)
+                retry_after = http.apply_headers(url, res.status, res.headers)
+                if res.status not in RETRY_STATUS:
+                    if res.status >= 400:
+                        raise MarketDataError(f"{url}: HTTP {res.status}")
+                    data = await res.json(content_type=None)
+                    if recorder:
+                        recorder.http(url, params, res.status, data, time.monotonic() - start)
+                    return data
+                last_error = MarketDataError(f"{url}: HTTP {res.status}")
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            last_error = e
+            retry_after = None
+
+        if retry_after:
+            continue    # the drained bucket paces the retry; a longer ban fails above
+        if attempt < MAX_ATTEMPTS - 1:
+            await asyncio.sleep(backoff(attempt))
+
+    raise MarketDataError(f"{url}: giving up after {MAX_ATTEMPTS} attempts ({last_error})")
+
+# ================= PRICES =================
+
+async def get_price(symbol: str) -> float:
+    if symbol == "USDC":
+        return 1.0
+    try:
+        url = OKX_TICKER.format(inst=okx_inst_id(symbol))
+        return parse_okx_ticker(await get_json(url, timeout=5))
+    except MarketDataError as e:
+        print(f"⚠️ Price fetch failed {symbol}: {e}")
+    return 0.0
+
+
+async def get_prices(symbols) -> dict:
+    """Fetches all tickers concurrently: wall time ~ the slowest single call."""
+    symbols = list(symbols)
+    prices = await asyncio.gather(*(get_price(s) for s in symbols))
+    return dict(zip(symbols, prices))
+
+# ================= CANDLES =================
+
+async def load_ohlcv(symbol: str, timeframe: str, limit: int = 200):
+    params = klines_params(symbol, timeframe, limit)
+
+    data = await get_json(BINANCE_KLINES, params=params, cost=BINANCE_KLINES_WEIGHT)
+    return klines_to_df(data)
+
+
+async def load_many(symbols, timeframe: str, limit: int = 200) -> dict:
+    """Candles for many symbols at once; failed symbols map to None."""
+    symbols = list(symbols)
+    results = await asyncio.gather(
+        *(load_ohlcv(s, timeframe, limit) for s in symbols),
+        return_exceptions=True
+    )
+    return {
+        s: (None if isinstance(r, Exception) else r)
+        for s, r in zip(symbols, results)
+    }
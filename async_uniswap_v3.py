@@ -0,0 +1,167 @@
+import time
+import asyncio
+from decimal import Decimal
+from web3 import AsyncWeb3, Web3
+try:
+    from web3.middleware import async_geth_poa_middleware as AsyncPOAMiddleware
+except ImportError:
+    from web3.middleware import ExtraDataToPOAMiddleware as AsyncPOAMiddleware
+
+from config import (
+    PRIVATE_KEY, WALLET_ADDRESS,
+    USDC, CHAIN_ID
+)
+from uniswap_abi import SWAP_ROUTER_ABI, ERC20_ABI
+from uniswap_v3 import SWAP_ROUTER_ADDRESS, FALLBACK_BASE_FEE_GWEI, FALLBACK_PRIORITY_FEE_GWEI, NONCE_HINT_TTL
+from rpc_pool import get_pool, make_async_provider
+
+FEE_TIERS = [500, 3000, 10000]
+RECEIPT_POLL = 1.0
+
+
+class AsyncUniswapV3Client:
+    """
+    asyncio twin of UniswapV3Client. Independent reads (decimals, allowance,
+    gas, per-tier simulations) are issued concurrently, and many receipts can
+    be awaited at once without holding a thread each.
+    """
+
+    def __init__(self):
+        # Every call goes through the shared pool: failover across RPC_URLS,
+        # breakers and batching, same as the sync client
+        self.w3 = AsyncWeb3(make_async_provider(get_pool()))
+        # Inject POA middleware for Polygon
+        self.w3.middleware_onion.inject(AsyncPOAMiddleware, layer=0)
+
+        self.account = self.w3.eth.account.from_key(PRIVATE_KEY)
+        self.router_address = Web3.to_checksum_address(SWAP_ROUTER_ADDRESS)
+        self.router = self.w3.eth.contract(address=self.router_address, abi=SWAP_ROUTER_ABI)
+
+        # nonce + sign + send must not interleave between concurrent swaps
+        self._send_lock = asyncio.Lock()
+        self._decimals = {}
+        self.nonce_hint = None      # (next nonce, unix ts of the send), as in the sync client
+
+    async def _get_gas_params(self):
+        """EIP-1559 fees from the latest block, same policy as the sync client."""
+        try:
+            latest_block, priority = await asyncio.gather(
+                self.w3.eth.get_block("latest"),
+                self.w3.eth.max_priority_fee,
+                return_exceptions=True
+            )
+            if isinstance(latest_block, Exception):
+                raise latest_block
+            if isinstance(priority, Exception):
+                priority = Web3.to_wei(FALLBACK_PRIORITY_FEE_GWEI, 'gwei')
+
+            base_fee = latest_block.get("baseFeePerGas", Web3.to_wei(FALLBACK_BASE_FEE_GWEI, 'gwei'))
+            return {
+                "maxFeePerGas": int(base_fee * 2.5) + priority,
+                "maxPriorityFeePerGas": priority,
+                "type": 2
+            }
+        except Exception as e:
+            print(f"⚠️ Gas estimation failed: {e}. Falling back to legacy gas price.")
+            return {"gasPrice": int(await self.w3.eth.gas_price * 1.5)}
+
+    async def _get_fresh_nonce(self):
+        """Pending nonce, never below the one after our last send (the node may not count it yet)."""
+        nonce = await self.w3.eth.get_transaction_count(WALLET_ADDRESS, 'pending')
+        if self.nonce_hint and time.time() - self.nonce_hint[1] < NONCE_HINT_TTL:
+            nonce = max(nonce, self.nonce_hint[0])
+        return nonce
+
+    async def _decimals_of(self, token):
+        if token not in self._decimals:
+            erc20 = self.w3.eth.contract(address=token, abi=ERC20_ABI)
+            self._decimals[token] = await erc20.functions.decimals().call()
+        return self._decimals[token]
+
+    async def token_decimals(self, token):
+        return await self._decimals_of(Web3.to_checksum_address(token))
+
+    async def _sign_and_send(self, fn, gas, gas_params):
+        async with self._send_lock:
+            tx = await fn.build_transaction({
+                "from": WALLET_ADDRESS,
+                "nonce": await self._get_fresh_nonce(),
+                "gas": gas,
+                "chainId": CHAIN_ID,
+                **gas_params
+            })
+            signed = self.account.sign_transaction(tx)
+            tx_hash = await self.w3.eth.send_raw_transaction(signed.rawTransaction)
+            self.nonce_hint = (tx["nonce"] + 1, time.time())
+            return tx_hash
+
+    async def _force_approve(self, token, amount_wei, gas_params):
+        erc20 = self.w3.eth.contract(address=token, abi=ERC20_ABI)
+        current_allowance = await erc20.functions.allowance(WALLET_ADDRESS, self.router_address).call()
+
+        if current_allowance < amount_wei:
+            print(f"🔓 Approving {token} for Router...")
+            approve = erc20.functions.approve(self.router_address, 2**256 - 1)
+            tx_hash = await self._sign_and_send(approve, 70000, gas_params)
+            print(f"⏳ Approval sent: {tx_hash.hex()}. Waiting...")
+            await self.wait_for_receipt(tx_hash)
+
+    async def _simulate(self, params):
+        await self.router.functions.exactInputSingle(params).call({"from": WALLET_ADDRESS})
+        return params
+
+    async def swap_exact_input(self, token_in, token_out, amount_in):
+        token_in = Web3.to_checksum_address(token_in)
+        token_out = Web3.to_checksum_address(token_out)
+
+        decimals, gas_params = await asyncio.gather(
+            self._decimals_of(token_in),
+            self._get_gas_params()
+        )
+        amount_in_wei = int(Decimal(str(amount_in)) * (10 ** decimals))
+
+        # 1. Approval check
+        await self._force_approve(token_in, amount_in_wei, gas_params)
+
+        # 2. Simulate every fee tier at once, keep the first that passes in preference order
+        deadline = int(time.time()) + 600
+        candidates = [{
+            "tokenIn": token_in,
+            "tokenOut": token_out,
+            "fee": fee_tier,
+            "recipient": WALLET_ADDRESS,
+            "deadline": deadline,
+            "amountIn": amount_in_wei,
+            "amountOutMinimum": 0,
+            "sqrtPriceLimitX96": 0
+        } for fee_tier in FEE_TIERS]
+
+        results = await asyncio.gather(*(self._simulate(p) for p in candidates), return_exceptions=True)
+        for params, result in zip(candidates, results):
+            if isinstance(result, Exception):
+                print(f"⚠️ Tier {params['fee']} failed simulation: {result}")
+                continue
+            fn = self.router.functions.exactInputSingle(params)
+            tx_hash = await self._sign_and_send(fn, 300000, gas_params)
+            return tx_hash.hex()
+
+        raise Exception("❌ All liquidity tiers failed simulation. Trade cancelled to save gas.")
+
+    async def wait_for_receipt(self, tx_hash, timeout=120):
+        """Polls with asyncio.sleep so any number of receipts can be awaited concurrently."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                receipt = await self.w3.eth.get_transaction_receipt(tx_hash)
+                if receipt is not None:
+                    return receipt
+            except Exception:
+                pass
+            await asyncio.sleep(RECEIPT_POLL)
+        raise TimeoutError(f"Receipt not found after {timeout}s")
+
+    async def buy_with_usdc(self, token, usdc_amount):
+        return await self.swap_exact_input(USDC, token, usdc_amount)
+
+    async def sell_for_usdc(self, token, token_amount):
+        return await self.swap_exact_input(token, USDC, token_amount)
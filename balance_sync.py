@@ -1,18 +1,19 @@
-from web3 import Web3
+from eth_utils import to_checksum_address
+
 from uniswap_abi import ERC20_ABI
-from config import RPC_URL, WALLET_ADDRESS
+import accounts
+from rpc_pool import get_w3
 
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
 
 def get_token_balance(token_address):
-    token = w3.eth.contract(
-        address=Web3.to_checksum_address(token_address),
+    token = get_w3().eth.contract(
+        address=to_checksum_address(token_address),
         abi=ERC20_ABI
     )
 
     decimals = token.functions.decimals().call()
     balance = token.functions.balanceOf(
-        Web3.to_checksum_address(WALLET_ADDRESS)
+        to_checksum_address(accounts.current().wallet)
     ).call()
 
     return balance / (10 ** decimals)
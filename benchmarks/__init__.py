@@ -0,0 +1,12 @@
+import os
+
+# config.py refuses to import without secrets; benchmarks never touch the
+# chain, so placeholder values are enough.
+os.environ.setdefault("RPC_URLS", "http://127.0.0.1:8545")
+os.environ.setdefault("PRIVATE_KEY", "0x" + "11" * 32)
+os.environ.setdefault("WALLET_ADDRESS", "0x0000000000000000000000000000000000000001")
+
+# Replay benchmarks (bench_replay.py) need the stand-in URL before config loads
+REPLAY_LOG = os.getenv("REPLAY_LOG")
+if REPLAY_LOG:
+    os.environ.setdefault("REPLAY_URL", "http://127.0.0.1:18545")
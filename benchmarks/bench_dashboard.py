@@ -0,0 +1,43 @@
+import asyncio
+
+import chains
+import dashboard.queries as queries
+from dashboard.app import index
+from dashboard.db import pool
+
+from benchmarks.data import seed_trades
+from benchmarks.harness import benchmark, cleanup
+
+# Full index render (summary queries + template) against 100k trades. The
+# summary cache is cleared per call so the SQLite work is measured too.
+
+
+_loop = None
+
+
+def dashboard_loop():
+    """One loop for every dashboard bench: the aiosqlite pool stays on it."""
+    global _loop
+    seed_trades()
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+    return _loop
+
+
+@benchmark("dashboard.index[100k trades]", setup=dashboard_loop)
+def bench_index(loop):
+    queries._cache.pop(pool.path, None)
+    loop.run_until_complete(index(chains.active()))
+
+
+@benchmark("dashboard.index[cached]", setup=dashboard_loop)
+def bench_index_cached(loop):
+    loop.run_until_complete(index(chains.active()))
+
+
+@cleanup
+def close_pool():
+    # aiosqlite worker threads are non-daemon and would block interpreter exit
+    if _loop is not None:
+        _loop.run_until_complete(pool.close())
+        _loop.close()
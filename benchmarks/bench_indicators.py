@@ -0,0 +1,43 @@
+import indicators
+import strategy
+import bot
+from ohlcv import klines_to_df
+
+from benchmarks.data import klines
+from benchmarks.harness import benchmark
+
+# RSI / EMA paths evaluated every entry scan, on a 200 (bot) and 300
+# (strategy, needs 210+) candle frame.
+
+
+def frame_200():
+    return klines_to_df(klines(200))
+
+
+def frame_300():
+    return klines_to_df(klines(300))
+
+
+@benchmark("bot.rsi_hook[200]", setup=frame_200)
+def bench_rsi_hook(df):
+    bot.rsi_hook(df)
+
+
+@benchmark("strategy.compute_rsi[300]", setup=frame_300)
+def bench_compute_rsi(df):
+    strategy.compute_rsi(df["close"], 14)
+
+
+@benchmark("strategy.add_indicators[300]", setup=frame_300)
+def bench_add_indicators(df):
+    strategy.add_indicators(df)
+
+
+@benchmark("strategy.entry_ok[300]", setup=frame_300)
+def bench_entry_ok(df):
+    strategy.entry_ok(df)
+
+
+@benchmark("indicators.apply_indicators[300]", setup=frame_300)
+def bench_apply_indicators(df):
+    indicators.apply_indicators(df.copy())
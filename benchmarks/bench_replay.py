@@ -0,0 +1,64 @@
+import os
+from urllib.parse import urlsplit
+
+from benchmarks import REPLAY_LOG
+from benchmarks.data import workspace
+from benchmarks.harness import benchmark
+
+# End-to-end paths against a recorded session served by replay_server.py.
+# Only registered when REPLAY_LOG points at a recorder.py log, e.g.
+#   REPLAY_LOG=session.jsonl.gz python -m benchmarks.run -k replay
+# REPLAY_LATENCY scales the recorded latencies (0 = pure CPU cost).
+
+REPLAY_LATENCY = float(os.getenv("REPLAY_LATENCY", "1.0"))
+
+_server = None
+
+
+def replay():
+    global _server
+    if _server is None:
+        from config import REPLAY_URL
+        from replay_server import serve_in_thread
+
+        parts = urlsplit(REPLAY_URL)
+        _server, _ = serve_in_thread(REPLAY_LOG, host=parts.hostname, port=parts.port,
+                                     latency=REPLAY_LATENCY)
+    workspace()
+    return _server
+
+
+def client():
+    import bot
+    from uniswap_v3 import UniswapV3Client
+
+    replay()
+    w = bot.worker()
+    if w.client is None:
+        w.client = UniswapV3Client()
+        w.client_ready.set()
+    return bot
+
+
+if REPLAY_LOG:
+    import price_feed
+    from ohlcv import load_ohlcv
+
+    @benchmark("replay.load_ohlcv", setup=replay)
+    def bench_load_ohlcv(_):
+        load_ohlcv("WETH", "15m")
+
+    @benchmark("replay.get_quote", setup=replay)
+    def bench_get_quote(_):
+        price_feed._consensus._cache.clear()
+        price_feed.get_quote("WETH")
+
+    @benchmark("replay.task_exits", setup=client)
+    def bench_task_exits(bot):
+        price_feed._consensus._cache.clear()
+        bot.task_exits()
+
+    @benchmark("replay.task_entries", setup=client)
+    def bench_task_entries(bot):
+        bot._signals.clear()
+        bot.task_entries()
@@ -0,0 +1,63 @@
+import os
+
+import bot
+import state
+from equity_store import EquityStore
+from ohlcv import klines_to_df
+from portfolio import get_portfolio_value
+
+from benchmarks.data import klines, workspace
+from benchmarks.harness import benchmark, cleanup
+
+# load_ohlcv minus the HTTP call, plus the SQLite / equity-store writes done
+# by the snapshot and trade paths.
+
+
+@benchmark("ohlcv.klines_to_df[200]", setup=lambda: klines(200))
+def bench_klines_to_df(rows):
+    klines_to_df(rows)
+
+
+@benchmark("state.record_trade", setup=workspace)
+def bench_record_trade(_):
+    state.record_trade("WETH/USDC", "BUY", 25.0, 0.01, 2500.0, "0xbench", strategy_tag="bench")
+
+
+@benchmark("state.set_balance", setup=workspace)
+def bench_set_balance(_):
+    state.set_balance("WETH", 1.5, 2500.0)
+
+
+@benchmark("state.snapshot_portfolio", setup=workspace)
+def bench_snapshot_portfolio(_):
+    state.snapshot_portfolio(realized_pnl=0)
+
+
+@benchmark("portfolio.get_portfolio_value", setup=workspace)
+def bench_portfolio_value(_):
+    get_portfolio_value()
+
+
+def equity_store():
+    # The worker's store, so bot.get_equity_store() never opens the live
+    # portfolio_equity.bin (or migrates the legacy JSON)
+    w = bot.worker()
+    original = (w.equity_store, bot.SNAPSHOT_INTERVAL)
+    store = EquityStore(os.path.join(workspace(), "portfolio_equity.bin"))
+    w.equity_store = store
+    # Every call appends instead of being throttled by the 5 min interval
+    bot.SNAPSHOT_INTERVAL = 0
+
+    @cleanup
+    def restore():
+        try:
+            store.close()
+        finally:
+            w.equity_store, bot.SNAPSHOT_INTERVAL = original
+
+    return store
+
+
+@benchmark("bot.snapshot_portfolioGrowth", setup=equity_store)
+def bench_snapshot_growth(_):
+    bot.snapshot_portfolioGrowth(1234.5678)
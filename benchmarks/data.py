@@ -0,0 +1,81 @@
+import os
+import random
+import sqlite3
+import tempfile
+
+import chains
+import state
+import dashboard.db
+
+# Synthetic inputs shared by the benchmark modules. Everything is seeded so
+# runs are comparable, and all writes go to a throwaway directory.
+
+SEED = 1234
+TRADE_ROWS = 100_000
+ASSETS = ["WETH", "WBTC", "WMATIC", "LINK", "AAVE", "UNI", "USDC"]
+
+_workspace = None
+
+
+def klines(n=200, start_ms=1_700_000_000_000, step_ms=900_000, seed=SEED):
+    """Binance /api/v3/klines shaped rows (string prices, like the API)."""
+    rng = random.Random(seed)
+    price = 2000.0
+    rows = []
+    for i in range(n):
+        open_ = price
+        price = max(1.0, price * (1 + rng.gauss(0, 0.004)))
+        high = max(open_, price) * (1 + rng.random() * 0.002)
+        low = min(open_, price) * (1 - rng.random() * 0.002)
+        t = start_ms + i * step_ms
+        rows.append([
+            t, f"{open_:.2f}", f"{high:.2f}", f"{low:.2f}", f"{price:.2f}", f"{rng.random() * 100:.4f}",
+            t + step_ms - 1, "0", rng.randint(10, 500), "0", "0", "0",
+        ])
+    return rows
+
+
+def workspace():
+    """Temp dir with an initialised trader.db that every module writes to."""
+    global _workspace
+    if _workspace is None:
+        _workspace = tempfile.mkdtemp(prefix="bench-")
+        db_file = os.path.join(_workspace, "trader.db")
+        state.DB_FILE = db_file
+        # The dashboard's pools bind their path at import; repoint the one
+        # pool_for() hands out for this chain
+        dashboard.db.DB_FILE = db_file
+        dashboard.db.pool.path = db_file
+        dashboard.db._pools = {db_file: dashboard.db.pool,
+                               chains.path_for(chains.active_id(), dashboard.db.DB_NAME): dashboard.db.pool}
+        state.init_db()
+        for asset in ASSETS:
+            state.set_balance(asset, 10.0, 1.0 if asset == "USDC" else 100.0)
+    return _workspace
+
+
+def seed_trades(rows=TRADE_ROWS, seed=SEED):
+    """Bulk-inserts `rows` trades once; returns the DB path."""
+    workspace()
+    conn = sqlite3.connect(state.DB_FILE)
+    have = conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+    if have < rows:
+        rng = random.Random(seed)
+        ts = 1_700_000_000
+        batch = []
+        for i in range(rows - have):
+            ts += rng.randint(1, 120)
+            side = rng.choice(("BUY", "SELL"))
+            amount = round(rng.uniform(5, 50), 4)
+            batch.append((
+                ts, f"{rng.choice(ASSETS[:-1])}/USDC", side,
+                amount if side == "BUY" else 0, 0 if side == "BUY" else amount,
+                rng.uniform(1, 3000), f"0x{rng.getrandbits(256):064x}", "rsi_hook_scalp",
+            ))
+        conn.executemany("""
+            INSERT INTO trades (timestamp, pair, side, amount_in, amount_out, price, tx, strategy_tag)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, batch)
+        conn.commit()
+    conn.close()
+    return state.DB_FILE
@@ -0,0 +1,114 @@
+import os
+import gc
+import json
+import time
+import platform
+import tracemalloc
+
+# Minimal benchmark runner: wall time per call via perf_counter (best-of
+# rounds, so scheduler noise does not count as a regression) and allocation
+# stats via tracemalloc on a separate pass, compared against a stored baseline.
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+ROUNDS = 5
+MIN_ROUND_TIME = 0.2          # seconds; calls per round grow until this is reached
+TIME_THRESHOLD = 0.20         # +20% per-call time is a regression
+ALLOC_THRESHOLD = 0.20
+
+BENCHMARKS = {}
+CLEANUPS = []
+
+
+def benchmark(name, setup=None):
+    """Registers fn(state) as a benchmark; setup() returns the state it runs on."""
+    def decorator(fn):
+        BENCHMARKS[name] = (fn, setup)
+        return fn
+    return decorator
+
+def cleanup(fn):
+    """Registers fn() to run after all benchmarks (e.g. closing pools)."""
+    CLEANUPS.append(fn)
+    return fn
+
+# ================= MEASURE =================
+
+def _calibrate(fn, state):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn(state)
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_ROUND_TIME or number >= 1 << 20:
+            return number
+        number *= 2 if elapsed < MIN_ROUND_TIME / 10 else max(2, int(MIN_ROUND_TIME / elapsed) + 1)
+
+
+def measure(fn, state, rounds=ROUNDS):
+    number = _calibrate(fn, state)
+
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn(state)
+            times.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        fn(state)
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        fn(state)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    times.sort()
+    return {
+        "calls": number * rounds,
+        "best_us": round(times[0] * 1e6, 2),
+        "median_us": round(times[len(times) // 2] * 1e6, 2),
+        "peak_kib": round((peak - before) / 1024, 1),
+        "retained_kib": round((after - before) / 1024, 1),
+    }
+
+# ================= BASELINE =================
+
+def load_baseline(path=BASELINE_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"results": {}}
+
+
+def save_baseline(results, path=BASELINE_FILE):
+    with open(path, "w") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created": int(time.time()),
+            "results": results,
+        }, f, indent=2, sort_keys=True)
+
+
+def compare(result, base, time_threshold=TIME_THRESHOLD, alloc_threshold=ALLOC_THRESHOLD):
+    """Returns a list of regression descriptions (empty when within thresholds)."""
+    if not base:
+        return []
+    problems = []
+    if base["best_us"] and result["best_us"] > base["best_us"] * (1 + time_threshold):
+        problems.append(f"time {base['best_us']}us -> {result['best_us']}us")
+    # Ignore tiny absolute allocation changes
+    if base["peak_kib"] > 4 and result["peak_kib"] > base["peak_kib"] * (1 + alloc_threshold):
+        problems.append(f"peak alloc {base['peak_kib']}KiB -> {result['peak_kib']}KiB")
+    return problems
@@ -0,0 +1,70 @@
+import sys
+import argparse
+
+import benchmarks  # noqa: F401  (sets placeholder env before config is imported)
+from benchmarks import harness
+from benchmarks import bench_indicators, bench_storage, bench_dashboard, bench_replay  # noqa: F401
+
+# Usage (from the repo root):
+#   python -m benchmarks.run                 compare against benchmarks/baseline.json
+#   python -m benchmarks.run --save          record a new baseline
+#   python -m benchmarks.run -k rsi          only benchmarks whose name contains "rsi"
+# Exits 1 when any benchmark regresses past the thresholds.
+
+
+def run(args, baseline):
+    results = {}
+    regressions = {}
+
+    print(f"{'benchmark':<36} {'best':>12} {'median':>12} {'peak':>10} {'retained':>10}  vs baseline")
+    for name, (fn, setup) in harness.BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        state = setup() if setup else None
+        result = harness.measure(fn, state, rounds=args.rounds)
+        results[name] = result
+
+        base = baseline.get(name)
+        delta = f"{(result['best_us'] / base['best_us'] - 1) * 100:+.1f}%" if base and base["best_us"] else "new"
+        problems = harness.compare(result, base, time_threshold=args.threshold)
+        if problems:
+            regressions[name] = problems
+            delta += "  ❌ " + "; ".join(problems)
+
+        print(f"{name:<36} {result['best_us']:>10.1f}us {result['median_us']:>10.1f}us "
+              f"{result['peak_kib']:>7.1f}KiB {result['retained_kib']:>7.1f}KiB  {delta}")
+
+    return results, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bot hot-path microbenchmarks")
+    parser.add_argument("-k", "--filter", default="", help="substring of benchmark names to run")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--rounds", type=int, default=harness.ROUNDS)
+    parser.add_argument("--threshold", type=float, default=harness.TIME_THRESHOLD,
+                        help="allowed relative slowdown before flagging (default 0.20)")
+    args = parser.parse_args(argv)
+
+    baseline = harness.load_baseline()["results"]
+    try:
+        results, regressions = run(args, baseline)
+    finally:
+        for fn in harness.CLEANUPS:
+            fn()
+
+    if args.save:
+        merged = {**baseline, **results}
+        harness.save_baseline(merged)
+        print(f"💾 Baseline saved to {harness.BASELINE_FILE} ({len(merged)} benchmarks)")
+        return 0
+
+    if regressions:
+        print(f"⚠️ {len(regressions)} regression(s) over threshold")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
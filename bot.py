@@ -1,9 +1,9 @@
 import os
 import time
 import sqlite3
-import requests
+import threading
 import logging
-import json
+import metrics
 from logging.handlers import RotatingFileHandler
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
@@ -12,10 +12,13 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from pair_scanner import get_safe_pairs
+import pair_discovery
 from strategy import htf_ok, entry_ok, exit_levels
-from risk import load_state, can_trade
-from uniswap_v3 import UniswapV3Client
+from risk import can_trade
+import accounts
+import chains
 from state import (
+    db_file,
     init_db,
     record_trade,
     set_meta,
@@ -24,7 +27,9 @@ from state import (
     snapshot_portfolio
 )
 from ohlcv import load_ohlcv
+from price_feed import get_quote
 from token_list import TOKEN_BY_SYMBOL
+import token_list
 
 from baseline import (
     calculate_trade_size,
@@ -33,12 +38,19 @@ from baseline import (
 )
 from portfolio import get_portfolio_value, visualize_portfolio
 
-from web3 import Web3
-from uniswap_abi import ERC20_ABI
-from config import WALLET_ADDRESS, USDC
+from config import USDC, NATIVE, CHAIN
+from scheduler import Scheduler
+from profiler import ProfileController
+import warm_state
+from rollups import rollup
+from equity_store import EquityStore, migrate_legacy_json, STORE_FILE, KIND_INITIAL, KIND_POINT
+from rpc_pool import get_pool, balance_of_call
+import fills
+from wallet_indexer import WalletIndexer
+from speculative import Speculator, StaleSwap
 
 # ================= LOGGING =================
-log_file = 'bot_activity.log'
+log_file = chains.data_path('bot_activity.log')   # one log per chain worker
 file_handler = RotatingFileHandler(log_file, maxBytes=100 * 1024, backupCount=0)
 formatter = logging.Formatter('%(asctime)s - %(message)s', datefmt='%H:%M:%S')
 file_handler.setFormatter(formatter)
@@ -52,10 +64,8 @@ def log_activity(msg):
     print(f"DEBUG: {msg}")
 
 # ================= INIT =================
-init_db()
-
 DECIMALS = {"USDC": 6, "WBTC": 8, "WBTC.e": 8}
-TOKENS_TO_TRACK = [("MATIC", "MATIC", 18), ("USDC", USDC, 6)]
+TOKENS_TO_TRACK = [(NATIVE, NATIVE, 18), ("USDC", USDC, 6)]
 
 for symbol, addr in TOKEN_BY_SYMBOL.items():
     decimal = DECIMALS.get(symbol, 18)
@@ -64,36 +74,116 @@ for symbol, addr in TOKEN_BY_SYMBOL.items():
 
 LAST_TRADE_COOLDOWN = 600
 MAX_DAILY_LOSS = -5.5
-LOOP_SLEEP = 60
 TRAILING_PERCENT = 0.005
 PORTFOLIO_TRAILING_PCT = 0.05
+UNCONFIRMED_FALLBACK = 3          # skipped exit checks before a single-venue price is used
+RSI_OVERSOLD = 40                 # RSI hook threshold
 
-SNAPSHOT_FILE = Path("portfolio_snapshots.json")
-SNAPSHOT_INTERVAL = 300
-MAX_POINTS = 288
+# Speculative pre-signed swaps (speculative.py)
+NEAR_STOP = 0.003                 # positions within 0.3% above their stop
+NEAR_RSI = 5                      # RSI points above the hook threshold
+ENTRY_LEAD = 60                   # seconds before an entry scan to start preparing buys
+ENTRY_SCAN_WINDOW = 120           # ... and for how long after it starts
+EXIT_QUOTE_TTL = 15               # exit-cycle quotes older than this don't pick sell candidates
 
-client = UniswapV3Client()
-log_activity("✅ Bot started with Tiered Exit Strategy & RSI Hook Logic")
+SNAPSHOT_FILE = Path("portfolio_snapshots.json")   # legacy, migrated into equity_store
+SNAPSHOT_INTERVAL = 300
 
-baseline = get_or_init_baseline()
-log_activity(f"📊 Portfolio baseline initialized at ${baseline:.2f}")
+# ================= TASK CADENCES =================
+# (interval seconds, priority, timeout seconds) - lower priority runs first
+EXIT_INTERVAL = 5
+TRAILING_INTERVAL = 5
+RISK_INTERVAL = 60
+SNAPSHOT_TASK_INTERVAL = 60
+BALANCE_SYNC_INTERVAL = 1800      # safety net, normally triggered by fills
+WALLET_INDEX_INTERVAL = 10        # Transfer-log indexer
+PAIR_INDEX_INTERVAL = 600         # liquidity index refresh behind get_safe_pairs
+ENTRY_CANDLE_SECONDS = 900        # 15m candle close
+ENTRY_CANDLE_OFFSET = 5           # give the exchange a moment to roll the candle
+TRAILING_PAUSE = 600              # entries paused after portfolio trailing stop
+METRICS_INTERVAL = 15             # metrics.json flush for the dashboard /metrics endpoint
+PROFILE_POLL_INTERVAL = 5         # checks the profile_cycles meta key
+WARM_STATE_INTERVAL = 60          # warm_state.json refresh for fast restarts
+CHAIN_STATUS_INTERVAL = 15        # heartbeat into the shared chain_status table
+SPECULATIVE_INTERVAL = max(1, CHAIN.block_time)   # ~every block; unchanged blocks are skipped
+CLIENT_WAIT = 30                  # max wait for the background-built trading client
+
+scheduler = Scheduler()
+profiler = ProfileController()
+scheduler.hooks.append(profiler.on_task_done)
+
+# Shared between tasks (written by risk/trailing, read by entries). The halt
+# flags are the default account's; other accounts get their own in Worker.
+RUNTIME = {
+    "trading_halted": False,
+    "entries_paused_until": 0,
+    "unconfirmed": {},           # symbol -> exit checks skipped in a row on an unconfirmed price
+    "rsi": {},                   # last RSI per symbol from the entry scan (shared)
+    "exit_quotes": {},           # symbol -> (price, ts) from the last exit check (shared)
+}
+
+# ================= WORKERS =================
+# One Worker per wallet account (accounts.py). Candles, signals, prices, the
+# pair index and the RPC pool are process-wide; the client (key + nonce),
+# halt flags, wallet indexer and equity store are per account. Tasks find
+# their worker through the account they run as.
+
+ACCOUNTS = accounts.load()
+
+class Worker:
+    def __init__(self, account, runtime=None):
+        self.account = account
+        self.runtime = runtime if runtime is not None else {
+            "trading_halted": False, "entries_paused_until": 0, "unconfirmed": {}
+        }
+        # Built by warm_up() in the background (web3 import + chain reads), so
+        # exits are evaluated while it loads. Tasks that trade use get_client().
+        self.client = None
+        self.client_ready = threading.Event()
+        self.indexer = WalletIndexer(
+            account.wallet, TOKENS_TO_TRACK,
+            reconcile=accounts.bound(account, lambda: sync_balances(None, account.wallet, TOKENS_TO_TRACK))
+        )
+        self.equity_store = None
+        self.speculator = Speculator(lambda: speculative_targets())
+
+_workers = {accounts.DEFAULT: Worker(accounts.DEFAULT, RUNTIME)}
+_workers_guard = threading.Lock()
+indexer = _workers[accounts.DEFAULT].indexer      # default account's (async_bot uses it)
+
+def worker():
+    account = accounts.current()
+    with _workers_guard:
+        if account not in _workers:
+            _workers[account] = Worker(account)
+        return _workers[account]
+
+def task_key(name):
+    """Scheduler name of an account task; unchanged for the single default account."""
+    account = accounts.current()
+    return name if account is accounts.DEFAULT else f"{name}@{account.name}"
+
+_asset_locks = {}
+_asset_locks_guard = threading.Lock()
+
+def asset_lock(symbol):
+    """Per-asset lock so exits, trailing stop and entries never trade the same token at once."""
+    with _asset_locks_guard:
+        return _asset_locks.setdefault((accounts.current(), symbol), threading.Lock())
+
+def get_client(timeout=CLIENT_WAIT):
+    w = worker()
+    if w.client is None:
+        w.client_ready.wait(timeout)
+    if w.client is None:
+        raise RuntimeError("Trading client not ready")
+    return w.client
 
 # ================= HELPERS =================
 
 def get_price(symbol):
-    if symbol == "USDC":
-        return 1.0
-    try:
-        mapping = {"WMATIC": "POL", "MATIC": "POL", "WETH": "ETH", "WBTC": "BTC"}
-        ticker_symbol = mapping.get(symbol.upper(), symbol.upper())
-        url = f"https://www.okx.com/api/v5/market/ticker?instId={ticker_symbol}-USDT"
-        res = requests.get(url, timeout=5)
-        data = res.json()
-        if data.get('code') == '0' and data.get('data'):
-            return float(data['data'][0]['last'])
-    except:
-        pass
-    return 0.0
+    # Median of OKX / Binance / on-chain quotes; 0.0 only if every venue failed
+    return get_quote(symbol).price
 
 def today_timestamp():
     return int(datetime.now(timezone.utc).replace(
@@ -101,7 +191,7 @@ def today_timestamp():
     ).timestamp())
 
 def get_daily_pnl():
-    conn = sqlite3.connect("trader.db")
+    conn = sqlite3.connect(db_file())
     c = conn.cursor()
     c.execute("""
         SELECT COALESCE(SUM(amount_out - amount_in), 0)
@@ -114,215 +204,552 @@ def get_daily_pnl():
 
 def sync_balances(w3, wallet, tokens):
     log_activity("🔄 Syncing wallet balances...")
+    # Pinned to one block so the wallet indexer can continue right after it
+    head = int(get_pool().request("eth_blockNumber", [])["result"], 16)
+
+    # All balance reads go out as a single JSON-RPC batch
+    calls = []
     for symbol, token_addr, decimals in tokens:
+        if token_addr == NATIVE:
+            calls.append(("eth_getBalance", [wallet, hex(head)]))
+        else:
+            calls.append(balance_of_call(token_addr, wallet, hex(head)))
+
+    results = get_pool().batch(calls)
+
+    rows = []
+    for (symbol, token_addr, decimals), raw in zip(tokens, results):
         try:
-            if token_addr == "MATIC":
-                bal = w3.eth.get_balance(wallet) / 1e18
-            else:
-                erc20 = w3.eth.contract(
-                    address=Web3.to_checksum_address(token_addr),
-                    abi=ERC20_ABI
-                )
-                bal = erc20.functions.balanceOf(wallet).call() / (10 ** decimals)
+            if isinstance(raw, Exception):
+                raise raw
+            bal = int(raw, 16) / (10 ** decimals) if raw not in (None, "0x") else 0.0
 
             price = get_price(symbol)
-            set_balance(symbol, bal, price)
+            rows.append((symbol, bal, price))
         except Exception as e:
             log_activity(f"⚠️ Sync error {symbol}: {e}")
 
+    # Absolute balances at `head` + the index cursor, never mid-range
+    indexer = worker().indexer
+    with indexer.lock:
+        if indexer.stale(head):
+            log_activity(f"🔁 A fill confirmed after block {head}, balance snapshot dropped")
+            scheduler.trigger(task_key("balance_sync"))
+            return
+        for symbol, bal, price in rows:
+            set_balance(symbol, bal, price)
+        indexer.reconciled(head)
+
 def get_active_positions():
-    conn = sqlite3.connect("trader.db")
+    conn = sqlite3.connect(db_file())
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
     c.execute("""
         SELECT * FROM balances
         WHERE amount > 0.00001
-        AND asset NOT IN ('USDC','MATIC')
-    """)
+        AND asset NOT IN ('USDC', ?)
+    """, (NATIVE,))
     rows = [dict(r) for r in c.fetchall()]
     conn.close()
     return rows
 
 def update_position_state(symbol, column, value):
-    conn = sqlite3.connect("trader.db")
+    conn = sqlite3.connect(db_file())
     c = conn.cursor()
     c.execute(f"UPDATE balances SET {column} = ? WHERE asset = ?", (value, symbol))
     conn.commit()
     conn.close()
 
+def get_equity_store():
+    w = worker()
+    if w.equity_store is None:
+        w.equity_store = EquityStore(w.account.equity_file or STORE_FILE)
+        if w.account is accounts.DEFAULT:
+            migrated = migrate_legacy_json(w.equity_store, SNAPSHOT_FILE)
+            if migrated:
+                log_activity(f"📦 Migrated {migrated} equity points from {SNAPSHOT_FILE}")
+    return w.equity_store
+
+@metrics.timed("equity_append")
 def snapshot_portfolioGrowth(value: float):
-    now = datetime.now(timezone.utc)
-    data = []
-    if SNAPSHOT_FILE.exists():
-        try:
-            data = json.loads(SNAPSHOT_FILE.read_text())
-        except: data = []
+    store = get_equity_store()
+    now = time.time()
 
-    if not any(d.get("type") == "initial" for d in data):
-        data.insert(0, {"type": "initial", "ts": now.isoformat(), "value": round(value, 4)})
-        SNAPSHOT_FILE.write_text(json.dumps(data))
+    if store.initial is None:
+        store.append(now, round(value, 4), KIND_INITIAL)
         return
 
-    last = next((d for d in reversed(data) if d["type"] == "point"), None)
-    if last:
-        last_ts = datetime.fromisoformat(last["ts"])
-        if (now - last_ts).total_seconds() < SNAPSHOT_INTERVAL:
-            return
+    last = store.last_point()
+    if last and now - last[0] < SNAPSHOT_INTERVAL:
+        return
 
-    data.append({"type": "point", "ts": now.isoformat(), "value": round(value, 4)})
-    points = [d for d in data if d["type"] == "point"][-MAX_POINTS:]
-    initial = [d for d in data if d["type"] == "initial"][:1]
-    SNAPSHOT_FILE.write_text(json.dumps(initial + points))
+    store.append(now, round(value, 4), KIND_POINT)
 
+@metrics.timed("receipt_wait")
 def wait_for_success(w3, tx_hash, timeout=120):
+    """Returns the receipt of a successful tx (its logs carry the fill), else None."""
     hash_str = tx_hash.hex() if hasattr(tx_hash, 'hex') else str(tx_hash)
-    if not tx_hash: return False
+    if not tx_hash: return None
     try:
         log_activity(f"⏳ Waiting for receipt: {hash_str}")
         receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
         if receipt.status == 1:
             log_activity(f"✅ Transaction confirmed successful: {hash_str}")
-            return True
+            return receipt
         else:
             log_activity(f"❌ Transaction REVERTED on-chain: {hash_str}")
-            return False
+            return None
     except Exception as e:
         log_activity(f"⚠️ Error verifying transaction {hash_str}: {e}")
-        return False
-
-# ================= START =================
-log_activity("🔄 Performing initial balance sync...")
-sync_balances(client.w3, WALLET_ADDRESS, TOKENS_TO_TRACK)
-log_activity("✅ Initial sync complete")
-
-# ================= MAIN LOOP =================
-while True:
+        return None
+
+def apply_fill(fill, symbol, side, strategy_tag=None):
+    """fills.record under the indexer lock, so a balance sync in flight can't overwrite it."""
+    indexer = worker().indexer
+    with indexer.lock:
+        fills.record(fill, symbol, side, strategy_tag=strategy_tag)
+        indexer.fill_recorded(fill.block)
+
+def record_fill(symbol, side, tx, receipt, estimate, strategy_tag=None):
+    """
+    Records a confirmed swap from its receipt logs; the balances move by the
+    exact fill, so no wallet resync is needed. Falls back to `estimate`
+    (amount_in, amount_out, price) and returns None if the logs don't decode,
+    in which case the caller should resync.
+    """
+    token = TOKEN_BY_SYMBOL[symbol]
+    token_in, token_out = (USDC, token) if side == "BUY" else (token, USDC)
     try:
-        log_activity("🔍 --- Starting New Scan Cycle ---")
-        portfolio_value = get_portfolio_value()
-        
-        snapshot_portfolio(realized_pnl=get_meta("realized_pnl", 0))
-        snapshot_portfolioGrowth(portfolio_value)
-        
-        baseline = get_meta("portfolio_baseline", 0)
-        
-        # Self-heal baseline if zero
-        if baseline <= 0 and portfolio_value > 0:
-            baseline = portfolio_value
-            set_meta("portfolio_baseline", baseline)
-            log_activity(f"🌱 Baseline initialized to ${baseline:.2f}")
-
-        visualize_portfolio(baseline, portfolio_value)
-        state = load_state()
-
-        # ================= RISK MANAGEMENT =================
-        daily_pnl_dollars = get_daily_pnl()
-        set_meta("daily_pnl", daily_pnl_dollars)
-        
-        pnl_percentage = (daily_pnl_dollars / baseline * 100) if baseline > 0 else 0
-        log_activity(f"📈 Daily PnL: ${daily_pnl_dollars:.2f} ({pnl_percentage:.2f}%)")
-
-        # Trading Halt logic (Soft lock)
-        trading_halted = (pnl_percentage <= MAX_DAILY_LOSS) and (daily_pnl_dollars < 0)
-
-        if trading_halted:
-            log_activity(f"⚠️ RISK HALT: Entry logic paused. Monitoring exits only.")
-
-        # ================= PORTFOLIO TRAILING =================
-        ath = get_meta("portfolio_ath", 0)
-        if portfolio_value > ath:
-            set_meta("portfolio_ath", portfolio_value)
-            ath = portfolio_value 
-
-        if ath > 0 and portfolio_value <= ath * (1 - PORTFOLIO_TRAILING_PCT):
-            log_activity(f"🚨 PORTFOLIO TRAILING STOP HIT")
-            for pos in get_active_positions():
-                symbol = pos['asset']
-                try:
-                    tx = client.sell_for_usdc(TOKEN_BY_SYMBOL[symbol], pos['amount'])
-                    if wait_for_success(client.w3, tx):
-                        record_trade(f"{symbol}/USDC", "SELL", 0, pos['amount'] * get_price(symbol), get_price(symbol), tx)
-                except Exception as e:
-                    log_activity(f"⚠️ Emergency sell failed {symbol}: {e}")
-            
-            sync_balances(client.w3, WALLET_ADDRESS, TOKENS_TO_TRACK)
-            set_meta("portfolio_ath", get_portfolio_value())
-            time.sleep(600)
+        c = get_client()
+        fill = fills.decode_fill(receipt, token_in, token_out,
+                                 c.token_decimals(token_in), c.token_decimals(token_out))
+    except Exception as e:
+        log_activity(f"⚠️ Fill decode failed {tx}: {e}")
+        fill = None
+
+    if fill is None:
+        record_trade(f"{symbol}/USDC", side, *estimate, tx, strategy_tag=strategy_tag)
+        return None
+
+    apply_fill(fill, symbol, side, strategy_tag)
+    log_activity(f"🧾 {side} {symbol}: {fill.amount_in:.6g} -> {fill.amount_out:.6g} "
+                 f"@ {fill.price:.6g}, gas {fill.gas_cost:.6g} {NATIVE}")
+    return fill
+
+@metrics.timed("rsi")
+def rsi_hook(df):
+    """Returns (hooked, rsi_value) for the RSI hook entry filter on a candle frame."""
+    # RSI Calculation
+    delta = df["close"].diff()
+    gain = delta.clip(lower=0).rolling(14).mean()
+    loss = (-delta.clip(upper=0)).rolling(14).mean()
+    rsi = 100 - (100 / (1 + (gain / loss)))
+
+    rsi_val = rsi.iloc[-1]
+    rsi_prev = rsi.iloc[-2]
+
+    # GENIUS ENTRY FILTER: RSI Hook + Price Confirmation
+    is_oversold = rsi_val < RSI_OVERSOLD
+    is_hooking_up = rsi_val > rsi_prev
+    price_recovering = df["close"].iloc[-1] > df["close"].iloc[-2]
+
+    return (is_oversold and is_hooking_up and price_recovering), rsi_val
+
+_signals = {}                # (symbol, candle slot) -> (hooked, rsi) or None
+_signals_lock = threading.Lock()
+
+def entry_signal(symbol):
+    """
+    RSI hook for the current 15m candle, computed once and shared by every
+    account's entry scan (candles come from the shared ohlcv cache).
+    """
+    slot = int(time.time() // ENTRY_CANDLE_SECONDS)
+    with _signals_lock:
+        if (symbol, slot) in _signals:
+            return _signals[(symbol, slot)]
+
+        df = load_ohlcv(symbol, "15m")
+        signal = None
+        if df is not None and len(df) >= 20:
+            hooked, rsi_val = rsi_hook(df)
+            RUNTIME["rsi"][symbol] = round(float(rsi_val), 2)
+            signal = (hooked, rsi_val)
+
+        for key in [k for k in _signals if k[1] < slot]:
+            del _signals[key]
+        _signals[(symbol, slot)] = signal
+        return signal
+
+def get_position(symbol):
+    conn = sqlite3.connect(db_file())
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    c.execute("SELECT * FROM balances WHERE asset = ? AND amount > 0.00001", (symbol,))
+    row = c.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+def current_stop(entry_price, cur_price):
+    levels = exit_levels(entry_price)
+    current_sl = levels['sl']
+
+    # Genius Shield: Move SL to Break-even if up 0.5%
+    price_change = (cur_price - entry_price) / entry_price
+    if price_change > 0.009:
+        # Shield active: cannot lose on this trade anymore
+        current_sl = max(current_sl, entry_price * 1.001)
+    return current_sl
+
+def exit_check_price(symbol, quote, runtime):
+    """
+    Price to check the stop against, or None to skip this cycle. One venue is
+    not enough to sell on, but after UNCONFIRMED_FALLBACK skipped cycles in a
+    row the best price that did arrive is used instead of never checking.
+    """
+    skipped = runtime["unconfirmed"]
+    if quote.confident:
+        skipped.pop(symbol, None)
+        return quote.price
+    skipped[symbol] = skipped.get(symbol, 0) + 1
+    if skipped[symbol] < UNCONFIRMED_FALLBACK or not quote.price:
+        log_activity(f"⚠️ {symbol} price unconfirmed {quote.sources}, exit check skipped")
+        return None
+    metrics.inc("exit_unconfirmed_fallback", symbol=symbol)
+    log_activity(f"⚠️ {symbol} unconfirmed for {skipped[symbol]} cycles, checking stop on {quote.sources}")
+    return quote.price
+
+def execute_swap(side, symbol, amount, prepared=None):
+    """Sends the speculative pre-signed swap when there is one, else builds it from scratch."""
+    c = get_client()
+    if prepared is not None:
+        try:
+            tx = c.send_prepared(prepared)
+            log_activity(f"⚡ Pre-signed {side} {symbol} sent (block {prepared.block})")
+            return tx
+        except StaleSwap as e:
+            # Provably never broadcast; anything else propagates so the swap isn't doubled
+            log_activity(f"⚠️ Pre-signed {side} {symbol} not sent ({e}), building fresh")
+    token = TOKEN_BY_SYMBOL[symbol]
+    return c.buy_with_usdc(token, amount) if side == "BUY" else c.sell_for_usdc(token, amount)
+
+# ================= SPECULATIVE =================
+
+def entry_window(now=None):
+    """True from ENTRY_LEAD before an entry scan until ENTRY_SCAN_WINDOW after it."""
+    phase = ((now or time.time()) - ENTRY_CANDLE_OFFSET) % ENTRY_CANDLE_SECONDS
+    return phase <= ENTRY_SCAN_WINDOW or phase >= ENTRY_CANDLE_SECONDS - ENTRY_LEAD
+
+def speculative_targets():
+    """Swaps a trigger may need within the next blocks: near-stop sells, near-hook buys."""
+    targets = {}
+    held = set()
+    for pos in get_active_positions():
+        symbol = pos['asset']
+        held.add(symbol)
+        # The exits cycle's last confident quote; no extra venue requests per block
+        cur_price, ts = RUNTIME["exit_quotes"].get(symbol, (0.0, 0))
+        if symbol not in TOKEN_BY_SYMBOL or not pos['price'] or time.time() - ts > EXIT_QUOTE_TTL:
             continue
+        if cur_price and cur_price <= current_stop(pos['price'], cur_price) * (1 + NEAR_STOP):
+            targets[("SELL", symbol)] = (TOKEN_BY_SYMBOL[symbol], USDC, pos['amount'])
+
+    runtime = worker().runtime
+    if runtime["trading_halted"] or time.time() < runtime["entries_paused_until"] or not entry_window():
+        return targets
+    near = [s for s, rsi in RUNTIME["rsi"].items()
+            if rsi < RSI_OVERSOLD + NEAR_RSI and s in TOKEN_BY_SYMBOL and s not in held]
+    if near:
+        usdc_amount = calculate_trade_size()
+        if usdc_amount >= 1:
+            for symbol in near:
+                targets[("BUY", symbol)] = (USDC, TOKEN_BY_SYMBOL[symbol], usdc_amount)
+    return targets
+
+# ================= TASKS =================
+
+def task_snapshot():
+    portfolio_value = get_portfolio_value()
+
+    snapshot_portfolio(realized_pnl=get_meta("realized_pnl", 0))
+    rollup()
+    snapshot_portfolioGrowth(portfolio_value)
+
+    baseline = get_meta("portfolio_baseline", 0)
+
+    # Self-heal baseline if zero
+    if baseline <= 0 and portfolio_value > 0:
+        baseline = portfolio_value
+        set_meta("portfolio_baseline", baseline)
+        log_activity(f"🌱 Baseline initialized to ${baseline:.2f}")
+
+    visualize_portfolio(baseline, portfolio_value)
+
+def task_risk():
+    baseline = get_meta("portfolio_baseline", 0)
+    daily_pnl_dollars = get_daily_pnl()
+    set_meta("daily_pnl", daily_pnl_dollars)
+
+    pnl_percentage = (daily_pnl_dollars / baseline * 100) if baseline > 0 else 0
+    log_activity(f"📈 Daily PnL: ${daily_pnl_dollars:.2f} ({pnl_percentage:.2f}%)")
+
+    # Trading Halt logic (Soft lock)
+    trading_halted = (pnl_percentage <= MAX_DAILY_LOSS) and (daily_pnl_dollars < 0)
+    runtime = worker().runtime
+    if trading_halted and not runtime["trading_halted"]:
+        log_activity(f"⚠️ RISK HALT: Entry logic paused. Monitoring exits only.")
+    runtime["trading_halted"] = trading_halted
+
+def task_trailing_stop():
+    portfolio_value = get_portfolio_value()
+
+    ath = get_meta("portfolio_ath", 0)
+    if portfolio_value > ath:
+        set_meta("portfolio_ath", portfolio_value)
+        ath = portfolio_value
+
+    if not (ath > 0 and portfolio_value <= ath * (1 - PORTFOLIO_TRAILING_PCT)):
+        return
 
-        # ================= EXITS & BREAK-EVEN SHIELD =================
-        for pos in get_active_positions():
-            symbol = pos['asset']
-            cur_price = get_price(symbol)
-            entry_price = pos['price']
-            levels = exit_levels(entry_price)
-            
-            # Genius Shield: Move SL to Break-even if up 0.5%
-            price_change = (cur_price - entry_price) / entry_price
-            current_sl = levels['sl']
-            
-            if price_change > 0.009:
-                # Shield active: cannot lose on this trade anymore
-                current_sl = max(current_sl, entry_price * 1.001) 
-            
-            if cur_price <= current_sl:
+    log_activity(f"🚨 PORTFOLIO TRAILING STOP HIT")
+    resync = False
+    for pos in get_active_positions():
+        symbol = pos['asset']
+        with asset_lock(symbol):
+            pos = get_position(symbol)
+            if not pos:
+                continue
+            try:
+                prepared = worker().speculator.take(("SELL", symbol), pos['amount'])
+                tx = execute_swap("SELL", symbol, pos['amount'], prepared)
+                receipt = wait_for_success(get_client().w3, tx)
+                if receipt:
+                    price = get_price(symbol)
+                    if not record_fill(symbol, "SELL", tx, receipt, (0, pos['amount'] * price, price)):
+                        resync = True
+            except Exception as e:
+                log_activity(f"⚠️ Emergency sell failed {symbol}: {e}")
+                resync = True
+
+    if resync:
+        sync_balances(get_client().w3, accounts.current().wallet, TOKENS_TO_TRACK)
+    set_meta("portfolio_ath", get_portfolio_value())
+
+    # Previously the whole loop slept here; now only entries are paused
+    worker().runtime["entries_paused_until"] = time.time() + TRAILING_PAUSE
+    log_activity(f"⏸️ Entries paused for {TRAILING_PAUSE}s. Exits remain active.")
+
+def task_exits():
+    for pos in get_active_positions():
+        symbol = pos['asset']
+        quote = get_quote(symbol)
+        entry_price = pos['price']
+        if not entry_price:
+            continue
+        cur_price = exit_check_price(symbol, quote, worker().runtime)
+        if cur_price is None:
+            continue
+        if quote.confident:
+            RUNTIME["exit_quotes"][symbol] = (cur_price, time.time())
+        current_sl = current_stop(entry_price, cur_price)
+
+        if cur_price <= current_sl:
+            with asset_lock(symbol):
+                pos = get_position(symbol)
+                if not pos:
+                    continue
                 try:
-                    tx = client.sell_for_usdc(TOKEN_BY_SYMBOL[symbol], pos['amount'])
-                    if wait_for_success(client.w3, tx):
-                        record_trade(f"{symbol}/USDC", "SELL", 0, pos['amount'] * cur_price, cur_price, tx)
-                        sync_balances(client.w3, WALLET_ADDRESS, TOKENS_TO_TRACK)
+                    prepared = worker().speculator.take(("SELL", symbol), pos['amount'])
+                    tx = execute_swap("SELL", symbol, pos['amount'], prepared)
+                    receipt = wait_for_success(get_client().w3, tx)
+                    if receipt and not record_fill(symbol, "SELL", tx, receipt,
+                                                   (0, pos['amount'] * cur_price, cur_price)):
+                        scheduler.trigger(task_key("balance_sync"))
                 except Exception as e:
                     log_activity(f"⚠️ Exit failed {symbol}: {e}")
-                    
-        # ================= ENTRIES (RSI HOOK LOGIC) =================
-        if can_trade(state) and not trading_halted:
-            active_assets = {ap['asset'] for ap in get_active_positions()}
-            for p in get_safe_pairs() or []:
-                symbols = [p["token0"]["symbol"], p["token1"]["symbol"]]
-                if "USDC" not in symbols: continue
-                symbol = symbols[0] if symbols[1] == "USDC" else symbols[1]
-                
-                if symbol in active_assets: continue
-                
-                df = load_ohlcv(symbol, "15m")
-                if df is None or len(df) < 20: continue
-                
-                # RSI Calculation
-                delta = df["close"].diff()
-                gain = delta.clip(lower=0).rolling(14).mean()
-                loss = (-delta.clip(upper=0)).rolling(14).mean()
-                rsi = 100 - (100 / (1 + (gain / loss)))
-                
-                rsi_val = rsi.iloc[-1]
-                rsi_prev = rsi.iloc[-2]
-                
-                # GENIUS ENTRY FILTER: RSI Hook + Price Confirmation
-                is_oversold = rsi_val < 40
-                is_hooking_up = rsi_val > rsi_prev
-                price_recovering = df["close"].iloc[-1] > df["close"].iloc[-2]
-
-                if is_oversold and is_hooking_up and price_recovering:
-                    log_activity(f"🎯 RSI Hook Detected for {symbol} at {rsi_val:.2f}")
-                    usdc_amount = calculate_trade_size()
-                    if usdc_amount >= 1:
-                        try:
-                            tx = client.buy_with_usdc(TOKEN_BY_SYMBOL[symbol], usdc_amount)
-                            if wait_for_success(client.w3, tx):
-                                record_trade(f"{symbol}/USDC", "BUY", usdc_amount, 0, get_price(symbol), tx, strategy_tag="rsi_hook_scalp")
-                                sync_balances(client.w3, WALLET_ADDRESS, TOKENS_TO_TRACK)
-                        except Exception as e:
-                            log_activity(f"⚠️ Buy failed {symbol}: {e}")
-                else:
-                    # Log scanning but not entry
-                    if time.time() % 300 < 60: # Log only once every 5 mins to keep logs clean
-                         log_activity(f"🔍 {symbol} | RSI: {rsi_val:.1f} (No Hook)")
-
-        elif trading_halted:
-            log_activity("🚫 Skipping scan: Daily loss limit active.")
-
-        log_activity(f"😴 Cycle complete. Sleeping {LOOP_SLEEP}s.")
-        time.sleep(LOOP_SLEEP)
 
+def task_entries():
+    runtime = worker().runtime
+    if runtime["trading_halted"]:
+        log_activity("🚫 Skipping scan: Daily loss limit active.")
+        return
+    if time.time() < runtime["entries_paused_until"]:
+        log_activity("⏸️ Skipping scan: portfolio trailing stop cooldown.")
+        return
+    if not can_trade():
+        return
+
+    log_activity("🔍 --- Starting New Entry Scan ---")
+    active_assets = {ap['asset'] for ap in get_active_positions()}
+    for p in get_safe_pairs() or []:
+        symbols = [p["token0"]["symbol"], p["token1"]["symbol"]]
+        if "USDC" not in symbols: continue
+        symbol = symbols[0] if symbols[1] == "USDC" else symbols[1]
+
+        if symbol in active_assets or symbol not in TOKEN_BY_SYMBOL: continue
+
+        signal = entry_signal(symbol)
+        if signal is None: continue
+        hooked, rsi_val = signal
+
+        if hooked:
+            log_activity(f"🎯 RSI Hook Detected for {symbol} at {rsi_val:.2f}")
+            # Sized (and signed) a block ago if speculative.py saw this coming
+            prepared = worker().speculator.take(("BUY", symbol))
+            usdc_amount = prepared.amount_in if prepared else calculate_trade_size()
+            if usdc_amount >= 1:
+                with asset_lock(symbol):
+                    try:
+                        tx = execute_swap("BUY", symbol, usdc_amount, prepared)
+                        receipt = wait_for_success(get_client().w3, tx)
+                        if receipt and not record_fill(symbol, "BUY", tx, receipt,
+                                                       (usdc_amount, 0, get_price(symbol)),
+                                                       strategy_tag="rsi_hook_scalp"):
+                            scheduler.trigger(task_key("balance_sync"))
+                    except Exception as e:
+                        log_activity(f"⚠️ Buy failed {symbol}: {e}")
+        else:
+            log_activity(f"🔍 {symbol} | RSI: {rsi_val:.1f} (No Hook)")
+
+def task_balance_sync():
+    sync_balances(get_client().w3, accounts.current().wallet, TOKENS_TO_TRACK)
+
+def task_wallet_index():
+    worker().indexer.poll()
+
+def task_speculative():
+    w = worker()
+    if w.client is not None:
+        w.speculator.refresh(w.client)
+
+def track_tradable():
+    """
+    Starts tracking discovery candidates (token_list.CANDIDATES) once the
+    pair index lists them as tradable: balances, wallet indexer, entries.
+    """
+    tradable = {p["token0"]["symbol"]: p["token0"]["id"] for p in get_safe_pairs() or []}
+    for symbol, addr in token_list.promote(tradable):
+        decimals = pair_discovery.index.decimals.get(tradable[symbol], DECIMALS.get(symbol, 18))
+        TOKENS_TO_TRACK.append((symbol, addr, decimals))
+        with _workers_guard:
+            workers = list(_workers.values())
+        for w in workers:
+            w.indexer.track(symbol, addr, decimals)
+            with accounts.use(w.account):
+                scheduler.trigger(task_key("balance_sync"))
+        log_activity(f"🆕 {symbol} passed the liquidity filter, now tracked")
+
+def task_pair_index():
+    pair_discovery.refresh()
+    track_tradable()
+
+def task_metrics():
+    metrics.write_snapshot()
+
+def task_profiler():
+    profiler.poll_meta(get_meta, set_meta)
+
+def task_warm_state():
+    warm_state.save(_workers[accounts.DEFAULT].client, RUNTIME["rsi"])
+
+def task_chain_status():
+    # This chain's row in the shared DB (dashboard /api/chains), all accounts summed
+    head = int(get_pool().request("eth_blockNumber", [])["result"], 16)
+    equity = positions = 0
+    for account in ACCOUNTS:
+        with accounts.use(account):
+            equity += get_portfolio_value()
+            positions += len(get_active_positions())
+    chains.report_status(CHAIN.chain_id, name=CHAIN.name, pid=os.getpid(), status="running",
+                         block=head, equity=round(equity, 2), positions=positions, error=None)
+
+# ================= START =================
+
+def start():
+    """
+    Fast startup: restore the warm snapshot and return, so the first exit
+    cycle runs on the persisted positions. The client and the balance
+    reconcile are built by warm_up() in the background.
+    """
+    init_db()       # default DB: shared meta (profiler) even in multi-account mode
+    chains.report_status(CHAIN.chain_id, name=CHAIN.name, pid=os.getpid(), status="starting")
+    track_tradable()    # candidates the persisted pair index already qualified
+    snapshot = warm_state.load()
+    if snapshot:
+        warm_state.restore(snapshot)
+        RUNTIME["rsi"].update(snapshot.get("indicators", {}))
+        log_activity(f"♨️ Warm state restored ({time.time() - snapshot['saved_at']:.0f}s old)")
+
+    for account in ACCOUNTS:
+        with accounts.use(account):
+            init_db()
+        threading.Thread(target=accounts.bound(account, warm_up), args=(snapshot,),
+                         name=f"warm-up-{account.name}", daemon=True).start()
+    log_activity(f"✅ Bot started with Tiered Exit Strategy & RSI Hook Logic "
+                 f"({CHAIN.name}, {len(ACCOUNTS)} account(s))")
+
+def warm_up(snapshot=None):
+    w = worker()
+    try:
+        from uniswap_v3 import UniswapV3Client  # pulls in web3, the slowest import
+        c = UniswapV3Client(w.account)
+        if snapshot:
+            # The saved nonce belongs to the default wallet; decimals are universal
+            if w.account is accounts.DEFAULT:
+                warm_state.restore_client(snapshot, c)
+            else:
+                c.decimals.update(snapshot.get("decimals", {}))
+        w.client = c
     except Exception as e:
-        log_activity(f"❌ Bot Loop Error: {e}")
-        time.sleep(30)
+        log_activity(f"❌ Trading client init failed ({w.account.name}): {e}")
+        return
+    finally:
+        w.client_ready.set()
+
+    baseline = get_or_init_baseline()
+    log_activity(f"📊 Portfolio baseline initialized at ${baseline:.2f} ({w.account.name})")
+
+    log_activity("🔄 Reconciling balances in the background...")
+    sync_balances(w.client.w3, w.account.wallet, TOKENS_TO_TRACK)
+    log_activity("✅ Initial sync complete")
+
+def add_account_tasks(account):
+    """Per-wallet lanes; several accounts simply add more lanes to the one scheduler."""
+    with accounts.use(account):
+        def add(name, fn, **kwargs):
+            scheduler.add(task_key(name), accounts.bound(account, fn), **kwargs)
+
+        # Stop-loss work first and often; entry scans only on 15m candle closes
+        add("exits", task_exits, interval=EXIT_INTERVAL, priority=0, timeout=150)
+        add("trailing_stop", task_trailing_stop, interval=TRAILING_INTERVAL, priority=1, timeout=300)
+        add("speculative", task_speculative, interval=SPECULATIVE_INTERVAL, priority=5, timeout=30,
+            run_at_start=False)
+        add("risk", task_risk, interval=RISK_INTERVAL, priority=10, timeout=20)
+        add("wallet_index", task_wallet_index, interval=WALLET_INDEX_INTERVAL, priority=15,
+            timeout=60, run_at_start=False)
+        add("balance_sync", task_balance_sync, interval=BALANCE_SYNC_INTERVAL, priority=20,
+            timeout=60, run_at_start=False)
+        add("snapshot", task_snapshot, interval=SNAPSHOT_TASK_INTERVAL, priority=30, timeout=20)
+        add("entries", task_entries, align=ENTRY_CANDLE_SECONDS, offset=ENTRY_CANDLE_OFFSET,
+            priority=40, timeout=300)
+
+def main():
+    start()
+
+    for account in ACCOUNTS:
+        add_account_tasks(account)
+
+    # Shared by every account
+    scheduler.add("pair_index", task_pair_index, interval=PAIR_INDEX_INTERVAL, priority=60, timeout=120)
+    scheduler.add("metrics", task_metrics, interval=METRICS_INTERVAL, priority=90, timeout=10)
+    scheduler.add("profiler", task_profiler, interval=PROFILE_POLL_INTERVAL, priority=95, timeout=10)
+    scheduler.add("warm_state", task_warm_state, interval=WARM_STATE_INTERVAL, priority=80, timeout=10,
+                  run_at_start=False)
+    scheduler.add("chain_status", task_chain_status, interval=CHAIN_STATUS_INTERVAL, priority=85, timeout=10)
+    profiler.install_signal()
+
+    log_activity("⏱️ Scheduler started (exits/trailing every 5s, entries on 15m closes)")
+    scheduler.run_forever()
+
+
+if __name__ == "__main__":
+    main()
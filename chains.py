@@ -0,0 +1,196 @@
+import os
+import time
+import sqlite3
+
+# Per-chain deployment registry. Everything that used to be a Polygon module
+# constant (USDC, Uniswap router/quoter/factory, the token universe, the
+# native asset, block time, gas fallbacks) lives here, keyed by chain id;
+# config.py picks the entry for CHAIN_ID at import. Each process runs one
+# chain (supervisor.py starts one worker process per chain), so the rest of
+# the code keeps reading plain module constants.
+#
+# This module must not import config: supervisor.py and the dashboard use it
+# without the bot's secrets. It also owns `chain_status`, the one table every
+# chain's worker (and the supervisor) writes into the shared DB.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CHAIN_ID = 137
+
+# Shared by every chain: the dashboard's DB, also holding chain_status
+SHARED_DB_FILE = os.path.join(BASE_DIR, "trader.db")
+
+# Uniswap V3 canonical deployments (same addresses on every chain below)
+V3_FACTORY = "0x1F98431c8aD98523631AE4a59f267346ea31F984"
+SWAP_ROUTER = "0xE592427A0AEce92De3Edee1F18E0157C05861564"   # exactInputSingle with deadline
+QUOTER_V2 = "0x61fFE014bA17989E743c5F6cB21bF9697530B21e"
+
+
+class Chain:
+    def __init__(self, chain_id, name, native, usdc, tokens, block_time, confirmations,
+                 gas_fallback_gwei, router=SWAP_ROUTER, quoter=QUOTER_V2, factory=V3_FACTORY):
+        self.chain_id = chain_id
+        self.name = name
+        self.native = native                        # balances row / price symbol of the gas token
+        self.usdc = usdc
+        self.tokens = tokens                        # symbol -> address, the default universe
+        self.block_time = block_time                # seconds
+        self.confirmations = confirmations          # wallet_indexer reorg depth
+        self.gas_fallback_gwei = gas_fallback_gwei  # (base fee, priority fee) when the node won't say
+        self.router = router
+        self.quoter = quoter
+        self.factory = factory
+
+    def __repr__(self):
+        return f"Chain({self.chain_id}, {self.name})"
+
+
+CHAINS = {c.chain_id: c for c in [
+    Chain(
+        137, "polygon", "MATIC",
+        usdc="0x3c499c542cEF5E3811e1192ce70d8cC03d5c3359",
+        tokens={
+            "WETH": "0x7ceB23fD6bC0adD59E62ac25578270cFf1b9f619",
+            "WMATIC": "0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270",
+            "WBTC": "0x1BFD67037B42Cf73acF2047067bd4F2C47D9BfD6",
+            "LINK": "0x53E0bca35eC356BD5ddDFebbD1Fc0fD03FaBad39",
+            "UNI": "0xb33EaAd8d922B1083446DC23f610c2567fB5180f",
+        },
+        block_time=2, confirmations=32, gas_fallback_gwei=(50, 35),
+    ),
+    Chain(
+        42161, "arbitrum", "ETH",
+        usdc="0xaf88d065e77c8cC2239327C5EDb3A432268e5831",
+        tokens={
+            "WETH": "0x82aF49447D8a07e3bd95BD0d56f35241523fBab1",
+            "WBTC": "0x2f2a2543B76A4166549F7aaB2e75Bef0aefC5B0f",
+            "ARB": "0x912CE59144191C1204E64559FE8253a0e49E6548",
+            "LINK": "0xf97f4df75117a78c1A5a0DBb814Af92458539FB4",
+            "UNI": "0xFa7F8980b0f1E64A2062791cc3b0871572f1F7f0",
+        },
+        block_time=0.25, confirmations=240, gas_fallback_gwei=(0.1, 0.01),
+    ),
+    Chain(
+        10, "optimism", "ETH",
+        usdc="0x0b2C639c533813f4Aa9D7837CAf62653d097Ff85",
+        tokens={
+            "WETH": "0x4200000000000000000000000000000000000006",
+            "WBTC": "0x68f180fcCe6836688e9084f035309E29Bf0A2095",
+            "OP": "0x4200000000000000000000000000000000000042",
+            "LINK": "0x350a791Bfc2C21F9Ed5d10980Dad2e2638ffa7f6",
+        },
+        block_time=2, confirmations=32, gas_fallback_gwei=(0.1, 0.01),
+    ),
+    Chain(
+        1, "ethereum", "ETH",
+        usdc="0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48",
+        tokens={
+            "WETH": "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",
+            "WBTC": "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599",
+            "LINK": "0x514910771AF9Ca656af840dff83E8264EcF986CA",
+            "UNI": "0x1f9840a85d5aF5bf1D1762F925BDADdC4201F984",
+        },
+        block_time=12, confirmations=12, gas_fallback_gwei=(30, 2),
+    ),
+]}
+
+
+def get(chain_id):
+    try:
+        return CHAINS[int(chain_id)]
+    except (KeyError, ValueError):
+        raise RuntimeError(f"Unknown CHAIN_ID {chain_id!r}; known: {sorted(CHAINS)}")
+
+
+def lookup(key):
+    """A chain by id ("137") or name ("polygon"), as the dashboard's ?chain= takes it."""
+    for chain in CHAINS.values():
+        if str(key).lower() in (str(chain.chain_id), chain.name):
+            return chain
+    raise RuntimeError(f"Unknown chain {key!r}; known: {', '.join(c.name for c in CHAINS.values())}")
+
+
+def active_id():
+    return int(os.getenv("CHAIN_ID", DEFAULT_CHAIN_ID))
+
+
+def active():
+    """The chain this process runs (CHAIN_ID, set per worker by supervisor.py)."""
+    return get(active_id())
+
+
+def env(name, default=None):
+    """
+    Per-chain setting: NAME_<chain_id> wins; the plain NAME only applies to
+    the default chain, so a Polygon RPC_URLS never leaks into another chain.
+    """
+    value = os.getenv(f"{name}_{active_id()}")
+    if value:
+        return value
+    if active_id() == DEFAULT_CHAIN_ID:
+        return os.getenv(name, default)
+    return default
+
+
+def path_for(chain_id, filename):
+    """
+    Where a chain keeps a local file. The default chain keeps the original
+    top-level paths; others get chains/<name>/ so no two workers share a DB,
+    risk state or snapshot. Creates nothing (the dashboard reads through it).
+    """
+    chain = get(chain_id)
+    if chain.chain_id == DEFAULT_CHAIN_ID:
+        return os.path.join(BASE_DIR, filename)
+    return os.path.join(BASE_DIR, "chains", chain.name, filename)
+
+
+def data_path(filename):
+    """Where this process's chain keeps a local file; its directory is created."""
+    path = path_for(active_id(), filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+# ================= STATUS =================
+
+STATUS_COLUMNS = ("name", "pid", "status", "block", "equity", "positions", "restarts", "error")
+
+_status_ready = False
+
+
+def _status_conn():
+    global _status_ready
+    conn = sqlite3.connect(SHARED_DB_FILE, timeout=10)
+    if not _status_ready:
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS chain_status (
+                chain_id INTEGER PRIMARY KEY,
+                name TEXT,
+                pid INTEGER,
+                status TEXT,
+                block INTEGER,
+                equity REAL,
+                positions INTEGER,
+                restarts INTEGER DEFAULT 0,
+                error TEXT,
+                updated_at INTEGER
+            )
+        """)
+        _status_ready = True
+    return conn
+
+
+def report_status(chain_id, **fields):
+    """Upserts the given columns of one chain's row; the others keep their value."""
+    unknown = set(fields) - set(STATUS_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown chain_status columns: {sorted(unknown)}")
+    fields["updated_at"] = int(time.time())
+    columns = ["chain_id", *fields]
+    conn = _status_conn()
+    with conn:
+        conn.execute(
+            f"INSERT INTO chain_status ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(chain_id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in fields)}",
+            (int(chain_id), *fields.values()),
+        )
+    conn.close()
@@ -1,20 +1,40 @@
 import os
 from dotenv import load_dotenv
 
+import chains
+
 load_dotenv()
 
-CHAIN_ID = int(os.getenv("CHAIN_ID", 137))
+CHAIN_ID = chains.active_id()
+CHAIN = chains.get(CHAIN_ID)     # deployments for this process's chain (chains.py)
 
-RPC_URL = os.getenv("RPC_URL")
+RPC_URL = chains.env("RPC_URL")
 PRIVATE_KEY = os.getenv("PRIVATE_KEY")
 WALLET_ADDRESS = os.getenv("WALLET_ADDRESS")
 
-if not RPC_URL or not PRIVATE_KEY or not WALLET_ADDRESS:
-    raise RuntimeError("Missing environment variables")
+# Comma-separated failover list; RPC_URL alone still works. Other chains
+# read RPC_URLS_<chain_id> (e.g. RPC_URLS_42161).
+RPC_URLS = [u.strip() for u in (chains.env("RPC_URLS") or RPC_URL or "").split(",") if u.strip()]
+RPC_URL = RPC_URL or (RPC_URLS[0] if RPC_URLS else None)
+
+# Record/replay (see recorder.py / replay_server.py)
+RECORD_FILE = os.getenv("RECORD_FILE")      # capture live RPC + HTTP traffic here
+REPLAY_URL = os.getenv("REPLAY_URL")        # serve everything from a local stand-in
+
+if REPLAY_URL:
+    # Offline runs: nothing is real, so placeholder secrets are fine
+    RPC_URLS = [REPLAY_URL.rstrip("/") + "/rpc"]
+    RPC_URL = RPC_URLS[0]
+    PRIVATE_KEY = PRIVATE_KEY or "0x" + "11" * 32
+    WALLET_ADDRESS = WALLET_ADDRESS or "0x0000000000000000000000000000000000000001"
+
+if not RPC_URLS or not PRIVATE_KEY or not WALLET_ADDRESS:
+    raise RuntimeError(f"Missing environment variables ({CHAIN.name})")
 
 # ================= TOKENS =================
 
-USDC = "0x3c499c542cEF5E3811e1192ce70d8cC03d5c3359"
+USDC = CHAIN.usdc
+NATIVE = CHAIN.native       # gas token: balances row and its own "address" in TOKENS_TO_TRACK
 
 # ================= UNISWAP V3 =================
 
@@ -1,28 +1,255 @@
 # dashboard/app.py
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-from fastapi.templating import Jinja2Templates
-import json
-from pathlib import Path
+import asyncio
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse, RedirectResponse, Response, StreamingResponse
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+import os
+import re
+import time
+
+import chains
+import metrics
+from profiler import PROFILE_DIR, list_profiles
+from equity_store import EquityStore, STORE_FILE, KIND_POINT
+
+from dashboard.db import pool, pool_for, close_all, DB_NAME
+from dashboard.queries import get_summary, SUMMARY_TTL
+from dashboard.trades import trade_page, export_csv, export_ndjson, CursorError, PAGE_SIZE
+from dashboard.logstream import LogBroadcaster, tail_lines, sse_event, LOG_NAME
+from dashboard.live import ChangeFeed
+from dashboard.downsample import lttb
+from dashboard.equity_data import load_equity, DEFAULT_MAX_POINTS
+
+# Single ASGI dashboard: every view is a native async route, SQLite reads go
+# through the aiosqlite pool and templates render with Jinja's async mode.
+# Trades, summary, equity, metrics, logs and the live feed are per chain
+# worker: `?chain=` (id or name) picks which chain's files they read,
+# defaulting to CHAIN_ID.
+
+CHAIN_STALE_AFTER = 60      # seconds without a heartbeat before a chain shows as stale
+
+PROFILE_NAME = re.compile(r"profile-\d{8}-\d{6}\.(svg|folded)")
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
 
 app = FastAPI()
-templates = Jinja2Templates(directory="templates")
+templates = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    enable_async=True,
+)
+
+
+async def render(name, **context):
+    return HTMLResponse(await templates.get_template(name).render_async(**context))
+
+
+def chain_param(chain: str = Query(None, description="chain id or name; defaults to CHAIN_ID")):
+    try:
+        return chains.lookup(chain) if chain else chains.active()
+    except RuntimeError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await close_all()
+
+# ================= VIEWS =================
+
+@app.get("/")
+async def index(chain: chains.Chain = Depends(chain_param)):
+    summary, etag = await get_summary(pool_for(chain))
+    return await render("index.html", **summary)
+
+@app.get("/dashboard/")
+async def legacy_dashboard():
+    return RedirectResponse("/")
+
+@app.get("/equity")
+async def equity_view(days: float = Query(1, gt=0, le=3650), chain: chains.Chain = Depends(chain_param)):
+    now = time.time()
+    data = await load_equity(now - days * 86400, now, db=pool_for(chain))
+    return await render("equity.html", equity_data=data)
+
+# ================= JSON API =================
+
+@app.get("/api/summary")
+async def api_summary(request: Request, chain: chains.Chain = Depends(chain_param)):
+    summary, etag = await get_summary(pool_for(chain))
+    headers = {"ETag": f'"{etag}"', "Cache-Control": f"max-age={SUMMARY_TTL}"}
+    if request.headers.get("if-none-match", "").strip() in (f'"{etag}"', etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(summary, headers=headers)
+
+@app.get("/api/chains")
+async def api_chains():
+    """One row per chain worker (supervisor.py), from the shared chain_status table."""
+    now = time.time()
+    rows = await pool.fetchall("SELECT * FROM chain_status ORDER BY chain_id")
+    return {"chains": [{**dict(r), "stale": now - (r["updated_at"] or 0) > CHAIN_STALE_AFTER} for r in rows]}
+
+def trade_filters(
+    pair: str = None,
+    side: str = Query(None, pattern="^(BUY|SELL|buy|sell)$"),
+    strategy_tag: str = None,
+    start: int = Query(None, alias="from"),
+    end: int = Query(None, alias="to"),
+):
+    return {"pair": pair, "side": side, "strategy_tag": strategy_tag, "start": start, "end": end}
+
+@app.get("/api/trades")
+async def trades(
+    filters: dict = Depends(trade_filters),
+    cursor: str = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=500),
+    chain: chains.Chain = Depends(chain_param),
+):
+    """Newest-first trade history; pass `next_cursor` back as `cursor` for the next page."""
+    try:
+        return await trade_page(limit=limit, cursor=cursor, db=pool_for(chain), **filters)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-SNAPSHOT_FILE = Path("portfolio_snapshots.json")
+@app.get("/api/trades/export")
+async def trades_export(
+    filters: dict = Depends(trade_filters),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    chain: chains.Chain = Depends(chain_param),
+):
+    """Streams every matching trade as CSV or NDJSON, row by row."""
+    db = pool_for(chain)
+    if format == "ndjson":
+        body, media_type = export_ndjson(db=db, **filters), "application/x-ndjson"
+    else:
+        body, media_type = export_csv(db=db, **filters), "text/csv"
+    return StreamingResponse(body, media_type=media_type, headers={
+        "Content-Disposition": f"attachment; filename=trades.{format}"
+    })
+
+MAX_POINTS = 288
+HISTORY_RANGE = 86400
+
+_equity_stores = {}         # store path -> read-only EquityStore
+
+def get_equity_store(chain):
+    path = chains.path_for(chain.chain_id, os.path.basename(STORE_FILE))
+    if path not in _equity_stores and os.path.exists(path):
+        _equity_stores[path] = EquityStore(path, readonly=True)
+    return _equity_stores.get(path)
+
+def _portfolio_history(chain, start, end, max_points):
+    store = get_equity_store(chain)
+    if store is None:
+        return {"t": [], "equity": [], "initial": None}
+
+    end = end or time.time()
+    start = start if start is not None else end - HISTORY_RANGE
+    points = [r for r in store.read_range(start, end) if r[2] == KIND_POINT]
+
+    ts, equity = lttb([r[0] for r in points], [r[1] for r in points], max_points)
+    initial = store.get_initial()
+    return {
+        "t": [int(t) for t in ts],
+        "equity": [float(v) for v in equity],
+        "initial": {"t": int(initial[0]), "equity": initial[1]} if initial else None,
+    }
 
 @app.get("/api/portfolio/history")  # Use @app.get instead of @app.route
-async def portfolio_history():
-    if not SNAPSHOT_FILE.exists():
-        return JSONResponse(content=[])
-
-    data = json.loads(SNAPSHOT_FILE.read_text())
-
-    result = [
-        {
-            "time": d["ts"],
-            "equity": d["value"],
-            "type": d["type"]
-        }
-        for d in data
-    ]
-    return JSONResponse(content=result)
+async def portfolio_history(
+    start: float = Query(None, alias="from"),
+    end: float = Query(None, alias="to"),
+    max_points: int = Query(MAX_POINTS, ge=3, le=5000),
+    chain: chains.Chain = Depends(chain_param),
+):
+    """Columnar growth series for [from, to] (epoch seconds, default last 24h)."""
+    return await asyncio.to_thread(_portfolio_history, chain, start, end, max_points)
+
+@app.get("/api/equity/history")
+async def equity_history(
+    start: float = Query(None, alias="from"),
+    end: float = Query(None, alias="to"),
+    max_points: int = Query(DEFAULT_MAX_POINTS, ge=3, le=5000),
+    chain: chains.Chain = Depends(chain_param),
+):
+    """Columnar equity series from portfolio_snapshots and its rollup tiers."""
+    return await load_equity(start, end, max_points, db=pool_for(chain))
+
+@app.get("/metrics")
+async def metrics_endpoint(chain: chains.Chain = Depends(chain_param)):
+    """Prometheus text for the bot's stage latencies and counters (flushed by the bot every few seconds)."""
+    path = chains.path_for(chain.chain_id, os.path.basename(metrics.METRICS_FILE))
+    snap = await asyncio.to_thread(metrics.read_snapshot, path)
+    return PlainTextResponse(metrics.render_prometheus(snap),
+                             media_type="text/plain; version=0.0.4")
+
+@app.get("/profiles")
+async def profiles():
+    """Recent profiler dumps, newest first."""
+    return {"profiles": await asyncio.to_thread(list_profiles)}
+
+@app.get("/profiles/{name}")
+async def profile_file(name: str):
+    if not PROFILE_NAME.fullmatch(name):
+        raise HTTPException(status_code=404)
+    path = os.path.join(PROFILE_DIR, name)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404)
+    media_type = "image/svg+xml" if name.endswith(".svg") else "text/plain"
+    return FileResponse(path, media_type=media_type)
+
+log_broadcasters = {}       # log path -> LogBroadcaster
+
+def log_path(chain):
+    return chains.path_for(chain.chain_id, LOG_NAME)
+
+@app.get("/logs")
+async def logs(chain: chains.Chain = Depends(chain_param)):
+    last_logs = await asyncio.to_thread(tail_lines, log_path(chain))
+    last_logs.reverse()
+    return {"logs": last_logs or ["No logs yet..."]}
+
+@app.get("/logs/stream")
+async def logs_stream(request: Request, chain: chains.Chain = Depends(chain_param)):
+    path = log_path(chain)
+    log_broadcaster = log_broadcasters.setdefault(path, LogBroadcaster(path))
+
+    async def events():
+        for line in await asyncio.to_thread(tail_lines, path):
+            yield sse_event(line)
+        queue = log_broadcaster.subscribe()
+        try:
+            while not await request.is_disconnected():
+                try:
+                    line = await asyncio.wait_for(queue.get(), timeout=15)
+                    yield sse_event(line)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            log_broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+change_feeds = {}           # DB path -> ChangeFeed
+
+@app.get("/api/stream")
+async def live_stream(request: Request, chain: chains.Chain = Depends(chain_param)):
+    """Balance, trade and equity deltas pushed as the bot writes them."""
+    path = chains.path_for(chain.chain_id, DB_NAME)
+    change_feed = change_feeds.setdefault(path, ChangeFeed(path))
+
+    async def events():
+        queue = change_feed.subscribe()
+        try:
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            change_feed.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
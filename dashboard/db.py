@@ -0,0 +1,113 @@
+import os
+import asyncio
+import aiosqlite
+
+import chains
+
+# Small pool of read-only aiosqlite connections. Each connection runs its
+# queries on its own thread, so the event loop never blocks on SQLite and
+# concurrent viewers are spread over POOL_SIZE connections. `pool` reads the
+# shared DB (chain_status, and the default chain's trades); pool_for() gives
+# every other chain worker's DB its own pool.
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_FILE = os.path.join(BASE_DIR, "trader.db")
+DB_NAME = "trader.db"           # per chain, see chains.path_for
+
+POOL_SIZE = 4
+CONNECT_TIMEOUT = 2
+
+
+async def connect_ro(path=DB_FILE):
+    conn = await aiosqlite.connect(f"file:{path}?mode=ro", uri=True, timeout=CONNECT_TIMEOUT)
+    conn.row_factory = aiosqlite.Row
+    return conn
+
+
+class AsyncSQLitePool:
+    def __init__(self, size=POOL_SIZE, path=DB_FILE):
+        self.size = size
+        self.path = path
+        self._idle = asyncio.Queue()
+        self._opened = 0
+        self._lock = asyncio.Lock()
+
+    async def _acquire(self):
+        if self._idle.empty():
+            async with self._lock:
+                if self._opened < self.size:
+                    self._opened += 1
+                    try:
+                        return await connect_ro(self.path)
+                    except Exception:
+                        self._opened -= 1
+                        raise
+        return await self._idle.get()
+
+    async def _release(self, conn, broken=False):
+        if broken:
+            self._opened -= 1
+            try:
+                await conn.close()
+            except Exception:
+                pass
+        else:
+            self._idle.put_nowait(conn)
+
+    async def fetchall(self, sql, params=()):
+        try:
+            conn = await self._acquire()
+        except Exception as e:
+            # DB not created yet by the bot
+            print(f"⚠️ Dashboard query failed: {e}")
+            return []
+
+        try:
+            async with conn.execute(sql, params) as cur:
+                rows = await cur.fetchall()
+        except aiosqlite.OperationalError as e:
+            print(f"⚠️ Dashboard query failed: {e}")
+            await self._release(conn, broken=True)
+            return []
+        await self._release(conn)
+        return rows
+
+    async def stream(self, sql, params=(), chunk=500):
+        """Yields rows as they are read instead of materialising the whole result."""
+        conn = await self._acquire()
+        broken = False
+        try:
+            async with conn.execute(sql, params) as cur:
+                while True:
+                    rows = await cur.fetchmany(chunk)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield row
+        except aiosqlite.OperationalError:
+            broken = True
+            raise
+        finally:
+            await self._release(conn, broken=broken)
+
+    async def close(self):
+        while not self._idle.empty():
+            await (self._idle.get_nowait()).close()
+        self._opened = 0
+
+
+pool = AsyncSQLitePool()
+_pools = {DB_FILE: pool}
+
+
+def pool_for(chain):
+    """The read pool for one chain's trader.db."""
+    path = chains.path_for(chain.chain_id, DB_NAME)
+    if path not in _pools:
+        _pools[path] = AsyncSQLitePool(path=path)
+    return _pools[path]
+
+
+async def close_all():
+    for p in _pools.values():
+        await p.close()
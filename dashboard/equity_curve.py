@@ -1,31 +1,16 @@
-import sqlite3
+import time
 import matplotlib.pyplot as plt
 from datetime import datetime
-import os
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DB_FILE = os.path.join(BASE_DIR, "trader.db")
+from rollups import query_equity
 
-def plot_equity(limit=1000):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-
-    c.execute("""
-        SELECT timestamp, total_equity
-        FROM portfolio_snapshots
-        ORDER BY timestamp DESC
-        LIMIT ?
-    """, (limit,))
-
-    rows = c.fetchall()
-    conn.close()
+def plot_equity(days=1):
+    rows = query_equity(start=time.time() - days * 86400)
 
     if not rows:
         print("No portfolio snapshots found.")
         return
 
-    rows.reverse()  # chronological order
-
     times = [datetime.fromtimestamp(r[0]) for r in rows]
     equity = [r[1] for r in rows]
 
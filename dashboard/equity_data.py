@@ -1,30 +1,29 @@
-import sqlite3
-import os
-from datetime import datetime
+import time
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DB_FILE = os.path.join(BASE_DIR, "trader.db")
+from rollups import equity_sql
+from dashboard.db import pool
+from dashboard.downsample import lttb, bucket_width
 
-def load_equity(limit=1000):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
+DEFAULT_RANGE = 86400
+DEFAULT_MAX_POINTS = 500
 
-    c.execute("""
-        SELECT timestamp, total_equity
-        FROM portfolio_snapshots
-        ORDER BY timestamp DESC
-        LIMIT ?
-    """, (limit,))
 
-    rows = c.fetchall()
-    conn.close()
+async def load_equity(start=None, end=None, max_points=DEFAULT_MAX_POINTS, db=pool):
+    """
+    Equity history for [start, end] as columnar arrays, at most `max_points`
+    long: coarse time bucketing in SQL, then LTTB to keep the visual shape.
+    """
+    end = end or time.time()
+    start = start if start is not None else end - DEFAULT_RANGE
 
-    rows.reverse()
+    sql, params = equity_sql(start, end, bucket=bucket_width(start, end, max_points))
+    rows = await db.fetchall(sql, params)
+    if not rows:
+        return {"t": [], "equity": []}
 
-    return [
-        {
-            "time": datetime.fromtimestamp(ts).isoformat(),
-            "equity": equity
-        }
-        for ts, equity in rows
-    ]
+    ts, equity = zip(*rows)
+    ts, equity = lttb(ts, equity, max_points)
+    return {
+        "t": [int(t) for t in ts],
+        "equity": [round(float(v), 4) for v in equity],
+    }
@@ -0,0 +1,127 @@
+import json
+import asyncio
+import aiosqlite
+
+from dashboard.db import connect_ro, DB_FILE
+from dashboard.logstream import sse_event, SUBSCRIBER_QUEUE
+
+# Push channel for the dashboard. One watcher per process checks SQLite's
+# data_version (free when nothing changed) and, only when the bot has
+# committed something, reads what is new and broadcasts small deltas to
+# every connected client. One feed per chain DB (dashboard/app.py).
+
+POLL_INTERVAL = 1.0
+
+
+class ChangeFeed:
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.subscribers = set()
+        self._task = None
+        self.data_version = None
+        self.balances = {}
+        self.last_trade_id = None
+        self.last_snapshot_id = None
+        # data_version is per connection, so the feed keeps its own
+        self._conn = None
+
+    async def query(self, sql, params=()):
+        try:
+            if self._conn is None:
+                self._conn = await connect_ro(self.path)
+            async with self._conn.execute(sql, params) as cur:
+                return await cur.fetchall()
+        except aiosqlite.OperationalError as e:
+            print(f"⚠️ Live feed query failed: {e}")
+            if self._conn is not None:
+                await self._conn.close()
+            self._conn = None
+            self.data_version = None
+            return []
+
+    # ---------- subscribers ----------
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE)
+        self.subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, event, payload):
+        message = sse_event(json.dumps(payload, default=str), event=event)
+        for queue in list(self.subscribers):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    # ---------- change detection ----------
+
+    async def _version(self):
+        rows = await self.query("PRAGMA data_version")
+        return rows[0][0] if rows else None
+
+    async def _prime(self):
+        """Marks everything already in the DB as seen so only new changes are pushed."""
+        self.balances = {r["asset"]: dict(r) for r in await self.query("SELECT asset, amount, price FROM balances")}
+        # No row means the read failed (DB or table not there yet): stay
+        # unprimed and retry, rather than replaying whole tables from id 0
+        row = await self.query("SELECT COALESCE(MAX(id), 0) FROM trades")
+        self.last_trade_id = row[0][0] if row else None
+        row = await self.query("SELECT COALESCE(MAX(id), 0) FROM portfolio_snapshots")
+        self.last_snapshot_id = row[0][0] if row else None
+
+    async def _collect(self):
+        events = []
+
+        balances = {r["asset"]: dict(r) for r in await self.query("SELECT asset, amount, price FROM balances")}
+        changed = [b for asset, b in balances.items() if self.balances.get(asset) != b]
+        if changed:
+            for b in changed:
+                b["usd_value"] = (b["amount"] or 0) * (b["price"] or 0)
+            total = sum((b["amount"] or 0) * (b["price"] or 0) for b in balances.values())
+            events.append(("balance", {"changed": changed, "total_portfolio": round(total, 2)}))
+        self.balances = balances
+
+        trades = [dict(r) for r in await self.query(
+            "SELECT * FROM trades WHERE id > ? ORDER BY id", (self.last_trade_id,)
+        )]
+        if trades:
+            self.last_trade_id = trades[-1]["id"]
+            events.append(("trade", trades))
+
+        points = await self.query(
+            "SELECT id, timestamp, total_equity FROM portfolio_snapshots WHERE id > ? ORDER BY id",
+            (self.last_snapshot_id,)
+        )
+        if points:
+            self.last_snapshot_id = points[-1]["id"]
+            events.append(("equity", {
+                "t": [p["timestamp"] for p in points],
+                "equity": [p["total_equity"] for p in points],
+            }))
+
+        return events
+
+    async def _poll(self):
+        version = await self._version()
+        if self.last_trade_id is None or self.last_snapshot_id is None:
+            await self._prime()
+            self.data_version = version
+            return []
+        if version == self.data_version:
+            return []
+        self.data_version = version
+        return await self._collect()
+
+    async def _run(self):
+        while self.subscribers:
+            try:
+                for event, payload in await self._poll():
+                    self.publish(event, payload)
+            except Exception as e:
+                print(f"⚠️ Live feed poll failed: {e}")
+            await asyncio.sleep(POLL_INTERVAL)
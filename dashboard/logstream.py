@@ -0,0 +1,111 @@
+import os
+import asyncio
+
+# Log viewer backend: constant-cost tail reads (seek backward from EOF) and a
+# single follower per process that fans new lines out to every SSE viewer.
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOG_FILE = os.path.join(BASE_DIR, "bot_activity.log")
+LOG_NAME = "bot_activity.log"   # per chain, see chains.path_for
+
+TAIL_LINES = 20
+BLOCK_SIZE = 4096
+POLL_INTERVAL = 0.5
+SUBSCRIBER_QUEUE = 500
+
+# ================= TAIL =================
+
+def tail_lines(path=LOG_FILE, n=TAIL_LINES):
+    """Last `n` lines of a file, reading only as many blocks from the end as needed."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return []
+
+    with f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b""
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(BLOCK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    return [line.strip() for line in lines[-n:]]
+
+# ================= FOLLOW =================
+
+class LogFollower:
+    """
+    Follows a log file by inode so RotatingFileHandler rollovers (rename or
+    truncate-in-place) restart reading from the top of the new file.
+    """
+
+    def __init__(self, path=LOG_FILE):
+        self.path = path
+        self.inode = None
+        self.offset = 0
+        self.partial = b""
+
+    def read_new(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+
+        if self.inode is None:
+            # First look: start at EOF, history comes from tail_lines()
+            self.inode, self.offset = st.st_ino, st.st_size
+            return []
+
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            self.inode, self.offset, self.partial = st.st_ino, 0, b""
+
+        if st.st_size == self.offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(st.st_size - self.offset)
+        self.offset += len(chunk)
+
+        data = self.partial + chunk
+        *complete, self.partial = data.split(b"\n")
+        return [line.decode("utf-8", errors="replace").strip() for line in complete if line.strip()]
+
+
+class LogBroadcaster:
+    """One polling follower per process, however many viewers are attached."""
+
+    def __init__(self, path=LOG_FILE):
+        self.follower = LogFollower(path)
+        self.subscribers = set()
+        self._task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE)
+        self.subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    async def _run(self):
+        while self.subscribers:
+            for line in self.follower.read_new():
+                for queue in list(self.subscribers):
+                    if queue.full():
+                        # Slow viewer: drop its oldest line rather than grow without bound
+                        queue.get_nowait()
+                    queue.put_nowait(line)
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+def sse_event(data, event=None):
+    lines = [f"event: {event}"] if event else []
+    lines += [f"data: {part}" for part in str(data).split("\n")]
+    return "\n".join(lines) + "\n\n"
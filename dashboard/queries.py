@@ -0,0 +1,60 @@
+import json
+import time
+import asyncio
+import hashlib
+
+from dashboard.db import pool
+
+# Read-only data layer shared by the dashboard views. The summary payload is
+# computed once per TTL and shared by every tab, the JSON endpoint and the
+# HTML render.
+
+SUMMARY_TTL = 5          # seconds
+RECENT_TRADES = 20
+
+_cache = {}             # DB path -> {"payload", "etag", "ts"}
+_cache_lock = asyncio.Lock()
+
+# ================= SUMMARY =================
+
+async def build_summary(db=pool):
+    balances = [dict(r) for r in await db.fetchall("""
+        SELECT asset, amount, price,
+               COALESCE(amount, 0) * COALESCE(price, 0) AS usd_value
+        FROM balances
+    """)]
+
+    trades = [dict(r) for r in await db.fetchall(
+        "SELECT * FROM trades ORDER BY timestamp DESC LIMIT ?", (RECENT_TRADES,)
+    )]
+
+    today = int(time.time()) - 86400
+    pnl = await db.fetchall("""
+        SELECT
+            COALESCE(SUM(CASE WHEN timestamp > ? THEN amount_out - amount_in END), 0) AS daily,
+            COALESCE(SUM(amount_out - amount_in), 0) AS total
+        FROM trades
+    """, (today,))
+    daily, total = (pnl[0]["daily"], pnl[0]["total"]) if pnl else (0, 0)
+
+    return {
+        "generated_at": int(time.time()),
+        "balances": balances,
+        "total_portfolio": round(sum(b["usd_value"] for b in balances), 2),
+        "trades": trades,
+        "daily_pnl": round(float(daily), 4),
+        "total_pnl": round(float(total), 4),
+    }
+
+
+async def get_summary(db=pool):
+    """Returns (payload, etag) for one chain's DB, recomputed at most once per SUMMARY_TTL."""
+    async with _cache_lock:
+        cache = _cache.setdefault(db.path, {"payload": None, "etag": None, "ts": 0.0})
+        if cache["payload"] is None or time.time() - cache["ts"] >= SUMMARY_TTL:
+            payload = await build_summary(db)
+            body = json.dumps(payload, sort_keys=True, default=str)
+            cache["payload"] = payload
+            cache["etag"] = hashlib.sha1(body.encode()).hexdigest()
+            cache["ts"] = time.time()
+        return cache["payload"], cache["etag"]
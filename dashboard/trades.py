@@ -0,0 +1,94 @@
+import io
+import csv
+import json
+
+from dashboard.db import pool
+
+# Trade history: newest first, keyset-paginated on (timestamp, id) so every
+# page costs the same no matter how far back it is. Each filter combination
+# is served by one of the (column, timestamp, id) indexes from init_db.
+
+TRADE_COLUMNS = [
+    "id", "timestamp", "pair", "side", "amount_in", "amount_out",
+    "price", "qty", "gas_used", "gas_cost", "tx", "strategy_tag",
+    "equity_before", "equity_after",
+]
+PAGE_SIZE = 50
+
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(row):
+    return f"{row['timestamp']}:{row['id']}"
+
+
+def decode_cursor(cursor):
+    try:
+        ts, trade_id = cursor.split(":")
+        return int(ts), int(trade_id)
+    except (AttributeError, ValueError):
+        raise CursorError(f"Invalid cursor: {cursor!r}")
+
+
+def build_query(pair=None, side=None, strategy_tag=None, start=None, end=None, cursor=None, limit=None):
+    where, params = [], []
+    if pair:
+        where.append("pair = ?")
+        params.append(pair)
+    if side:
+        where.append("side = ?")
+        params.append(side.upper())
+    if strategy_tag:
+        where.append("strategy_tag = ?")
+        params.append(strategy_tag)
+    if start is not None:
+        where.append("timestamp >= ?")
+        params.append(int(start))
+    if end is not None:
+        where.append("timestamp <= ?")
+        params.append(int(end))
+    if cursor:
+        where.append("(timestamp, id) < (?, ?)")
+        params.extend(decode_cursor(cursor))
+
+    sql = f"SELECT {', '.join(TRADE_COLUMNS)} FROM trades"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY timestamp DESC, id DESC"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
+
+async def trade_page(limit=PAGE_SIZE, db=pool, **filters):
+    # One extra row tells us whether another page exists
+    sql, params = build_query(limit=limit + 1, **filters)
+    rows = [dict(r) for r in await db.fetchall(sql, params)]
+
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return {"trades": rows[:limit], "next_cursor": next_cursor}
+
+# ================= EXPORT =================
+
+async def export_ndjson(db=pool, **filters):
+    sql, params = build_query(**filters)
+    async for row in db.stream(sql, params):
+        yield json.dumps(dict(row)) + "\n"
+
+
+async def export_csv(db=pool, **filters):
+    sql, params = build_query(**filters)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    writer.writerow(TRADE_COLUMNS)
+    async for row in db.stream(sql, params):
+        writer.writerow(tuple(row))
+        if buf.tell() > 64 * 1024:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
@@ -0,0 +1,165 @@
+import os
+import json
+import struct
+import threading
+from collections import deque
+from datetime import datetime
+
+import chains
+
+# Append-only equity series: a small header followed by fixed-size binary
+# records (timestamp, value, kind). Appends are O(1) and fsync'd, a torn
+# trailing record left by a crash is dropped on open, the newest records
+# are kept in memory, and range reads binary-search the file by timestamp.
+
+STORE_FILE = chains.data_path("portfolio_equity.bin")
+LEGACY_JSON = chains.data_path("portfolio_snapshots.json")
+
+MAGIC = b"EQTY\x01\x00\x00\x00"
+RECORD = struct.Struct("<ddB7x")      # ts (epoch seconds), value, kind
+RECORD_SIZE = RECORD.size
+
+KIND_INITIAL = 0
+KIND_POINT = 1
+KIND_NAMES = {KIND_INITIAL: "initial", KIND_POINT: "point"}
+
+TAIL_SIZE = 512
+
+
+class EquityStore:
+    def __init__(self, path=STORE_FILE, tail_size=TAIL_SIZE, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self.tail = deque(maxlen=tail_size)
+        self.initial = None
+        self._lock = threading.Lock()
+        self._fd = None
+        self._open()
+
+    # ---------- open / recovery ----------
+
+    def _open(self):
+        if self.readonly:
+            if os.path.exists(self.path):
+                self._load()
+            return
+
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        if new:
+            os.write(self._fd, MAGIC)
+            os.fsync(self._fd)
+        else:
+            size = os.fstat(self._fd).st_size
+            torn = (size - len(MAGIC)) % RECORD_SIZE
+            if torn:
+                # Crash mid-append: drop the incomplete trailing record
+                os.ftruncate(self._fd, size - torn)
+                os.fsync(self._fd)
+        self._load()
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not an equity store")
+        n = self.count()
+        if n:
+            first = self._read_at(0)
+            if first[2] == KIND_INITIAL:
+                self.initial = first
+            self.tail.extend(self._read_slice(max(0, n - self.tail.maxlen), n))
+
+    # ---------- low-level reads ----------
+
+    def count(self):
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+        return max(0, (size - len(MAGIC)) // RECORD_SIZE)
+
+    def _read_slice(self, lo, hi):
+        if hi <= lo:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(len(MAGIC) + lo * RECORD_SIZE)
+            data = f.read((hi - lo) * RECORD_SIZE)
+        usable = len(data) - len(data) % RECORD_SIZE
+        return [RECORD.unpack_from(data, i) for i in range(0, usable, RECORD_SIZE)]
+
+    def _read_at(self, index):
+        rows = self._read_slice(index, index + 1)
+        return rows[0] if rows else None
+
+    def _bisect(self, ts, n, right=False):
+        """First record index with timestamp >= ts (> ts when right=True)."""
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_ts = self._read_at(mid)[0]
+            if mid_ts < ts or (right and mid_ts == ts):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    # ---------- public API ----------
+
+    def append(self, ts, value, kind=KIND_POINT):
+        if self.readonly:
+            raise RuntimeError("Equity store opened read-only")
+        record = (float(ts), float(value), kind)
+        with self._lock:
+            os.write(self._fd, RECORD.pack(*record))
+            os.fsync(self._fd)
+            self.tail.append(record)
+            if kind == KIND_INITIAL and self.initial is None:
+                self.initial = record
+
+    def get_initial(self):
+        # Read-only openers may have opened the file before the bot wrote it
+        if self.initial is None and self.count():
+            first = self._read_at(0)
+            if first[2] == KIND_INITIAL:
+                self.initial = first
+        return self.initial
+
+    def last_point(self):
+        for record in reversed(self.tail):
+            if record[2] == KIND_POINT:
+                return record
+        return None
+
+    def read_range(self, start=None, end=None, limit=None):
+        """Records with start <= ts <= end (oldest first); `limit` keeps the newest."""
+        n = self.count()
+        lo = self._bisect(start, n) if start is not None else 0
+        hi = self._bisect(end, n, right=True) if end is not None else n
+        if limit is not None:
+            lo = max(lo, hi - limit)
+        return self._read_slice(lo, hi)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def migrate_legacy_json(store, json_path=LEGACY_JSON):
+    """One-time import of the old portfolio_snapshots.json into an empty store."""
+    if store.count() or not os.path.exists(json_path):
+        return 0
+    try:
+        with open(json_path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return 0
+
+    rows = []
+    for d in data:
+        kind = KIND_INITIAL if d.get("type") == "initial" else KIND_POINT
+        rows.append((datetime.fromisoformat(d["ts"]).timestamp(), d["value"], kind))
+    rows.sort(key=lambda r: (r[2] != KIND_INITIAL, r[0]))
+    for ts, value, kind in rows:
+        store.append(ts, value, kind)
+    return len(rows)
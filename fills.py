@@ -0,0 +1,156 @@
+from eth_utils import keccak
+
+import accounts
+from config import USDC
+from state import record_trade
+
+# Exact fill accounting from a swap receipt. The wallet's own ERC20
+# Transfer logs give the amounts that actually left and reached it (fees,
+# slippage and fee-on-transfer tokens included); the pool's Swap log is the
+# fallback when a leg has no matching Transfer. Gas comes from gasUsed *
+# effectiveGasPrice, so nothing has to be re-read from the chain afterwards.
+
+TRANSFER_TOPIC = "0x" + keccak(text="Transfer(address,address,uint256)").hex()
+SWAP_TOPIC = "0x" + keccak(text="Swap(address,address,int256,int256,uint160,uint128,int24)").hex()
+
+NATIVE_DECIMALS = 18
+
+
+class Fill:
+    def __init__(self, tx, token_in, token_out, amount_in, amount_out, gas_used, gas_cost, block, pool=None):
+        self.tx = tx
+        self.token_in = token_in
+        self.token_out = token_out
+        self.amount_in = amount_in          # human units, what left the wallet
+        self.amount_out = amount_out        # human units, what reached the wallet
+        self.gas_used = gas_used
+        self.gas_cost = gas_cost            # native token (config.NATIVE)
+        self.block = block
+        self.pool = pool
+
+    @property
+    def price(self):
+        """Effective USDC per token of this fill."""
+        if self.token_in == USDC.lower():
+            return self.amount_in / self.amount_out if self.amount_out else 0.0
+        return self.amount_out / self.amount_in if self.amount_in else 0.0
+
+    def __repr__(self):
+        return (f"Fill({self.tx}, in={self.amount_in}, out={self.amount_out}, "
+                f"price={self.price}, gas={self.gas_cost})")
+
+# ================= DECODING =================
+
+def _hex(value):
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    value = str(value).lower()
+    return value if value.startswith("0x") else "0x" + value
+
+
+def _int(value):
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return int(value, 16) if value.startswith("0x") else int(value)
+    return int(value)
+
+
+def _topic_address(topic):
+    return "0x" + _hex(topic)[-40:]
+
+
+def _words(data):
+    data = _hex(data)[2:]
+    return [data[i:i + 64] for i in range(0, len(data), 64)]
+
+
+def _signed(word):
+    value = int(word, 16)
+    return value - 2 ** 256 if value >= 2 ** 255 else value
+
+
+def _swap_amounts(log, token_in, token_out):
+    """(raw in, raw out) from a pool Swap log; positive amounts went into the pool."""
+    words = _words(log["data"])
+    if len(words) < 2:
+        return 0, 0
+    amount0, amount1 = _signed(words[0]), _signed(words[1])
+    # Uniswap orders the pair by address: token0 < token1
+    in_is_0 = token_in < token_out
+    raw_in, raw_out = (amount0, amount1) if in_is_0 else (amount1, amount0)
+    return max(raw_in, 0), max(-raw_out, 0)
+
+
+def decode_fill(receipt, token_in, token_out, decimals_in, decimals_out, wallet=None):
+    """
+    Returns the Fill for a successful exact-input swap receipt, or None when
+    the logs show no amount moving in either direction. `wallet` defaults to
+    the current account's.
+    """
+    wallet = wallet or accounts.current().wallet
+    token_in, token_out, wallet = token_in.lower(), token_out.lower(), wallet.lower()
+    raw_in = raw_out = 0
+    swap_in = swap_out = 0
+    pool = None
+
+    for log in receipt["logs"]:
+        topics = [_hex(t) for t in log["topics"]]
+        if not topics:
+            continue
+        address = _hex(log["address"])
+
+        if topics[0] == TRANSFER_TOPIC and len(topics) == 3:
+            sender, recipient = _topic_address(topics[1]), _topic_address(topics[2])
+            value = _int(_hex(log["data"]))
+            if address == token_in and sender == wallet:
+                raw_in += value
+            if address == token_out and recipient == wallet:
+                raw_out += value
+
+        elif topics[0] == SWAP_TOPIC:
+            pool = address
+            s_in, s_out = _swap_amounts(log, token_in, token_out)
+            swap_in += s_in
+            swap_out += s_out
+
+    raw_in = raw_in or swap_in
+    raw_out = raw_out or swap_out
+    if not raw_in or not raw_out:
+        return None
+
+    gas_used = _int(receipt.get("gasUsed"))
+    gas_price = _int(receipt.get("effectiveGasPrice") or receipt.get("gasPrice"))
+
+    return Fill(
+        tx=_hex(receipt["transactionHash"]),
+        token_in=token_in,
+        token_out=token_out,
+        amount_in=raw_in / 10 ** decimals_in,
+        amount_out=raw_out / 10 ** decimals_out,
+        gas_used=gas_used,
+        gas_cost=gas_used * gas_price / 10 ** NATIVE_DECIMALS,
+        block=_int(receipt.get("blockNumber")),
+        pool=pool,
+    )
+
+# ================= RECORDING =================
+
+def record(fill, symbol, side, strategy_tag=None):
+    """
+    Writes the fill to `trades` and applies it to `balances` in the same
+    transaction. amount_in / amount_out keep their USDC cash-flow meaning
+    (PnL is SUM(amount_out - amount_in)); the token leg goes to `qty`.
+    """
+    if side == "BUY":
+        usdc_in, usdc_out, qty = fill.amount_in, 0, fill.amount_out
+    else:
+        usdc_in, usdc_out, qty = 0, fill.amount_out, fill.amount_in
+
+    record_trade(
+        f"{symbol}/USDC", side, usdc_in, usdc_out, fill.price, fill.tx,
+        strategy_tag=strategy_tag,
+        qty=qty,
+        gas_used=fill.gas_used,
+        gas_cost=fill.gas_cost,
+    )
@@ -0,0 +1,200 @@
+import time
+import random
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from recorder import recorder, route
+
+# Shared HTTP client for exchange market data: one keep-alive session per
+# host, a token bucket per host kept in sync with the venue's weight
+# headers, bounded retries with jitter, and per-endpoint latency histograms.
+
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 0.25
+BACKOFF_CAP = 4.0
+RETRY_STATUS = {418, 429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 5.0       # a longer Retry-After (e.g. a 418 ban) fails calls instead of waiting
+
+# Per-host budgets: (capacity, refill per second, used-weight header, header window limit)
+HOST_LIMITS = {
+    # Binance: 6000 request weight per minute per IP
+    "api.binance.com": (6000, 6000 / 60, "X-MBX-USED-WEIGHT-1M", 6000),
+    # OKX public market data: 20 requests per 2 seconds per IP
+    "www.okx.com": (20, 10, None, None),
+}
+DEFAULT_LIMIT = (10, 5, None, None)
+
+
+class MarketDataError(Exception):
+    pass
+
+# ================= RATE LIMIT =================
+
+class TokenBucket:
+    def __init__(self, capacity, refill_rate):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+        self.updated = now
+
+    def reserve(self, cost=1):
+        """Takes `cost` tokens and returns how long the caller must wait before sending."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= cost
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.refill_rate
+
+    def sync_used(self, used, window_limit):
+        """Aligns the bucket with the venue's own count of weight used in the window."""
+        with self._lock:
+            self._refill(time.monotonic())
+            remaining = self.capacity * (1 - used / window_limit)
+            self.tokens = min(self.tokens, remaining)
+
+    def drain(self, seconds):
+        """Venue told us to back off: empty the bucket for `seconds`."""
+        with self._lock:
+            self.tokens = -seconds * self.refill_rate
+            self.updated = time.monotonic()
+
+    def block(self, seconds):
+        """Back-off too long to wait out: calls fail fast (blocked_for) until it ends."""
+        with self._lock:
+            self.blocked_until = time.monotonic() + seconds
+
+    def blocked_for(self):
+        return max(0.0, self.blocked_until - time.monotonic())
+
+# ================= CLIENT =================
+
+class MarketHTTP:
+    def __init__(self):
+        self._sessions = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _host_state(self, host):
+        with self._lock:
+            if host not in self._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=16)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+
+                capacity, rate, _, _ = HOST_LIMITS.get(host, DEFAULT_LIMIT)
+                self._buckets[host] = TokenBucket(capacity, rate)
+            return self._sessions[host], self._buckets[host]
+
+    def bucket(self, url):
+        return self._host_state(urlsplit(url).hostname)[1]
+
+    def observe(self, url, seconds):
+        parts = urlsplit(url)
+        metrics.observe("http", seconds, endpoint=f"{parts.hostname}{parts.path}")
+
+    def apply_headers(self, url, status, headers):
+        """Feeds venue rate-limit headers back into the host bucket."""
+        host = urlsplit(url).hostname
+        bucket = self._host_state(host)[1]
+        _, _, header, window_limit = HOST_LIMITS.get(host, DEFAULT_LIMIT)
+
+        if header and headers.get(header):
+            try:
+                bucket.sync_used(int(headers[header]), window_limit)
+            except ValueError:
+                pass
+
+        if status in (418, 429):
+            try:
+                retry_after = float(headers.get("Retry-After", 1))
+            except ValueError:
+                retry_after = 1.0
+            if retry_after > MAX_RETRY_AFTER:
+                bucket.block(retry_after)
+            else:
+                bucket.drain(retry_after)
+            return retry_after
+        return None
+
+    def get_json(self, url, params=None, timeout=10, cost=1, attempts=MAX_ATTEMPTS):
+        session, bucket = self._host_state(urlsplit(url).hostname)
+        last_error = None
+
+        for attempt in range(attempts):
+            blocked = bucket.blocked_for()
+            if blocked:
+                raise MarketDataError(f"{url}: venue asked us to back off for another {blocked:.0f}s")
+            wait = bucket.reserve(cost)
+            if wait > 0:
+                time.sleep(wait)
+
+            start = time.monotonic()
+            try:
+                res = session.get(route(url), params=params, timeout=timeout)
+            except requests.RequestException as e:
+                last_error = e
+            else:
+                self.observe(url, time.monotonic() - start)
+                retry_after = self.apply_headers(url, res.status_code, res.headers)
+
+                if res.status_code not in RETRY_STATUS:
+                    try:
+                        res.raise_for_status()
+                        data = res.json()
+                    except (requests.HTTPError, ValueError) as e:
+                        raise MarketDataError(f"{url}: {e}") from e
+                    if recorder:
+                        recorder.http(url, params, res.status_code, data, time.monotonic() - start)
+                    return data
+
+                last_error = MarketDataError(f"{url}: HTTP {res.status_code}")
+                if retry_after:
+                    # The drained bucket paces the retry; a longer ban fails above
+                    continue
+
+            if attempt < attempts - 1:
+                time.sleep(backoff(attempt))
+
+        raise MarketDataError(f"{url}: giving up after {attempts} attempts ({last_error})")
+
+    def stats(self):
+        return {
+            h["labels"]["endpoint"]: {
+                "count": h["count"],
+                "mean_ms": round(h["sum"] / h["count"] * 1000, 1) if h["count"] else None,
+                **{f"p{int(q * 100)}": metrics.quantile(h["bounds"], h["counts"], q) for q in metrics.QUANTILES},
+            }
+            for h in metrics.snapshot()["histograms"]
+            if h["stage"] == "http"
+        }
+
+
+def backoff(attempt):
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = MarketHTTP()
+        return _client
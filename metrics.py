@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import bisect
+import tempfile
+import threading
+from functools import wraps
+from contextlib import contextmanager
+
+import chains
+
+# Low-overhead in-process instrumentation: latency histograms per stage and
+# plain counters. The bot periodically writes a snapshot file which the
+# dashboard renders as Prometheus text at /metrics.
+
+METRICS_FILE = chains.data_path("metrics.json")
+
+# Bucket upper bounds in seconds (Prometheus style, +Inf implied)
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0]
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+# ================= HISTOGRAM =================
+
+class Histogram:
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.total += seconds
+        self.n += 1
+
+
+def quantile(bounds, counts, q):
+    """Estimates the q-th quantile by linear interpolation inside its bucket."""
+    n = sum(counts)
+    if not n:
+        return None
+    target = q * n
+    seen = 0
+    for i, count in enumerate(counts):
+        if count and seen + count >= target:
+            lo = bounds[i - 1] if i > 0 else 0.0
+            if i >= len(bounds):
+                return lo
+            return lo + (bounds[i] - lo) * (target - seen) / count
+        seen += count
+    return bounds[-1]
+
+# ================= REGISTRY =================
+
+_histograms = {}
+_counters = {}
+_lock = threading.Lock()
+
+
+def observe(stage, seconds, **labels):
+    key = _key(stage, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = Histogram()
+        hist.observe(seconds)
+
+
+def inc(name, n=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + n
+
+
+@contextmanager
+def timer(stage, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start, **labels)
+
+
+def timed(stage, **labels):
+    """Decorator form of timer()."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(stage, time.perf_counter() - start, **labels)
+        return wrapper
+    return decorator
+
+# ================= EXPORT =================
+
+def snapshot():
+    with _lock:
+        return {
+            "ts": time.time(),
+            "histograms": [
+                {
+                    "stage": stage,
+                    "labels": dict(labels),
+                    "bounds": hist.bounds,
+                    "counts": list(hist.counts),
+                    "sum": hist.total,
+                    "count": hist.n,
+                }
+                for (stage, labels), hist in _histograms.items()
+            ],
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in _counters.items()
+            ],
+        }
+
+
+def write_snapshot(path=METRICS_FILE):
+    """Atomic write so the dashboard never reads a half-written file."""
+    data = json.dumps(snapshot())
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".metrics-")
+    with os.fdopen(fd, "w") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def read_snapshot(path=METRICS_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _labels(labels, **extra):
+    items = {**labels, **extra}
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in items.items())
+    return "{" + body + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt(bound):
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def render_prometheus(snap):
+    lines = []
+    if not snap:
+        return "# no metrics snapshot yet\n"
+
+    lines.append("# HELP bot_stage_seconds Latency of bot stages and RPC/HTTP calls")
+    lines.append("# TYPE bot_stage_seconds histogram")
+    for h in snap["histograms"]:
+        labels = {"stage": h["stage"], **h["labels"]}
+        cumulative = 0
+        for bound, count in zip(h["bounds"] + [float("inf")], h["counts"]):
+            cumulative += count
+            lines.append(f"bot_stage_seconds_bucket{_labels(labels, le=_fmt(bound))} {cumulative}")
+        lines.append(f"bot_stage_seconds_sum{_labels(labels)} {h['sum']}")
+        lines.append(f"bot_stage_seconds_count{_labels(labels)} {h['count']}")
+
+    lines.append("# HELP bot_stage_seconds_quantile Estimated latency quantiles from the histogram buckets")
+    lines.append("# TYPE bot_stage_seconds_quantile gauge")
+    for h in snap["histograms"]:
+        labels = {"stage": h["stage"], **h["labels"]}
+        for q in QUANTILES:
+            value = quantile(h["bounds"], h["counts"], q)
+            if value is not None:
+                lines.append(f"bot_stage_seconds_quantile{_labels(labels, quantile=q)} {value}")
+
+    names = sorted({c["name"] for c in snap["counters"]})
+    for name in names:
+        lines.append(f"# TYPE bot_{name}_total counter")
+        for c in snap["counters"]:
+            if c["name"] == name:
+                lines.append(f"bot_{name}_total{_labels(c['labels'])} {c['value']}")
+
+    lines.append("# TYPE bot_metrics_snapshot_timestamp_seconds gauge")
+    lines.append(f"bot_metrics_snapshot_timestamp_seconds {snap['ts']}")
+    return "\n".join(lines) + "\n"
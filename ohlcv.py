@@ -1,37 +1,100 @@
-import requests
-import pandas as pd
+from __future__ import annotations
+
+import time
+import threading
+from typing import TYPE_CHECKING
+
+import metrics
+from market_http import get_client
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 BINANCE_KLINES = "https://api.binance.com/api/v3/klines"
+BINANCE_KLINES_WEIGHT = 2
 BINANCE_SYMBOL_MAP = {
     "WETH": "ETH",
     "WMATIC": "POL",
     "WBTC": "BTC",
 }
 
+OKX_TICKER = "https://www.okx.com/api/v5/market/ticker?instId={inst}"
+OKX_SYMBOL_MAP = {
+    "WMATIC": "POL",
+    "MATIC": "POL",
+    "WETH": "ETH",
+    "WBTC": "BTC",
+}
+
 TF_MAP = {
     "15m": "15m",
     "1h": "1h",
     "4h": "4h",
     "1d": "1d"
 }
+TF_SECONDS = {"15m": 900, "1h": 3600, "4h": 14400, "1d": 86400}
 
-def load_ohlcv(symbol: str, timeframe: str, limit: int = 200) -> pd.DataFrame:
+# Raw kline rows per (symbol, timeframe). Warm rows (also restored from
+# warm_state.py after a restart) mean only the candles since the last fetch
+# are requested again.
+_candles = {}
+_candles_lock = threading.Lock()
+
+def okx_inst_id(symbol: str) -> str:
+    base = OKX_SYMBOL_MAP.get(symbol.upper(), symbol.upper())
+    return f"{base}-USDT"
+
+
+def parse_okx_ticker(data: dict) -> float:
+    if data.get('code') == '0' and data.get('data'):
+        return float(data['data'][0]['last'])
+    return 0.0
+
+
+def klines_params(symbol: str, timeframe: str, limit: int = 200) -> dict:
     if timeframe not in TF_MAP:
         raise ValueError("Unsupported timeframe")
 
     base = BINANCE_SYMBOL_MAP.get(symbol, symbol)
-    pair = f"{base}USDT"
-    
-    params = {
-        "symbol": pair,
+    return {
+        "symbol": f"{base}USDT",
         "interval": TF_MAP[timeframe],
         "limit": limit
     }
 
-    r = requests.get(BINANCE_KLINES, params=params, timeout=10)
-    r.raise_for_status()
 
-    data = r.json()
+@metrics.timed("ohlcv")
+def load_ohlcv(symbol: str, timeframe: str, limit: int = 200) -> pd.DataFrame:
+    params = klines_params(symbol, timeframe, limit)
+
+    key = (symbol, timeframe)
+    with _candles_lock:
+        cached = _candles.get(key)
+
+    if cached and len(cached) >= limit:
+        # Re-fetch the still-open candle plus any that closed since
+        missing = int((time.time() - cached[-1][0] / 1000) // TF_SECONDS[timeframe]) + 1
+        if missing < limit:
+            params["limit"] = missing
+
+    data = get_client().get_json(BINANCE_KLINES, params=params, timeout=10, cost=BINANCE_KLINES_WEIGHT)
+    rows = merge_klines(cached, data, limit) if params["limit"] < limit else data
+    with _candles_lock:
+        _candles[key] = rows
+    return klines_to_df(rows)
+
+
+def merge_klines(cached: list, fresh: list, limit: int) -> list:
+    """Replaces overlapping candles in `cached` with `fresh`; keeps the newest `limit`."""
+    if not fresh:
+        return cached[-limit:]
+    first = fresh[0][0]
+    return ([row for row in cached if row[0] < first] + list(fresh))[-limit:]
+
+
+def klines_to_df(data: list) -> pd.DataFrame:
+    import pandas as pd
+
     if not data:
         raise ValueError("Empty OHLCV")
 
@@ -0,0 +1,283 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from collections import defaultdict
+
+from eth_utils import to_checksum_address
+
+import chains
+import metrics
+from config import USDC, CHAIN
+from fills import SWAP_TOPIC
+from rpc_pool import get_pool, multicall_call, decode_multicall, BALANCE_OF_SELECTOR
+from token_list import universe
+from uniswap_pool import compute_pool_address, sort_tokens, sqrt_price_to_price, SLOT0_SELECTOR
+
+# Liquidity index behind pair_scanner.get_safe_pairs. Every tracked or
+# candidate token (token_list.universe()) is paired with USDC on each fee tier; pool
+# addresses are derived offline (CREATE2), then liquidity, slot0 and both
+# pool balances are read through Multicall3 in one batched round trip, and
+# 24h volume is summed from Swap logs fetched incrementally since the last
+# refresh. The index is persisted to pair_index.json so a restart serves
+# pairs immediately; the scanner itself never touches RPC.
+
+INDEX_FILE = chains.data_path("pair_index.json")
+
+FEE_TIERS = [100, 500, 3000, 10000]
+BLOCK_TIME = CHAIN.block_time               # seconds
+VOLUME_WINDOW = int(24 * 3600 / BLOCK_TIME) # blocks summed into volume_24h
+BUCKET_BLOCKS = int(3600 / BLOCK_TIME)      # volume kept in ~1h buckets
+LOG_RANGE = 2000                            # blocks per eth_getLogs
+LOG_ADDRESSES = 100                         # pools per eth_getLogs filter
+MULTICALL_CHUNK = 200                       # calls per aggregate3
+MISSING_RECHECK = 6 * 3600                  # seconds before an undeployed pool is probed again
+
+LIQUIDITY_SELECTOR = "0x1a686502"
+DECIMALS_SELECTOR = "0x313ce567"
+
+
+def _word(data, i=0):
+    return int.from_bytes(data[32 * i:32 * (i + 1)], "big")
+
+
+def _signed(value):
+    return value - 2 ** 256 if value >= 2 ** 255 else value
+
+
+def _balance_of(token, holder):
+    return (token, BALANCE_OF_SELECTOR + holder[2:].lower().rjust(64, "0"))
+
+
+def _multicall(pool, calls):
+    """Runs [(target, calldata)] as chunked aggregate3 calls in one HTTP batch."""
+    chunks = [calls[i:i + MULTICALL_CHUNK] for i in range(0, len(calls), MULTICALL_CHUNK)]
+    out = []
+    for raw in pool.batch([multicall_call(chunk) for chunk in chunks]):
+        if isinstance(raw, Exception):
+            raise raw
+        out.extend(decode_multicall(raw))
+    return out
+
+
+class LiquidityIndex:
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.block = 0              # last block covered by volume
+        self.updated_at = 0
+        self.decimals = {}          # token -> decimals
+        self.pools = {}             # pool address -> entry dict
+        self._loaded = False
+
+    # ---------- persistence ----------
+
+    def load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                return
+            self.block = data.get("block", 0)
+            self.updated_at = data.get("updated_at", 0)
+            self.decimals = data.get("decimals", {})
+            self.pools = data.get("pools", {})
+
+    def save(self):
+        """Atomic write (temp file + rename), same as warm_state.py."""
+        with self._lock:
+            data = json.dumps({
+                "block": self.block,
+                "updated_at": self.updated_at,
+                "decimals": self.decimals,
+                "pools": self.pools,
+            }, separators=(",", ":"))
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix=".pairs-")
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+    # ---------- queries ----------
+
+    def safe_pairs(self, min_tvl, min_volume):
+        """Deepest qualifying USDC pool per token, in the pair format bot.py expects."""
+        self.load()
+        with self._lock:
+            pools = list(self.pools.items())
+
+        best = {}
+        for address, p in pools:
+            if p.get("missing") or p["tvl"] < min_tvl or p["volume_24h"] < min_volume:
+                continue
+            if p["symbol"] not in best or p["tvl"] > best[p["symbol"]][1]["tvl"]:
+                best[p["symbol"]] = (address, p)
+
+        pairs = []
+        for symbol, (address, p) in sorted(best.items(), key=lambda kv: -kv[1][1]["tvl"]):
+            pairs.append({
+                "token0": {"symbol": symbol, "id": p["token"]},
+                "token1": {"symbol": "USDC", "id": "USDC"},
+                "pool": address,
+                "fee": p["fee"],
+                "tvl": p["tvl"],
+                "volume_24h": p["volume_24h"],
+            })
+        return pairs
+
+    # ---------- refresh ----------
+
+    def _candidates(self):
+        now = time.time()
+        out = {}
+        for symbol, token in universe().items():
+            token = to_checksum_address(token)
+            for fee in FEE_TIERS:
+                address = compute_pool_address(token, USDC, fee)
+                known = self.pools.get(address)
+                if known and known.get("missing") and now - known["missing"] < MISSING_RECHECK:
+                    continue
+                out[address] = (symbol, token, fee)
+        return out
+
+    def _read_decimals(self, pool):
+        tokens = {to_checksum_address(t) for t in universe().values()} | {to_checksum_address(USDC)}
+        tokens = [t for t in tokens if t not in self.decimals]
+        if not tokens:
+            return
+        for token, data in zip(tokens, _multicall(pool, [(t, DECIMALS_SELECTOR) for t in tokens])):
+            if data:
+                self.decimals[token] = _word(data)
+
+    def _read_state(self, pool, candidates):
+        """liquidity, slot0 and both balances of every candidate pool -> {address: entry}."""
+        calls = []
+        for address, (symbol, token, fee) in candidates.items():
+            calls += [
+                (address, LIQUIDITY_SELECTOR),
+                (address, SLOT0_SELECTOR),
+                _balance_of(token, address),
+                _balance_of(USDC, address),
+            ]
+        results = _multicall(pool, calls)
+
+        entries = {}
+        for n, (address, (symbol, token, fee)) in enumerate(candidates.items()):
+            liquidity, slot0, token_bal, usdc_bal = results[4 * n:4 * n + 4]
+            if not liquidity or not slot0 or token not in self.decimals:
+                # No code at the CREATE2 address: this tier was never deployed
+                entries[address] = {"symbol": symbol, "token": token, "fee": fee, "missing": time.time(),
+                                    "tvl": 0.0, "volume_24h": 0.0}
+                continue
+
+            token0, _ = sort_tokens(token, USDC)
+            dec_token, dec_usdc = self.decimals[token], self.decimals.get(to_checksum_address(USDC), 6)
+            sqrt_price = _word(slot0)
+            price = 0.0
+            if sqrt_price:
+                # Pool price is token0 in token1; flip when USDC is token0
+                if token0 == token:
+                    price = sqrt_price_to_price(sqrt_price, dec_token, dec_usdc)
+                else:
+                    price = 1 / sqrt_price_to_price(sqrt_price, dec_usdc, dec_token)
+
+            tvl = _word(usdc_bal or b"") / 10 ** dec_usdc + _word(token_bal or b"") / 10 ** dec_token * price
+            entries[address] = {
+                "symbol": symbol,
+                "token": token,
+                "fee": fee,
+                "liquidity": _word(liquidity),
+                "price": price,
+                "tvl": round(tvl, 2),
+                "usdc_is_token0": token0 != token,
+                "volume_24h": 0.0,
+            }
+        return entries
+
+    def _read_volume(self, pool, entries, head):
+        """Adds Swap volume since each pool's last scanned block; old buckets fall off."""
+        window_start = head - VOLUME_WINDOW
+        groups = defaultdict(list)
+        for address, e in entries.items():
+            if not e.get("missing"):
+                groups[max(e.get("scanned", 0), window_start) + 1].append(address)
+
+        calls = []
+        for start, addresses in groups.items():
+            for lo in range(start, head + 1, LOG_RANGE):
+                hi = min(lo + LOG_RANGE - 1, head)
+                for i in range(0, len(addresses), LOG_ADDRESSES):
+                    calls.append(("eth_getLogs", [{
+                        "fromBlock": hex(lo),
+                        "toBlock": hex(hi),
+                        "address": addresses[i:i + LOG_ADDRESSES],
+                        "topics": [SWAP_TOPIC],
+                    }]))
+
+        lookup = {a.lower(): a for a in entries}
+        for logs in pool.batch(calls) if calls else []:
+            if isinstance(logs, Exception):
+                raise logs
+            for log in logs:
+                address = lookup.get(log["address"].lower())
+                if address is None or log.get("removed"):
+                    continue
+                e = entries[address]
+                data = log["data"][2:]
+                amount0, amount1 = _signed(int(data[0:64], 16)), _signed(int(data[64:128], 16))
+                usdc = abs(amount0 if e["usdc_is_token0"] else amount1) / 10 ** self.decimals.get(to_checksum_address(USDC), 6)
+                bucket = str(int(log["blockNumber"], 16) // BUCKET_BLOCKS * BUCKET_BLOCKS)
+                e["buckets"][bucket] = e["buckets"].get(bucket, 0.0) + usdc
+
+        for e in entries.values():
+            if e.get("missing"):
+                continue
+            e["buckets"] = {b: v for b, v in e["buckets"].items() if int(b) + BUCKET_BLOCKS > window_start}
+            e["volume_24h"] = round(sum(e["buckets"].values()), 2)
+            e["scanned"] = head
+
+    def refresh(self):
+        """One incremental pass; returns the number of pools indexed."""
+        self.load()
+        if not self._refresh_lock.acquire(blocking=False):
+            return 0    # a pass is already running
+        try:
+            pool = get_pool()
+            with metrics.timer("pair_index"):
+                head = int(pool.request("eth_blockNumber", [])["result"], 16)
+                self._read_decimals(pool)
+                candidates = self._candidates()
+                entries = self._read_state(pool, candidates)
+
+                # Carry volume history over to the fresh state
+                for address, e in entries.items():
+                    old = self.pools.get(address, {})
+                    if not e.get("missing"):
+                        e["buckets"] = dict(old.get("buckets", {}))
+                        if "scanned" in old:
+                            e["scanned"] = old["scanned"]
+                self._read_volume(pool, entries, head)
+
+            with self._lock:
+                # Pools skipped this pass (recently missing) keep their entry
+                self.pools = {**self.pools, **entries}
+                self.block = head
+                self.updated_at = time.time()
+            self.save()
+            live = sum(1 for e in entries.values() if not e.get("missing"))
+            print(f"🗂️ Pair index refreshed: {live} live pools of {len(entries)} probed at block {head}")
+            return live
+        finally:
+            self._refresh_lock.release()
+
+
+index = LiquidityIndex()
+
+
+def refresh():
+    return index.refresh()
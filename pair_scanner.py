@@ -1,6 +1,17 @@
+from config import MIN_TVL, MIN_VOLUME
+from pair_discovery import index
 from token_list import TOKEN_BY_SYMBOL
 
-def get_safe_pairs():
+def get_safe_pairs(min_tvl=MIN_TVL, min_volume=MIN_VOLUME):
+    """
+    USDC pools above the TVL / 24h volume thresholds, served from the
+    persisted liquidity index (pair_discovery.py); no RPC per cycle.
+    """
+    index.load()
+    if index.block:
+        return index.safe_pairs(min_tvl, min_volume)
+
+    # Index never built yet (first run): fall back to the static token list
     pairs = []
 
     for symbol, addr in TOKEN_BY_SYMBOL.items():
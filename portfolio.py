@@ -1,17 +1,14 @@
 import sqlite3
-from web3 import Web3
-from config import RPC_URL
+from rpc_pool import get_w3
 
 # Local DB import
-from state import DB_FILE
-
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+from state import db_file
 
 
 # ================= PORTFOLIO VALUATION =================
 
 def get_balances():
-    conn = sqlite3.connect(DB_FILE)
+    conn = sqlite3.connect(db_file())
     c = conn.cursor()
 
     c.execute("SELECT asset, amount, price FROM balances")
@@ -27,7 +24,7 @@ def get_native_price_usd():
     Fallback-safe (returns 0 if fail)
     """
     try:
-        latest = w3.eth.get_block("latest")
+        latest = get_w3().eth.get_block("latest")
         return float(latest.baseFeePerGas) * 0  # placeholder safety
     except:
         return 0
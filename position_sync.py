@@ -1,26 +1,25 @@
-from risk import load_state, save_state
+from risk_store import store
 from balance_sync import get_token_balance
 
 def sync_positions():
-    state = load_state()
-    positions = state.get("positions", {})
+    # RPC reads happen outside the store lock; changes land as one update
+    balances = {
+        symbol: get_token_balance(pos.token)
+        for symbol, pos in list(store.state.positions.items())
+    }
+    if not balances:
+        return
 
-    to_delete = []
+    with store.update() as state:
+        for symbol, onchain_balance in balances.items():
+            pos = state.positions.get(symbol)
+            if pos is None:
+                continue
 
-    for symbol, pos in positions.items():
-        token = pos["token"]
-        onchain_balance = get_token_balance(token)
+            # Dust or fully sold
+            if onchain_balance < 1e-8:
+                print(f"[SYNC] Removing closed position {symbol}")
+                del state.positions[symbol]
+                continue
 
-        # Dust or fully sold
-        if onchain_balance < 1e-8:
-            to_delete.append(symbol)
-            continue
-
-        pos["amount"] = onchain_balance
-
-    for s in to_delete:
-        print(f"[SYNC] Removing closed position {s}")
-        del positions[s]
-
-    state["positions"] = positions
-    save_state(state)
+            pos.amount = onchain_balance
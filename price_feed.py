@@ -0,0 +1,200 @@
+import time
+import asyncio
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from ohlcv import OKX_TICKER, BINANCE_SYMBOL_MAP, okx_inst_id, parse_okx_ticker
+import metrics
+from market_http import get_client
+from rpc_pool import get_pool
+from token_list import TOKEN_BY_SYMBOL
+from uniswap_pool import compute_pool_address, sort_tokens, sqrt_price_to_price, SLOT0_SELECTOR
+from config import USDC
+
+# Price consensus: OKX (primary), Binance and the on-chain Uniswap pool are
+# queried concurrently. If the primary is slow a hedged duplicate request is
+# sent, and the median of whatever fresh quotes arrive within the budget is
+# returned together with a confidence flag. Each source gets one attempt with
+# a timeout of whatever is left of the budget, so a slow venue can't keep
+# retrying in the background and starve the pool for the next quotes.
+
+BINANCE_TICKER = "https://api.binance.com/api/v3/ticker/price"
+BINANCE_TICKER_WEIGHT = 2
+
+HEDGE_AFTER = 0.3          # seconds before the primary gets a hedged twin
+LATENCY_BUDGET = 1.5       # seconds to wait for quotes in total
+MIN_SOURCE_TIMEOUT = 0.2  # never ask a venue with less time than this
+MAX_SPREAD = 0.01          # quotes further than 1% from the median are outliers
+CACHE_TTL = 1.0            # tasks asking within this window share a quote
+ONCHAIN_FEE_TIERS = [500, 3000]
+DECIMALS_SELECTOR = "0x313ce567"
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="price")
+
+
+class Quote:
+    def __init__(self, symbol, price, confident, sources):
+        self.symbol = symbol
+        self.price = price
+        self.confident = confident
+        self.sources = sources
+        self.ts = time.time()
+
+    def __repr__(self):
+        return f"Quote({self.symbol}, {self.price}, confident={self.confident}, sources={self.sources})"
+
+# ================= SOURCES =================
+
+def okx_price(symbol, timeout=LATENCY_BUDGET):
+    url = OKX_TICKER.format(inst=okx_inst_id(symbol))
+    return parse_okx_ticker(get_client().get_json(url, timeout=timeout, attempts=1))
+
+
+def binance_price(symbol, timeout=LATENCY_BUDGET):
+    base = BINANCE_SYMBOL_MAP.get(symbol, symbol)
+    data = get_client().get_json(
+        BINANCE_TICKER, params={"symbol": f"{base}USDT"}, timeout=timeout, cost=BINANCE_TICKER_WEIGHT,
+        attempts=1
+    )
+    return float(data["price"])
+
+
+_decimals = {}
+
+def _token_decimals(token):
+    if token not in _decimals:
+        raw = get_pool().request("eth_call", [{"to": token, "data": DECIMALS_SELECTOR}, "latest"])
+        _decimals[token] = int(raw["result"], 16)
+    return _decimals[token]
+
+
+def onchain_price(symbol, timeout=None):
+    """
+    Spot price from slot0 of the token/USDC Uniswap V3 pool (first tier that
+    exists). `timeout` is unused: the RPC pool bounds each endpoint itself.
+    """
+    token = TOKEN_BY_SYMBOL.get(symbol)
+    if not token:
+        return 0.0
+
+    token0, token1 = sort_tokens(token, USDC)
+    pools = [compute_pool_address(token0, token1, fee) for fee in ONCHAIN_FEE_TIERS]
+    results = get_pool().batch(
+        [("eth_call", [{"to": pool, "data": SLOT0_SELECTOR}, "latest"]) for pool in pools]
+    )
+
+    for raw in results:
+        if isinstance(raw, Exception) or not raw or raw == "0x":
+            continue
+        sqrt_price = int(raw[2:66], 16)
+        if sqrt_price == 0:
+            continue
+        price = sqrt_price_to_price(sqrt_price, _token_decimals(token0), _token_decimals(token1))
+        # Pool price is token0 in token1; flip when USDC is token0
+        return price if token0 == token else 1 / price
+    return 0.0
+
+
+SOURCES = {
+    "okx": okx_price,
+    "binance": binance_price,
+    "onchain": onchain_price,
+}
+PRIMARY = "okx"
+
+# ================= CONSENSUS =================
+
+class PriceConsensus:
+    def __init__(self, sources=SOURCES, primary=PRIMARY,
+                 hedge_after=HEDGE_AFTER, budget=LATENCY_BUDGET, max_spread=MAX_SPREAD):
+        self.sources = sources
+        self.primary = primary
+        self.hedge_after = hedge_after
+        self.budget = budget
+        self.max_spread = max_spread
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def quote(self, symbol):
+        if symbol == "USDC":
+            return Quote(symbol, 1.0, True, {"fixed": 1.0})
+
+        with self._lock:
+            cached = self._cache.get(symbol)
+        if cached and time.time() - cached.ts < CACHE_TTL:
+            return cached
+
+        start = time.monotonic()
+        futures = {_executor.submit(fn, symbol, self.budget): name for name, fn in self.sources.items()}
+        hedged = False
+        quotes = {}
+        pending = set(futures)
+
+        while pending and len(quotes) < len(self.sources):
+            elapsed = time.monotonic() - start
+            if elapsed >= self.budget:
+                break
+
+            if not hedged and self.primary not in quotes:
+                timeout = max(0.0, self.hedge_after - elapsed)
+            else:
+                timeout = self.budget - elapsed
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for fut in done:
+                name = futures[fut]
+                try:
+                    price = fut.result()
+                except Exception as e:
+                    print(f"⚠️ {name} quote failed {symbol}: {e}")
+                    continue
+                if price and price > 0 and name not in quotes:
+                    quotes[name] = price
+
+            if not hedged and self.primary in self.sources and self.primary not in quotes \
+                    and time.monotonic() - start >= self.hedge_after:
+                # Primary is slow (or failed): race a second request against it
+                remaining = max(MIN_SOURCE_TIMEOUT, self.budget - (time.monotonic() - start))
+                hedge = _executor.submit(self.sources[self.primary], symbol, remaining)
+                futures[hedge] = self.primary
+                pending.add(hedge)
+                hedged = True
+
+        quote = self._combine(symbol, quotes)
+        with self._lock:
+            self._cache[symbol] = quote
+        return quote
+
+    def _combine(self, symbol, quotes):
+        if not quotes:
+            return Quote(symbol, 0.0, False, {})
+
+        median = statistics.median(quotes.values())
+        agreeing = {n: p for n, p in quotes.items() if abs(p - median) / median <= self.max_spread}
+        price = statistics.median(agreeing.values()) if agreeing else median
+
+        # Confident only when at least two independent venues agree
+        return Quote(symbol, price, len(agreeing) >= 2, quotes)
+
+
+_consensus = PriceConsensus()
+
+
+def get_quote(symbol) -> Quote:
+    with metrics.timer("price_quote"):
+        quote = _consensus.quote(symbol)
+    if not quote.confident:
+        metrics.inc("price_unconfident", symbol=symbol)
+    return quote
+
+
+def get_price_usdc(symbol) -> float:
+    """Consensus price in USD(C); 0.0 when no venue answered in time."""
+    return _consensus.quote(symbol).price
+
+
+async def get_quotes_async(symbols) -> dict:
+    symbols = list(symbols)
+    quotes = await asyncio.gather(*(asyncio.to_thread(get_quote, s) for s in symbols))
+    return dict(zip(symbols, quotes))
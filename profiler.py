@@ -0,0 +1,229 @@
+import os
+import sys
+import time
+import zlib
+import signal
+import logging
+import threading
+from collections import Counter
+from html import escape
+
+import chains
+
+# On-demand sampling profiler for the live bot. Nothing runs while it is
+# off; once armed (meta key or SIGUSR1) a sampler thread walks every thread's
+# stack via sys._current_frames() until N main-loop cycles have completed,
+# then writes collapsed stacks (.folded) and an SVG flamegraph to PROFILE_DIR.
+
+logger = logging.getLogger("BotLogger")
+
+PROFILE_DIR = chains.data_path("profiles")
+
+PROFILE_META_KEY = "profile_cycles"   # set_meta(PROFILE_META_KEY, N) to arm
+CYCLE_TASK = "exits"                  # the 5s stop-loss loop counts as one cycle
+DEFAULT_CYCLES = 20
+SAMPLE_INTERVAL = 0.005               # 200 Hz
+MAX_DURATION = 900                    # hard stop in case cycles stall
+MAX_PROFILES = 20                     # older dumps are pruned
+
+# ================= SAMPLER =================
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+# ================= OUTPUT =================
+
+def write_folded(stacks, path):
+    with open(path, "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def _color(name):
+    h = zlib.crc32(name.encode())
+    return f"rgb({205 + h % 50},{(h >> 8) % 180 + 40},{(h >> 16) % 55})"
+
+
+def render_flamegraph(stacks, title="bot profile", width=1200, frame_height=16):
+    """Minimal self-contained SVG flamegraph from collapsed stacks."""
+    root = {}
+    total = 0
+    for stack, count in stacks.items():
+        total += count
+        node = root
+        for name in stack.split(";"):
+            entry = node.setdefault(name, [0, {}])
+            entry[0] += count
+            node = entry[1]
+
+    def depth(node):
+        return 1 + max((depth(child[1]) for child in node.values()), default=0)
+
+    levels = depth(root)
+    height = (levels + 2) * frame_height
+    rects = []
+
+    def walk(node, x, level):
+        for name, (count, children) in sorted(node.items()):
+            w = count / total * width if total else 0
+            if w >= 0.5:
+                y = height - (level + 1) * frame_height
+                label = escape(name)
+                text = label if len(name) * 7 < w else ""
+                rects.append(
+                    f'<g><title>{label} ({count} samples, {count / total:.1%})</title>'
+                    f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{frame_height - 1}" fill="{_color(name)}"/>'
+                    f'<text x="{x + 3:.1f}" y="{y + frame_height - 4}">{text}</text></g>'
+                )
+                walk(children, x, level + 1)
+            x += w
+
+    walk(root, 0.0, 0)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="monospace" font-size="11">'
+        f'<text x="{width / 2}" y="{frame_height}" text-anchor="middle" font-size="14">'
+        f'{escape(title)} ({total} samples)</text>'
+        + "".join(rects)
+        + "</svg>"
+    )
+
+
+def list_profiles(directory=PROFILE_DIR):
+    """Newest first: [{"name", "size", "mtime"}]."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    out = []
+    for name in names:
+        if name.endswith((".svg", ".folded")):
+            st = os.stat(os.path.join(directory, name))
+            out.append({"name": name, "size": st.st_size, "mtime": st.st_mtime})
+    return sorted(out, key=lambda p: p["mtime"], reverse=True)
+
+
+def _prune(directory, keep=MAX_PROFILES):
+    runs = sorted({p["name"].rsplit(".", 1)[0] for p in list_profiles(directory)}, reverse=True)
+    for stem in runs[keep:]:
+        for ext in (".svg", ".folded"):
+            try:
+                os.remove(os.path.join(directory, stem + ext))
+            except FileNotFoundError:
+                pass
+
+# ================= CONTROLLER =================
+
+class ProfileController:
+    """
+    Arms the sampler for the next N cycles of CYCLE_TASK. Hooked into the
+    scheduler so cycle completion is counted without touching the tasks.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, cycle_task=CYCLE_TASK):
+        self.directory = directory
+        self.cycle_task = cycle_task
+        self._lock = threading.Lock()
+        self._profiler = None
+        self._remaining = 0
+        self._lane = None           # the one CYCLE_TASK lane being counted
+        self._started = 0.0
+        self._cycles = 0
+
+    @property
+    def active(self):
+        return self._profiler is not None
+
+    def request(self, cycles=DEFAULT_CYCLES):
+        with self._lock:
+            if self._profiler is not None:
+                return False
+            self._profiler = SamplingProfiler()
+            self._remaining = self._cycles = int(cycles)
+            self._lane = None
+            self._started = time.time()
+            self._profiler.start()
+        logger.info(f"🔬 Profiler armed for {cycles} cycles")
+        return True
+
+    def on_task_done(self, task, duration):
+        # Account lanes are named "exits@<account>" in multi-account mode;
+        # only the first lane to finish a cycle is counted, so N cycles means
+        # N cycles of one account however many lanes run
+        if task.name.split("@")[0] != self.cycle_task or self._profiler is None:
+            return
+        with self._lock:
+            if self._lane is None:
+                self._lane = task.name
+            if task.name != self._lane:
+                return
+            self._remaining -= 1
+            done = self._remaining <= 0 or time.time() - self._started > MAX_DURATION
+        if done:
+            self.finish()
+
+    def finish(self):
+        with self._lock:
+            profiler, self._profiler = self._profiler, None
+        if profiler is None:
+            return None
+        profiler.stop()
+
+        os.makedirs(self.directory, exist_ok=True)
+        stem = time.strftime("profile-%Y%m%d-%H%M%S", time.gmtime(self._started))
+        base = os.path.join(self.directory, stem)
+        write_folded(profiler.stacks, base + ".folded")
+        title = f"{self._cycles} cycles, {time.time() - self._started:.1f}s"
+        with open(base + ".svg", "w") as f:
+            f.write(render_flamegraph(profiler.stacks, title=title))
+        _prune(self.directory)
+        logger.info(f"🔬 Profile written: {stem}.svg ({profiler.samples} samples)")
+        return base + ".svg"
+
+    def poll_meta(self, get_meta, set_meta):
+        """Arms from the meta table so the dashboard/sqlite3 can request a profile."""
+        if self.active and time.time() - self._started > MAX_DURATION:
+            self.finish()
+        cycles = int(get_meta(PROFILE_META_KEY, 0) or 0)
+        if cycles > 0:
+            set_meta(PROFILE_META_KEY, 0)
+            self.request(cycles)
+
+    def install_signal(self, signum=getattr(signal, "SIGUSR1", None)):
+        """`kill -USR1 <pid>` profiles the next DEFAULT_CYCLES cycles. Main thread only."""
+        if signum is not None:
+            signal.signal(signum, lambda *_: self.request())
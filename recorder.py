@@ -0,0 +1,72 @@
+import json
+import gzip
+import time
+import threading
+from urllib.parse import urlsplit
+
+from config import RECORD_FILE, REPLAY_URL, WALLET_ADDRESS, CHAIN_ID
+
+# Traffic capture for offline replay. With RECORD_FILE set, every JSON-RPC
+# exchange (rpc_pool) and market-data GET (market_http / async_market) is
+# appended to a gzipped JSON-lines log:
+#
+#   {"k": "meta", "wallet": ..., "chain_id": ..., "started": ...}
+#   {"k": "rpc",  "m": method, "p": params, "r": response, "ms": latency}
+#   {"k": "http", "u": "host/path", "q": query, "s": status, "b": body, "ms": latency}
+#
+# replay_server.py serves such a log back. With REPLAY_URL set, market-data
+# requests are routed to that server (RPC is routed by config.RPC_URLS).
+
+
+class Recorder:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "at", compresslevel=6)
+        self._write({"k": "meta", "wallet": WALLET_ADDRESS, "chain_id": CHAIN_ID, "started": time.time()})
+
+    def _write(self, entry):
+        line = json.dumps(entry, separators=(",", ":"), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def rpc(self, body, response, seconds):
+        """`body` is the raw request text, a single call or a batch."""
+        calls = json.loads(body)
+        if isinstance(calls, dict):
+            calls, response = [calls], [response]
+        by_id = {r.get("id"): r for r in response if isinstance(r, dict)}
+        ms = round(seconds * 1000, 1)
+        for call in calls:
+            reply = by_id.get(call.get("id"))
+            if reply is None:
+                continue
+            reply = {k: v for k, v in reply.items() if k in ("result", "error")}
+            self._write({"k": "rpc", "m": call["method"], "p": call.get("params", []), "r": reply, "ms": ms})
+
+    def http(self, url, params, status, body, seconds):
+        parts = urlsplit(url)
+        self._write({
+            "k": "http",
+            "u": f"{parts.hostname}{parts.path}",
+            "q": params or {},
+            "s": status,
+            "b": body,
+            "ms": round(seconds * 1000, 1),
+        })
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+recorder = Recorder(RECORD_FILE) if RECORD_FILE else None
+
+
+def route(url):
+    """Rewrites a market-data URL to the replay server (host becomes the first path segment)."""
+    if not REPLAY_URL:
+        return url
+    parts = urlsplit(url)
+    return f"{REPLAY_URL.rstrip('/')}/{parts.hostname}{parts.path}"
@@ -0,0 +1,174 @@
+import sys
+import gzip
+import json
+import time
+import argparse
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+# Local stand-in for Polygon RPC, OKX and Binance built from a recorder.py
+# log. Usage:
+#
+#   RECORD_FILE=session.jsonl.gz python bot.py            # live, capture traffic
+#   python replay_server.py session.jsonl.gz --port 8545  # serve it back
+#   REPLAY_URL=http://127.0.0.1:8545 WALLET_ADDRESS=<recorded> python bot.py
+#
+# Requests are matched on (method, params) / (host+path, query) and answered
+# in recorded order (the last answer repeats). Calls whose params change run
+# to run (signed txs, swap deadlines, a different wallet) fall back to the
+# next recorded answer for the same method / path. Each answer is delayed by
+# its recorded latency times --latency.
+
+DEFAULT_PORT = 8545
+
+
+def read_log(path):
+    with gzip.open(path, "rt") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _params_key(params):
+    return json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+
+def _query_key(query):
+    return tuple(sorted((str(k), str(v)) for k, v in (query or {}).items()))
+
+
+class _Sequence:
+    """Recorded answers for one key, served in order; the last one repeats."""
+
+    def __init__(self):
+        self.items = []
+        self.pos = 0
+
+    def next(self):
+        item = self.items[min(self.pos, len(self.items) - 1)]
+        self.pos += 1
+        return item
+
+
+class ReplayLog:
+    def __init__(self, path):
+        self.meta = {}
+        self._rpc = defaultdict(_Sequence)
+        self._rpc_method = defaultdict(_Sequence)
+        self._http = defaultdict(_Sequence)
+        self._http_path = defaultdict(_Sequence)
+        self._lock = threading.Lock()
+        self.misses = 0
+
+        for entry in read_log(path):
+            kind = entry["k"]
+            if kind == "meta":
+                self.meta = entry
+            elif kind == "rpc":
+                item = (entry["r"], entry["ms"])
+                self._rpc[(entry["m"], _params_key(entry["p"]))].items.append(item)
+                self._rpc_method[entry["m"]].items.append(item)
+            elif kind == "http":
+                item = (entry["s"], entry["b"], entry["ms"])
+                self._http[(entry["u"], _query_key(entry["q"]))].items.append(item)
+                self._http_path[entry["u"]].items.append(item)
+
+    def rpc(self, method, params):
+        """Returns ({"result"|"error": ...}, latency_ms)."""
+        with self._lock:
+            seq = self._rpc.get((method, _params_key(params))) or self._rpc_method.get(method)
+            if seq:
+                return seq.next()
+            self.misses += 1
+        if method == "eth_chainId" and "chain_id" in self.meta:
+            return {"result": hex(self.meta["chain_id"])}, 0
+        return {"error": {"code": -32601, "message": f"{method} not recorded"}}, 0
+
+    def http(self, path, query):
+        """Returns (status, body, latency_ms)."""
+        with self._lock:
+            seq = self._http.get((path, _query_key(query))) or self._http_path.get(path)
+            if seq:
+                return seq.next()
+            self.misses += 1
+        return 404, {"error": f"{path} not recorded"}, 0
+
+# ================= HTTP =================
+
+def make_handler(log, latency=1.0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            calls = payload if isinstance(payload, list) else [payload]
+
+            replies, slowest = [], 0
+            for call in calls:
+                reply, ms = log.rpc(call["method"], call.get("params", []))
+                replies.append({"jsonrpc": "2.0", "id": call.get("id"), **reply})
+                slowest = max(slowest, ms)
+
+            time.sleep(slowest / 1000 * latency)
+            self._send(200, replies if isinstance(payload, list) else replies[0])
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            status, body, ms = log.http(parts.path.lstrip("/"), dict(parse_qsl(parts.query)))
+            time.sleep(ms / 1000 * latency)
+            self._send(status, body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve_in_thread(path, host="127.0.0.1", port=0, latency=1.0):
+    """Starts a replay server on a daemon thread; returns (server, base_url)."""
+    log = ReplayLog(path)
+    server = ThreadingHTTPServer((host, port), make_handler(log, latency))
+    server.daemon_threads = True
+    server.log = log
+    threading.Thread(target=server.serve_forever, name="replay-server", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a recorded RPC/market-data session")
+    parser.add_argument("log", help="recorder.py log (.jsonl.gz)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=1.0,
+                        help="multiplier on recorded latency (0 = as fast as possible)")
+    args = parser.parse_args(argv)
+
+    log = ReplayLog(args.log)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(log, args.latency))
+    server.daemon_threads = True
+    print(f"🎞️ Replaying {args.log} on http://{args.host}:{args.port}")
+    if log.meta.get("wallet"):
+        print(f"   Recorded wallet: {log.meta['wallet']} (set WALLET_ADDRESS to it for exact matches)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"🛑 Stopped ({log.misses} unrecorded requests)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,7 @@
-import json
-import os
-import time
+from risk_store import store
 
-STATE_FILE = "state.json"
+# Risk state lives in risk_store (in memory, flushed atomically to
+# state.json); load_state/save_state remain for dict-based callers.
 
 # ================= DEFAULT STATE =================
 
@@ -15,21 +14,11 @@ DEFAULT_STATE = {
 # ================= STATE IO =================
 
 def load_state() -> dict:
-    if not os.path.exists(STATE_FILE):
-        return DEFAULT_STATE.copy()
-
-    try:
-        with open(STATE_FILE, "r") as f:
-            state = json.load(f)
-    except Exception:
-        state = {}
-
-    return normalize_state(state)
+    return store.read()
 
 
 def save_state(state: dict):
-    with open(STATE_FILE, "w") as f:
-        json.dump(state, f, indent=2)
+    store.replace(state)
 
 
 def normalize_state(state: dict) -> dict:
@@ -39,17 +28,18 @@ def normalize_state(state: dict) -> dict:
 
 # ================= RISK LOGIC =================
 
-def can_trade(state: dict) -> bool:
-    state = normalize_state(state)
+def can_trade(state: dict = None) -> bool:
+    # Hot path: read the in-memory copy, no file IO
+    daily_loss = store.state.daily_loss if state is None else normalize_state(state)["daily_loss"]
 
     # Hard stop example (can be expanded)
-    if state["daily_loss"] <= -5:
+    if daily_loss <= -5:
         return False
 
     return True
 
 
-def record_loss(state: dict, loss_amount: float) -> dict:
-    state = normalize_state(state)
-    state["daily_loss"] += loss_amount
-    return state
+def record_loss(loss_amount: float):
+    with store.update() as state:
+        state.daily_loss += loss_amount
+        return state.daily_loss
@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import atexit
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict, fields
+
+import chains
+
+# Single in-process owner of the risk/position state that used to be re-read
+# and rewritten (non-atomically) from state.json by risk, state, pnl_tracker
+# and position_sync on every call. Reads come from memory; changes mark the
+# store dirty and a flusher thread writes one atomic, fsync'd snapshot per
+# batch of changes (temp file + rename). The on-disk JSON layout is unchanged.
+
+STATE_FILE = chains.data_path("state.json")
+
+FLUSH_DELAY = 0.5       # seconds to coalesce writes before a snapshot
+
+# ================= TYPES =================
+
+@dataclass
+class Position:
+    token: str
+    amount: float = 0.0
+    entry_price: float = 0.0
+    tp1_done: bool = False
+    tp2_done: bool = False
+    trail_stop: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data):
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+@dataclass
+class RiskState:
+    # risk.py
+    daily_loss: float = 0.0
+    last_reset: int = 0
+    last_trade: dict = field(default_factory=dict)
+    # pnl_tracker.py
+    day: str = ""
+    daily_realized_pnl: float = 0.0
+    daily_unrealized_pnl: float = 0.0
+    trading_enabled: bool = True
+    # position_sync.py / position_manager.py
+    positions: dict = field(default_factory=dict)   # symbol -> Position
+    # anything else found on disk is carried through untouched
+    extra: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data):
+        known = {f.name for f in fields(cls)} - {"extra", "positions"}
+        state = cls(**{k: v for k, v in data.items() if k in known})
+        state.positions = {s: Position.from_dict(p) for s, p in (data.get("positions") or {}).items()}
+        state.extra = {k: v for k, v in data.items() if k not in known and k != "positions"}
+        return state
+
+    def to_dict(self):
+        data = asdict(self)
+        extra = data.pop("extra")
+        return {**extra, **data}
+
+# ================= STORE =================
+
+class RiskStore:
+    def __init__(self, path=STATE_FILE, flush_delay=FLUSH_DELAY):
+        self.path = path
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()     # one snapshot on disk at a time
+        self._dirty = threading.Event()
+        self._version = 0
+        self._flushed_version = 0
+        self.state = self._load()
+        self._flusher = None
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return RiskState.from_dict(json.load(f))
+        except FileNotFoundError:
+            return RiskState()
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Unreadable {self.path}, starting from defaults: {e}")
+            return RiskState()
+
+    @contextmanager
+    def update(self):
+        """
+        Mutate `state` inside the block; one snapshot covers every change
+        made within FLUSH_DELAY. Nested updates are fine (re-entrant lock).
+        """
+        with self._lock:
+            yield self.state
+            self._version += 1
+        self._schedule()
+
+    def read(self):
+        """Consistent copy for callers that want a dict."""
+        with self._lock:
+            return self.state.to_dict()
+
+    def replace(self, data):
+        with self.update() as state:
+            new = RiskState.from_dict(data)
+            for f in fields(RiskState):
+                setattr(state, f.name, getattr(new, f.name))
+
+    # ---------- persistence ----------
+
+    def _schedule(self):
+        self._dirty.set()
+        if self._flusher is None:
+            with self._lock:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, name="risk-store", daemon=True)
+                    self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            self._dirty.wait()
+            # Let a burst of changes land before snapshotting once
+            time.sleep(self.flush_delay)
+            self._dirty.clear()
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"⚠️ Risk state flush failed: {e}")
+                self._dirty.set()
+
+    def flush(self):
+        with self._write_lock:
+            return self._write()
+
+    def _write(self):
+        with self._lock:
+            if self._version == self._flushed_version:
+                return False
+            version = self._version
+            data = json.dumps(self.state.to_dict(), indent=2)
+
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".state-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+        # Make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+        with self._lock:
+            self._flushed_version = max(self._flushed_version, version)
+        return True
+
+
+class _AccountStore:
+    """Forwards to the RiskStore of the account the caller runs as (accounts.py)."""
+
+    def __getattr__(self, name):
+        import accounts
+        return getattr(accounts.current().store, name)
+
+
+default_store = RiskStore()
+atexit.register(default_store.flush)
+
+store = _AccountStore()
@@ -0,0 +1,146 @@
+import time
+import sqlite3
+
+from state import DB_FILE, db_file
+
+# Tiered equity history for portfolio_snapshots:
+#   raw rows      -> kept 24h
+#   equity_5m     -> 5-minute OHLC buckets, kept 30 days
+#   equity_1h     -> hourly OHLC buckets, kept forever
+# rollup() is incremental: it only folds snapshot rows newer than the last
+# id it processed, so it is cheap enough to run after every snapshot.
+
+RAW_RETENTION = 24 * 3600
+FIVE_MIN_RETENTION = 30 * 86400
+
+TIERS = [
+    ("equity_5m", 300),
+    ("equity_1h", 3600),
+]
+TIER_WIDTH = dict(TIERS)
+
+LAST_ID_KEY = "rollup_last_snapshot_id"
+
+
+def _fold(rows, width):
+    """Groups (ts, equity) rows into {bucket: [open, high, low, close, samples]}."""
+    buckets = {}
+    for ts, equity in rows:
+        bucket = ts - ts % width
+        b = buckets.get(bucket)
+        if b is None:
+            buckets[bucket] = [equity, equity, equity, equity, 1]
+        else:
+            b[1] = max(b[1], equity)
+            b[2] = min(b[2], equity)
+            b[3] = equity
+            b[4] += 1
+    return buckets
+
+
+def rollup(now=None):
+    now = int(now or time.time())
+
+    # Cursor, buckets and retention change in one transaction: a crash can
+    # never leave snapshots folded twice or dropped unfolded.
+    conn = sqlite3.connect(db_file(), timeout=10)
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+
+    c.execute("SELECT value FROM meta WHERE key = ?", (LAST_ID_KEY,))
+    row = c.fetchone()
+    last_id = int(row[0]) if row else 0
+
+    c.execute("""
+        SELECT id, timestamp, total_equity
+        FROM portfolio_snapshots
+        WHERE id > ? AND total_equity IS NOT NULL
+        ORDER BY id
+    """, (last_id,))
+    rows = c.fetchall()
+
+    if rows:
+        points = [(ts, equity) for _, ts, equity in rows]
+        for table, width in TIERS:
+            c.executemany(f"""
+                INSERT INTO {table} (bucket, open, high, low, close, samples)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(bucket) DO UPDATE SET
+                    high = MAX(high, excluded.high),
+                    low = MIN(low, excluded.low),
+                    close = excluded.close,
+                    samples = samples + excluded.samples
+            """, [(bucket, *ohlc) for bucket, ohlc in _fold(points, width).items()])
+        last_id = rows[-1][0]
+        c.execute("""
+            INSERT INTO meta (key, value)
+            VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value=excluded.value
+        """, (LAST_ID_KEY, last_id))
+
+    # ---- Retention (only rows already folded into the rollups) ----
+    c.execute(
+        "DELETE FROM portfolio_snapshots WHERE timestamp < ? AND id <= ?",
+        (now - RAW_RETENTION, last_id)
+    )
+    c.execute("DELETE FROM equity_5m WHERE bucket < ?", (now - FIVE_MIN_RETENTION,))
+
+    conn.commit()
+    conn.close()
+    return len(rows)
+
+# ================= QUERY =================
+
+def pick_tier(start, now=None):
+    """The finest tier that still covers `start`."""
+    now = now or time.time()
+    if start >= now - RAW_RETENTION:
+        return "portfolio_snapshots"
+    if start >= now - FIVE_MIN_RETENTION:
+        return "equity_5m"
+    return "equity_1h"
+
+
+def equity_sql(start=None, end=None, bucket=None):
+    """
+    (sql, params) selecting (timestamp, equity) oldest first for [start, end]
+    from the tier that matches the requested range (bucket close for
+    rolled-up tiers). With `bucket` (seconds) rows are averaged into buckets
+    of that width in SQL.
+    """
+    now = time.time()
+    end = end or now
+    start = start if start is not None else end - RAW_RETENTION
+    tier = pick_tier(start, now)
+
+    if tier == "portfolio_snapshots":
+        ts_col, value_col = "timestamp", "total_equity"
+    else:
+        ts_col, value_col = "bucket", "close"
+        start = start - start % TIER_WIDTH[tier]
+
+    if bucket and bucket > 1:
+        select = f"({ts_col} / {int(bucket)}) * {int(bucket)} AS t, AVG({value_col})"
+        group = "GROUP BY t"
+    else:
+        select = f"{ts_col} AS t, {value_col}"
+        group = ""
+
+    sql = f"""
+        SELECT {select} FROM {tier}
+        WHERE {ts_col} BETWEEN ? AND ?
+        {group}
+        ORDER BY t
+    """
+    return sql, (int(start), int(end))
+
+
+def query_equity(start=None, end=None, bucket=None, db_file=DB_FILE):
+    """[(timestamp, equity)] oldest first for [start, end]; see equity_sql()."""
+    sql, params = equity_sql(start, end, bucket)
+    conn = sqlite3.connect(db_file, timeout=10)
+    c = conn.cursor()
+    c.execute(sql, params)
+    rows = c.fetchall()
+    conn.close()
+    return rows
@@ -0,0 +1,387 @@
+import json
+import time
+import threading
+import itertools
+
+import requests
+from requests.adapters import HTTPAdapter
+from eth_utils import to_checksum_address
+
+import metrics
+from config import RPC_URLS
+from recorder import recorder
+
+# One JSON-RPC transport for the whole process: keep-alive sessions per
+# endpoint, same-tick reads coalesced into batch requests, identical
+# in-flight reads deduplicated, and latency-ranked failover with a
+# circuit breaker per endpoint. web3 itself is only imported once get_w3()
+# is first called, so raw pool reads (prices, balances) start fast.
+
+BATCH_WINDOW = 0.005        # seconds to wait for more calls before flushing
+MAX_BATCH = 50
+REQUEST_TIMEOUT = 15
+BREAKER_FAILURES = 3        # consecutive failures before an endpoint is opened
+BREAKER_COOLDOWN = 30       # seconds an open endpoint is skipped
+EWMA_ALPHA = 0.2
+
+# Never coalesced or shared: each caller must see its own send/filter result
+UNBATCHED_METHODS = {
+    "eth_sendRawTransaction",
+    "eth_sendTransaction",
+    "eth_newFilter",
+    "eth_newBlockFilter",
+    "eth_getFilterChanges",
+}
+
+
+class RPCError(Exception):
+    pass
+
+# ================= ENDPOINT =================
+
+class Endpoint:
+    def __init__(self, url):
+        self.url = url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        self.latency = None        # EWMA seconds
+        self.failures = 0
+        self.open_until = 0.0
+
+    def is_open(self, now):
+        return now < self.open_until
+
+    def score(self):
+        # Unmeasured endpoints get tried early so every node gets a latency sample
+        return self.latency if self.latency is not None else 0.0
+
+    def record_success(self, elapsed):
+        self.failures = 0
+        self.open_until = 0.0
+        if self.latency is None:
+            self.latency = elapsed
+        else:
+            self.latency = EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * self.latency
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= BREAKER_FAILURES:
+            self.open_until = time.time() + BREAKER_COOLDOWN
+            print(f"⚡ RPC breaker open for {self.url} ({BREAKER_COOLDOWN}s)")
+
+
+class _Pending:
+    __slots__ = ("method", "params", "key", "done", "response", "error")
+
+    def __init__(self, method, params, key):
+        self.method = method
+        self.params = params
+        self.key = key
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+# ================= POOL =================
+
+class RPCPool:
+    def __init__(self, urls):
+        if not urls:
+            raise RuntimeError("No RPC endpoints configured")
+        self.endpoints = [Endpoint(u) for u in urls]
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._queue = []
+        self._flushing = False
+        self._inflight = {}
+
+        # Counters (exposed for diagnostics)
+        self.http_requests = 0
+        self.rpc_calls = 0
+        self.deduplicated = 0
+
+    # ---------- endpoint selection ----------
+
+    def ranked_endpoints(self):
+        now = time.time()
+        closed = sorted((e for e in self.endpoints if not e.is_open(now)), key=Endpoint.score)
+        # Open breakers are only used as a last resort (half-open probe)
+        opened = sorted((e for e in self.endpoints if e.is_open(now)), key=lambda e: e.open_until)
+        return closed + opened
+
+    def best_url(self):
+        return self.ranked_endpoints()[0].url
+
+    def _post(self, payload):
+        """Sends one HTTP body, failing over across endpoints."""
+        body = encode_payload(payload)
+        last_error = None
+        for endpoint in self.ranked_endpoints():
+            start = time.time()
+            try:
+                res = endpoint.session.post(endpoint.url, data=body, timeout=REQUEST_TIMEOUT)
+                if res.status_code == 429 or res.status_code >= 500:
+                    raise RPCError(f"HTTP {res.status_code}")
+                res.raise_for_status()
+                data = res.json()
+            except (requests.RequestException, ValueError, RPCError) as e:
+                endpoint.record_failure()
+                last_error = e
+                continue
+
+            endpoint.record_success(time.time() - start)
+            self.http_requests += 1
+            if recorder:
+                recorder.rpc(body, data, time.time() - start)
+            return data
+
+        raise RPCError(f"All RPC endpoints failed: {last_error}")
+
+    # ---------- batching ----------
+
+    def _flush(self, calls):
+        for i in range(0, len(calls), MAX_BATCH):
+            chunk = calls[i:i + MAX_BATCH]
+            ids = {}
+            payload = []
+            for call in chunk:
+                rid = next(self._ids)
+                ids[rid] = call
+                payload.append({"jsonrpc": "2.0", "id": rid, "method": call.method, "params": call.params})
+
+            try:
+                if len(payload) == 1:
+                    responses = [self._post(payload[0])]
+                else:
+                    responses = self._post(payload)
+                    if not isinstance(responses, list):
+                        raise RPCError(f"Batch rejected: {responses}")
+                for response in responses:
+                    call = ids.pop(response.get("id"), None)
+                    if call is not None:
+                        call.response = response
+                for call in ids.values():
+                    call.error = RPCError(f"No response for {call.method}")
+            except Exception as e:
+                for call in chunk:
+                    if call.response is None:
+                        call.error = e
+
+            for call in chunk:
+                self._finish(call)
+
+    def _finish(self, call):
+        with self._lock:
+            if call.key is not None and self._inflight.get(call.key) is call:
+                del self._inflight[call.key]
+        call.done.set()
+
+    def _submit(self, method, params):
+        key = None
+        if method not in UNBATCHED_METHODS:
+            key = (method, json.dumps(params, sort_keys=True, default=str))
+
+        with self._lock:
+            self.rpc_calls += 1
+            if key is not None and key in self._inflight:
+                self.deduplicated += 1
+                return self._inflight[key]
+
+            call = _Pending(method, params, key)
+            if key is not None:
+                self._inflight[key] = call
+            self._queue.append(call)
+            leader = not self._flushing
+            if leader:
+                self._flushing = True
+
+        if leader:
+            # First caller of the tick collects whatever else arrives in the window
+            time.sleep(BATCH_WINDOW)
+            with self._lock:
+                calls, self._queue = self._queue, []
+                self._flushing = False
+            self._flush(calls)
+
+        return call
+
+    def request(self, method, params):
+        """Returns the raw JSON-RPC response dict for one call."""
+        with metrics.timer("rpc", method=method):
+            call = self._submit(method, list(params or []))
+            done = call.done.wait(REQUEST_TIMEOUT * len(self.endpoints) + 5)
+        if not done:
+            metrics.inc("rpc_errors", method=method)
+            raise RPCError(f"Timed out waiting for {method}")
+        if call.error is not None:
+            metrics.inc("rpc_errors", method=method)
+            raise call.error
+        return call.response
+
+    def batch(self, calls):
+        """
+        Sends many (method, params) pairs in as few HTTP round trips as possible.
+        Returns the `result` of each, or the exception for calls that failed.
+        """
+        pending = [_Pending(m, list(p or []), None) for m, p in calls]
+        with self._lock:
+            self.rpc_calls += len(pending)
+        with metrics.timer("rpc_batch"):
+            self._flush(pending)
+
+        results = []
+        for call in pending:
+            if call.error is not None:
+                results.append(call.error)
+            elif "error" in call.response:
+                results.append(RPCError(call.response["error"]))
+            else:
+                results.append(call.response.get("result"))
+        return results
+
+    def stats(self):
+        return {
+            "http_requests": self.http_requests,
+            "rpc_calls": self.rpc_calls,
+            "deduplicated": self.deduplicated,
+            "endpoints": [
+                {
+                    "url": e.url,
+                    "latency_ms": round(e.latency * 1000, 1) if e.latency is not None else None,
+                    "failures": e.failures,
+                    "open": e.is_open(time.time()),
+                }
+                for e in self.endpoints
+            ],
+        }
+
+
+def encode_payload(payload):
+    try:
+        return json.dumps(payload)
+    except TypeError:
+        # HexBytes / AttributeDict params coming from web3 calls
+        from web3._utils.encoding import Web3JsonEncoder
+        return json.dumps(payload, cls=Web3JsonEncoder)
+
+# ================= WEB3 PROVIDER =================
+
+def make_provider(pool):
+    """web3 provider that routes every request through the shared RPCPool."""
+    from web3.providers.base import JSONBaseProvider
+
+    class PooledProvider(JSONBaseProvider):
+        def __init__(self, pool):
+            super().__init__()
+            self.pool = pool
+
+        def make_request(self, method, params):
+            response = dict(self.pool.request(method, params))
+            response["id"] = next(self.request_counter)
+            return response
+
+        def is_connected(self, show_traceback=False):
+            try:
+                return "result" in self.pool.request("web3_clientVersion", [])
+            except Exception:
+                if show_traceback:
+                    raise
+                return False
+
+    return PooledProvider(pool)
+
+
+def make_async_provider(pool):
+    """
+    AsyncWeb3 twin of make_provider: same pool, so the async stack gets the
+    failover, breaker, batching and ranking too. Each call waits for its
+    (possibly batched) response on a worker thread.
+    """
+    import asyncio
+    from web3.providers.async_base import AsyncJSONBaseProvider
+
+    class AsyncPooledProvider(AsyncJSONBaseProvider):
+        def __init__(self, pool):
+            super().__init__()
+            self.pool = pool
+
+        async def make_request(self, method, params):
+            response = dict(await asyncio.to_thread(self.pool.request, method, params))
+            response["id"] = next(self.request_counter)
+            return response
+
+        async def is_connected(self, show_traceback=False):
+            try:
+                return "result" in await asyncio.to_thread(self.pool.request, "web3_clientVersion", [])
+            except Exception:
+                if show_traceback:
+                    raise
+                return False
+
+    return AsyncPooledProvider(pool)
+
+# ================= SHARED INSTANCES =================
+
+_pool = None
+_w3 = None
+_init_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _init_lock:
+        if _pool is None:
+            _pool = RPCPool(RPC_URLS)
+        return _pool
+
+
+def get_w3():
+    """The process-wide Web3 instance (POA middleware included)."""
+    global _w3
+    pool = get_pool()
+    with _init_lock:
+        if _w3 is None:
+            from web3 import Web3
+            try:
+                from web3.middleware import ExtraDataToPOAMiddleware as POAMiddleware
+            except ImportError:
+                from web3.middleware import geth_poa_middleware as POAMiddleware
+
+            _w3 = Web3(make_provider(pool))
+            _w3.middleware_onion.inject(POAMiddleware, layer=0)
+        return _w3
+
+# ================= HELPERS =================
+
+BALANCE_OF_SELECTOR = "0x70a08231"
+
+
+def balance_of_call(token, wallet, block="latest"):
+    """eth_call params for ERC20 balanceOf(wallet), for use with RPCPool.batch."""
+    data = BALANCE_OF_SELECTOR + to_checksum_address(wallet)[2:].lower().rjust(64, "0")
+    return ("eth_call", [{"to": to_checksum_address(token), "data": data}, block])
+
+
+MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"   # same address on every EVM chain
+AGGREGATE3_SELECTOR = "0x82ad56cb"
+
+
+def multicall_call(calls, block="latest"):
+    """
+    eth_call params for Multicall3.aggregate3 over [(target, calldata hex)],
+    every call allowed to fail. Decode the result with decode_multicall.
+    """
+    from eth_abi import encode  # only needed by discovery-style bulk reads
+    payload = [(to_checksum_address(target), True, bytes.fromhex(data[2:])) for target, data in calls]
+    data = AGGREGATE3_SELECTOR + encode(["(address,bool,bytes)[]"], [payload]).hex()
+    return ("eth_call", [{"to": MULTICALL3, "data": data}, block])
+
+
+def decode_multicall(raw):
+    """Return data (bytes) of each aggregated call, None where it failed."""
+    from eth_abi import decode
+    (results,) = decode(["(bool,bytes)[]"], bytes.fromhex(raw[2:]))
+    return [data if ok else None for ok, data in results]
@@ -0,0 +1,189 @@
+import time
+import logging
+import threading
+
+import metrics
+
+logger = logging.getLogger("BotLogger")
+
+# ================= TASK =================
+
+class Task:
+    """
+    A unit of recurring bot work.
+
+    interval : seconds between runs (None = only runs when triggered)
+    priority : lower value is dispatched first when several tasks are due
+    timeout  : a run taking longer than this is reported as overrunning
+    align    : if set, runs are aligned to wall-clock multiples of this
+               (e.g. 900 = every 15m candle close), shifted by `offset`
+    """
+
+    def __init__(self, name, fn, interval=None, priority=50, timeout=30,
+                 align=None, offset=0.0, run_at_start=True):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.priority = priority
+        self.timeout = timeout
+        self.align = align
+        self.offset = offset
+
+        self.next_run = time.time() if run_at_start else self._next_after(time.time())
+        self.triggered = False
+
+        self.running = False
+        self.started_at = 0.0
+        self.timeout_reported = False
+
+        # Stats
+        self.runs = 0
+        self.failures = 0
+        self.overruns = 0
+        self.timeouts = 0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+
+        self._wake = threading.Event()
+        self._thread = None
+
+    def _next_after(self, now):
+        if self.align:
+            slot = (now - self.offset) // self.align
+            return (slot + 1) * self.align + self.offset
+        if self.interval:
+            return now + self.interval
+        return float("inf")
+
+    def is_due(self, now):
+        return self.triggered or now >= self.next_run
+
+
+# ================= SCHEDULER =================
+
+class Scheduler:
+    """
+    Runs each task on its own lane thread, so a slow task only ever
+    delays itself. The dispatcher loop only decides *when* lanes fire.
+    """
+
+    def __init__(self, tick=0.25):
+        self.tick = tick
+        self.tasks = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.hooks = []       # fn(task, duration) called after every run
+
+    def add(self, name, fn, **kwargs):
+        task = Task(name, fn, **kwargs)
+        self.tasks[name] = task
+        return task
+
+    def trigger(self, name):
+        """Requests an out-of-band run of a task (e.g. balance sync after a fill)."""
+        task = self.tasks.get(name)
+        if task:
+            task.triggered = True
+
+    def delay(self, name, seconds):
+        """Pushes the next scheduled run of a task back by `seconds`."""
+        task = self.tasks.get(name)
+        if task:
+            task.next_run = max(task.next_run, time.time() + seconds)
+
+    def stop(self):
+        self._stop.set()
+        for task in self.tasks.values():
+            task._wake.set()
+
+    # ---------- lanes ----------
+
+    def _lane(self, task):
+        while not self._stop.is_set():
+            task._wake.wait()
+            task._wake.clear()
+            if self._stop.is_set():
+                return
+
+            start = time.time()
+            try:
+                task.fn()
+            except Exception as e:
+                task.failures += 1
+                metrics.inc("task_failures", task=task.name)
+                logger.info(f"❌ Task {task.name} failed: {e}")
+            finally:
+                duration = time.time() - start
+                task.runs += 1
+                task.last_duration = duration
+                task.max_duration = max(task.max_duration, duration)
+                metrics.observe("task", duration, task=task.name)
+                with self._lock:
+                    task.next_run = task._next_after(time.time())
+                    task.running = False
+                for hook in self.hooks:
+                    try:
+                        hook(task, duration)
+                    except Exception as e:
+                        logger.info(f"❌ Scheduler hook failed: {e}")
+
+    def _start_lanes(self):
+        for task in self.tasks.values():
+            if task._thread is None:
+                task._thread = threading.Thread(
+                    target=self._lane, args=(task,), name=f"task-{task.name}", daemon=True
+                )
+                task._thread.start()
+
+    # ---------- dispatcher ----------
+
+    def _dispatch(self, now):
+        due = [t for t in self.tasks.values() if t.is_due(now)]
+        for task in sorted(due, key=lambda t: t.priority):
+            with self._lock:
+                if task.running:
+                    # Previous run still in flight: skip this slot instead of queueing
+                    if not task.triggered:
+                        task.overruns += 1
+                        metrics.inc("cycle_overruns", task=task.name)
+                        logger.info(f"⏱️ Task {task.name} overrun: previous run still active, skipping slot")
+                        task.next_run = task._next_after(now)
+                    continue
+
+                task.triggered = False
+                task.running = True
+                task.started_at = now
+                task.timeout_reported = False
+            task._wake.set()
+
+    def _watchdog(self, now):
+        for task in self.tasks.values():
+            if task.running and task.timeout and not task.timeout_reported:
+                elapsed = now - task.started_at
+                if elapsed > task.timeout:
+                    task.timeouts += 1
+                    metrics.inc("task_timeouts", task=task.name)
+                    task.timeout_reported = True
+                    logger.info(f"⏱️ Task {task.name} exceeded timeout ({elapsed:.1f}s > {task.timeout}s)")
+
+    def run_forever(self):
+        self._start_lanes()
+        while not self._stop.is_set():
+            now = time.time()
+            self._dispatch(now)
+            self._watchdog(now)
+            self._stop.wait(self.tick)
+
+    def stats(self):
+        return {
+            name: {
+                "runs": t.runs,
+                "failures": t.failures,
+                "overruns": t.overruns,
+                "timeouts": t.timeouts,
+                "last_duration": round(t.last_duration, 4),
+                "max_duration": round(t.max_duration, 4),
+                "running": t.running,
+            }
+            for name, t in self.tasks.items()
+        }
@@ -0,0 +1,75 @@
+import math
+import time
+import threading
+
+import metrics
+from config import CHAIN
+from rpc_pool import get_pool
+
+# Speculative execution for near-trigger signals. Once per block, every swap
+# that a trigger is about to need (a position close to its stop, a symbol
+# close to the RSI hook before a candle close) is sized, simulated on the
+# first working fee tier and signed with the block's nonce and gas, so a
+# confirmed trigger costs one send_raw_transaction. Prepared swaps are
+# rebuilt on every new block and dropped when no longer wanted; all share
+# one nonce, so once one is sent the rest are refused by send_prepared().
+
+MAX_AGE = max(3 * CHAIN.block_time, 3)      # seconds a prepared swap stays usable
+
+
+class StaleSwap(Exception):
+    """A prepared swap that certainly never reached the network; building a fresh one is safe."""
+
+
+class Speculator:
+    def __init__(self, targets):
+        """
+        `targets()` returns {(side, symbol): (token_in, token_out, amount)}
+        for the swaps worth having ready right now.
+        """
+        self.targets = targets
+        self.block = None
+        self.ready = {}         # (side, symbol) -> PreparedSwap
+        self._lock = threading.Lock()
+
+    def refresh(self, client):
+        """Rebuilds every prepared swap on a new block; returns how many are ready."""
+        head = int(get_pool().request("eth_blockNumber", [])["result"], 16)
+        if head == self.block:
+            return len(self.ready)
+
+        wanted = self.targets()
+        fresh = {}
+        if wanted:
+            with metrics.timer("speculative_refresh"):
+                gas_params = client._get_gas_params()
+                nonce = client._get_fresh_nonce()
+                for key, (token_in, token_out, amount) in wanted.items():
+                    try:
+                        prepared = client.prepare_swap(token_in, token_out, amount,
+                                                       gas_params=gas_params, nonce=nonce, block=head)
+                    except Exception as e:
+                        metrics.inc("speculative_failures", side=key[0])
+                        print(f"⚠️ Speculative {key[0]} {key[1]} not prepared: {e}")
+                        continue
+                    if prepared is not None:
+                        fresh[key] = prepared
+
+        with self._lock:
+            self.ready = fresh
+            self.block = head
+        return len(fresh)
+
+    def take(self, key, amount=None):
+        """
+        The prepared swap for `key` if it is fresh and (when `amount` is
+        given) for that exact amount; it is removed either way.
+        """
+        with self._lock:
+            prepared = self.ready.pop(key, None)
+        if (prepared is None or time.time() - prepared.built_at > MAX_AGE
+                or (amount is not None and not math.isclose(prepared.amount_in, amount, rel_tol=1e-9))):
+            metrics.inc("speculative_misses", side=key[0])
+            return None
+        metrics.inc("speculative_hits", side=key[0])
+        return prepared
@@ -1,19 +1,33 @@
 import sqlite3
-import json
 import time
-import os
+
+import chains
+import metrics
+import accounts
+import risk_store
+from config import NATIVE
 
 # ================= PATHS =================
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_FILE = os.path.join(BASE_DIR, "trader.db")
-STATE_FILE = os.path.join(BASE_DIR, "state.json")
+DB_FILE = chains.data_path("trader.db")
+STATE_FILE = risk_store.STATE_FILE
+
+
+def db_file():
+    """SQLite file of the account this code runs as (accounts.py)."""
+    return accounts.current().db_file or DB_FILE
+
 
+# token leg of the swap, gas units, gas paid in the native token
+TRADE_FILL_COLUMNS = [("qty", "REAL"), ("gas_used", "INTEGER"), ("gas_cost", "REAL")]
+
+NATIVE_ASSET = NATIVE
+DUST = 0.00001
 
 # ================= DATABASE =================
 
 def init_db():
-    conn = sqlite3.connect(DB_FILE, timeout=10)
+    conn = sqlite3.connect(db_file(), timeout=10)
     conn.execute("PRAGMA journal_mode=WAL;")
     c = conn.cursor()
 
@@ -34,6 +48,18 @@ def init_db():
         )
     """)
 
+    # ---- Exact fill columns (fills.py); added in place on older databases ----
+    existing = {row[1] for row in c.execute("PRAGMA table_info(trades)")}
+    for column, kind in TRADE_FILL_COLUMNS:
+        if column not in existing:
+            c.execute(f"ALTER TABLE trades ADD COLUMN {column} {kind}")
+
+    # ---- Trade history indexes (keyset pagination on (timestamp, id)) ----
+    c.execute("CREATE INDEX IF NOT EXISTS idx_trades_ts_id ON trades (timestamp, id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_trades_pair_ts_id ON trades (pair, timestamp, id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_trades_side_ts_id ON trades (side, timestamp, id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_trades_tag_ts_id ON trades (strategy_tag, timestamp, id)")
+
     # ---- Balances table ----
     c.execute("""
         CREATE TABLE IF NOT EXISTS balances (
@@ -69,12 +95,31 @@ def init_db():
         )
     """)
 
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_portfolio_snapshots_ts
+        ON portfolio_snapshots (timestamp)
+    """)
+
+    # ---- Equity rollups (OHLC per bucket start, see rollups.py) ----
+    for table in ("equity_5m", "equity_1h"):
+        c.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                bucket INTEGER PRIMARY KEY,
+                open REAL,
+                high REAL,
+                low REAL,
+                close REAL,
+                samples INTEGER
+            )
+        """)
+
     conn.commit()
     conn.close()
 
 
 # ================= TRADES =================
 
+@metrics.timed("sqlite_write", op="record_trade")
 def record_trade(
     pair,
     side,
@@ -84,11 +129,20 @@ def record_trade(
     tx,
     strategy_tag=None,
     equity_before=None,
-    equity_after=None
+    equity_after=None,
+    qty=None,
+    gas_used=None,
+    gas_cost=None
 ):
+    """
+    With `qty` (an exact fill from fills.py) the balances are moved by the
+    fill itself: token +/- qty, USDC -/+ the USDC legs, MATIC - gas. Without
+    it the old estimate logic applies and a balance sync has to follow.
+    """
     if tx is not None and not isinstance(tx, (str, int)):
         tx = str(tx)
-    conn = sqlite3.connect(DB_FILE, timeout=10)
+    now = int(time.time())
+    conn = sqlite3.connect(db_file(), timeout=10)
     c = conn.cursor()
 
     c.execute("""
@@ -97,11 +151,12 @@ def record_trade(
             amount_in, amount_out,
             price, tx,
             strategy_tag,
-            equity_before, equity_after
+            equity_before, equity_after,
+            qty, gas_used, gas_cost
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, (
-        int(time.time()),
+        now,
         pair,
         side,
         amount_in,
@@ -110,12 +165,16 @@ def record_trade(
         tx,
         strategy_tag,
         equity_before,
-        equity_after
+        equity_after,
+        qty,
+        gas_used,
+        gas_cost
     ))
 
-    # --- NEW: CRITICAL SYNC LOGIC ---
     asset = pair.split('/')[0]
-    if side.upper() == "SELL":
+    if qty is not None:
+        _apply_fill(c, asset, side.upper(), qty, amount_in, amount_out, price, gas_cost, now)
+    elif side.upper() == "SELL":
         # When we sell, we explicitly set the balance to 0 in our DB
         # to prevent "Ghost Positions" before the next sync happens.
         c.execute("UPDATE balances SET amount = 0, price = 0 WHERE asset = ?", (asset,))
@@ -125,13 +184,38 @@ def record_trade(
         
     conn.commit()
     conn.close()
+    metrics.inc("trades", side=side.upper())
 
 
 # ================= BALANCES =================
 
+def _adjust_balance(c, asset, delta, now):
+    c.execute("""
+        INSERT INTO balances (asset, amount, updated_at)
+        VALUES (?, MAX(?, 0), ?)
+        ON CONFLICT(asset) DO UPDATE SET
+            amount=MAX(balances.amount + ?, 0),
+            updated_at=excluded.updated_at
+    """, (asset, delta, now, delta))
+
+
+def _apply_fill(c, asset, side, qty, usdc_in, usdc_out, price, gas_cost, now):
+    if side == "BUY":
+        _adjust_balance(c, asset, qty, now)
+        c.execute("UPDATE balances SET price = ?, entry_price = ? WHERE asset = ?", (price, price, asset))
+    else:
+        _adjust_balance(c, asset, -qty, now)
+        # Same "no ghost position" rule as before, only with the exact remainder
+        c.execute("UPDATE balances SET amount = 0, price = 0 WHERE asset = ? AND amount <= ?", (asset, DUST))
+    _adjust_balance(c, "USDC", (usdc_out or 0) - (usdc_in or 0), now)
+    if gas_cost:
+        _adjust_balance(c, NATIVE_ASSET, -gas_cost, now)
+
+
+@metrics.timed("sqlite_write", op="set_balance")
 def set_balance(asset, amount, price=0, entry_price=0):
     now = int(time.time())
-    conn = sqlite3.connect(DB_FILE, timeout=10)
+    conn = sqlite3.connect(db_file(), timeout=10)
     c = conn.cursor()
 
     c.execute("""
@@ -150,10 +234,47 @@ def set_balance(asset, amount, price=0, entry_price=0):
     conn.close()
 
 
+@metrics.timed("sqlite_write", op="apply_balance_deltas")
+def apply_balance_deltas(deltas, cursor_key=None, cursor=None):
+    """
+    Adds {asset: delta} to `balances` and, if given, moves the meta cursor in
+    the same transaction, so a crash can never apply one block range twice.
+    """
+    now = int(time.time())
+    conn = sqlite3.connect(db_file(), timeout=10)
+    c = conn.cursor()
+    for asset, delta in deltas.items():
+        _adjust_balance(c, asset, delta, now)
+    if cursor_key is not None:
+        c.execute("""
+            INSERT INTO meta (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value=excluded.value
+        """, (cursor_key, cursor))
+    conn.commit()
+    conn.close()
+
+
+def recorded_fill_txs(txs):
+    """The subset of tx hashes whose balances were already moved by an exact fill."""
+    txs = list(txs)
+    if not txs:
+        return set()
+    conn = sqlite3.connect(db_file(), timeout=10)
+    c = conn.cursor()
+    c.execute(
+        f"SELECT lower(tx) FROM trades WHERE qty IS NOT NULL AND lower(tx) IN ({','.join('?' * len(txs))})",
+        [t.lower() for t in txs]
+    )
+    found = {row[0] for row in c.fetchall()}
+    conn.close()
+    return found
+
+
 # ================= META =================
 
+@metrics.timed("sqlite_write", op="set_meta")
 def set_meta(key, value):
-    conn = sqlite3.connect(DB_FILE, timeout=10)
+    conn = sqlite3.connect(db_file(), timeout=10)
     c = conn.cursor()
 
     c.execute("""
@@ -167,7 +288,7 @@ def set_meta(key, value):
 
 
 def get_meta(key, default=0):
-    conn = sqlite3.connect(DB_FILE, timeout=10)
+    conn = sqlite3.connect(db_file(), timeout=10)
     c = conn.cursor()
 
     c.execute("SELECT value FROM meta WHERE key = ?", (key,))
@@ -180,7 +301,7 @@ def get_meta(key, default=0):
 # ================= PORTFOLIO =================
 
 def get_total_equity():
-    conn = sqlite3.connect(DB_FILE)
+    conn = sqlite3.connect(db_file())
     c = conn.cursor()
 
     c.execute("""
@@ -193,10 +314,11 @@ def get_total_equity():
     return total
 
 
+@metrics.timed("sqlite_write", op="snapshot_portfolio")
 def snapshot_portfolio(realized_pnl=0):
     total = get_total_equity()
 
-    conn = sqlite3.connect(DB_FILE)
+    conn = sqlite3.connect(db_file())
     c = conn.cursor()
 
     c.execute("""
@@ -242,16 +364,12 @@ def snapshot_portfolio(realized_pnl=0):
 # ================= BOT STATE (JSON) =================
 
 def load_state():
-    try:
-        with open(STATE_FILE, "r") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+    # Served from the shared in-memory risk store (see risk_store.py)
+    return risk_store.store.read()
 
 
 def save_state(state):
-    with open(STATE_FILE, "w") as f:
-        json.dump(state, f)
+    risk_store.store.replace(state)
 
 
 # ================= PORTFOLIO META HELPERS =================
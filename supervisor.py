@@ -0,0 +1,115 @@
+import os
+import time
+import signal
+import multiprocessing
+
+import chains
+
+# Runs the same strategy on several EVM chains from one box: one worker
+# process per chain id in CHAINS (comma-separated, e.g. "137,42161";
+# defaults to CHAIN_ID). A worker sets CHAIN_ID before importing any of the
+# bot, so config, token_list, uniswap_* and rpc_pool resolve that chain's
+# deployments (chains.py), endpoints (RPC_URLS_<chain_id>) and files; each
+# process has its own RPC pool, gas oracle, token registry and scheduler.
+# Workers report into chain_status in the shared DB (dashboard /api/chains).
+# A worker that exits is restarted with exponential backoff.
+
+CHAIN_IDS = list(dict.fromkeys(int(c) for c in os.getenv("CHAINS", str(chains.active_id())).split(",") if c.strip()))
+
+POLL_INTERVAL = 5           # seconds between liveness checks
+RESTART_BACKOFF = 5         # first restart delay, doubled per consecutive failure
+MAX_BACKOFF = 300
+STABLE_AFTER = 600          # a worker up this long has its failure count reset
+STOP_TIMEOUT = 20           # grace period on shutdown before kill
+
+
+def run_chain(chain_id):
+    """Worker entry point. Spawned, so nothing of the bot is imported yet."""
+    os.environ["CHAIN_ID"] = str(chain_id)
+    try:
+        import bot
+        bot.main()
+    except Exception as e:
+        chains.report_status(chain_id, status="crashed", error=f"{type(e).__name__}: {e}")
+        raise
+
+
+class Supervisor:
+    def __init__(self, chain_ids):
+        for chain_id in chain_ids:
+            chains.get(chain_id)        # unknown ids fail here, not in a worker
+        self.chain_ids = chain_ids
+        self.ctx = multiprocessing.get_context("spawn")
+        self.procs = {}                 # chain id -> Process
+        self.started_at = {}
+        self.failures = {c: 0 for c in chain_ids}
+        self.restarts = {c: 0 for c in chain_ids}
+        self.next_start = {c: 0 for c in chain_ids}
+        self.stopping = False
+
+    def _spawn(self, chain_id):
+        chain = chains.get(chain_id)
+        proc = self.ctx.Process(target=run_chain, args=(chain_id,), name=f"chain-{chain.name}")
+        proc.start()
+        self.procs[chain_id] = proc
+        self.started_at[chain_id] = time.time()
+        chains.report_status(chain_id, name=chain.name, pid=proc.pid, status="starting",
+                             restarts=self.restarts[chain_id])
+        print(f"🚀 {chain.name} worker started (chain {chain_id}, pid {proc.pid})")
+
+    def poll(self):
+        now = time.time()
+        for chain_id in self.chain_ids:
+            proc = self.procs.get(chain_id)
+            if proc is not None and proc.is_alive():
+                if now - self.started_at[chain_id] > STABLE_AFTER:
+                    self.failures[chain_id] = 0
+                continue
+
+            if proc is not None:
+                # Just exited: schedule the restart, keep the worker's own error
+                del self.procs[chain_id]
+                self.failures[chain_id] += 1
+                delay = min(RESTART_BACKOFF * 2 ** (self.failures[chain_id] - 1), MAX_BACKOFF)
+                self.next_start[chain_id] = now + delay
+                self.restarts[chain_id] += 1
+                chains.report_status(chain_id, status=f"exited ({proc.exitcode})", pid=None,
+                                     restarts=self.restarts[chain_id])
+                print(f"⚠️ {chains.get(chain_id).name} worker exited with {proc.exitcode}, restarting in {delay}s")
+            elif now >= self.next_start[chain_id]:
+                self._spawn(chain_id)
+
+    def stop(self, *_):
+        self.stopping = True
+
+    def shutdown(self):
+        for proc in self.procs.values():
+            proc.terminate()
+        deadline = time.time() + STOP_TIMEOUT
+        for chain_id, proc in self.procs.items():
+            proc.join(max(0.0, deadline - time.time()))
+            if proc.is_alive():
+                proc.kill()
+            chains.report_status(chain_id, status="stopped", pid=None)
+        self.procs.clear()
+
+    def run(self):
+        print(f"🧭 Supervising {len(self.chain_ids)} chain(s): "
+              f"{', '.join(chains.get(c).name for c in self.chain_ids)}")
+        try:
+            while not self.stopping:
+                self.poll()
+                time.sleep(POLL_INTERVAL)
+        finally:
+            self.shutdown()
+
+
+def main():
+    supervisor = Supervisor(CHAIN_IDS)
+    signal.signal(signal.SIGTERM, supervisor.stop)
+    signal.signal(signal.SIGINT, supervisor.stop)
+    supervisor.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,41 @@
-TOKEN_BY_SYMBOL = {
-    "WETH": "0x7ceB23fD6bC0adD59E62ac25578270cFf1b9f619",
-    "WMATIC": "0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270",
-    "WBTC": "0x1BFD67037B42Cf73acF2047067bd4F2C47D9BfD6",
-    "LINK": "0x53E0bca35eC356BD5ddDFebbD1Fc0fD03FaBad39",
-    "UNI": "0xb33EaAd8d922B1083446DC23f610c2567fB5180f",
-}
+import json
+import threading
 
+import chains
+
+# Tracked universe of the chain this process runs (chains.py): what the bot
+# trades, syncs balances for and follows in the wallet indexer.
+TOKEN_BY_SYMBOL = dict(chains.active().tokens)
+
+# Wider candidate universe for pair_discovery.py: a JSON file of
+# {"SYMBOL": "0xaddress"}. Candidates are only indexed; one joins
+# TOKEN_BY_SYMBOL (promote()) once its pool passes MIN_TVL / MIN_VOLUME.
+# Other chains read TOKEN_LIST_FILE_<chain_id>.
+TOKEN_LIST_FILE = chains.env("TOKEN_LIST_FILE")
+
+CANDIDATES = {}
+
+if TOKEN_LIST_FILE:
+    with open(TOKEN_LIST_FILE) as f:
+        for symbol, addr in json.load(f).items():
+            if symbol not in TOKEN_BY_SYMBOL:
+                CANDIDATES[symbol] = addr
+
+_promote_lock = threading.Lock()
+
+
+def universe():
+    """Every token pair_discovery indexes: tracked tokens plus candidates."""
+    return {**CANDIDATES, **TOKEN_BY_SYMBOL}
+
+
+def promote(symbols):
+    """Moves the given candidates into the tracked set; returns [(symbol, address)] newly tracked."""
+    promoted = []
+    with _promote_lock:
+        for symbol in symbols:
+            addr = CANDIDATES.pop(symbol, None)
+            if addr is not None:
+                TOKEN_BY_SYMBOL[symbol] = addr
+                promoted.append((symbol, addr))
+    return promoted
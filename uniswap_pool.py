@@ -1,4 +1,6 @@
-from web3 import Web3
+from eth_utils import keccak, to_checksum_address
+
+import chains
 
 POOL_ABI = [
     {
@@ -22,7 +24,7 @@ def get_sqrt_price_limit(w3, pool_address, max_bps=30, is_buy=True):
     max_bps: max price movement allowed (30 = 0.30%)
     """
     pool = w3.eth.contract(
-        address=Web3.to_checksum_address(pool_address),
+        address=to_checksum_address(pool_address),
         abi=POOL_ABI
     )
 
@@ -36,3 +38,41 @@ def get_sqrt_price_limit(w3, pool_address, max_bps=30, is_buy=True):
         return int(sqrt_price + delta)
     else:
         return int(sqrt_price - delta)
+
+
+# ================= POOL ADDRESSES =================
+
+UNISWAP_V3_FACTORY = chains.active().factory
+POOL_INIT_CODE_HASH = "0xe34f199b19b2b4f47f68442619d555527d244f78a3297ea89325f843f87b8b54"
+
+SLOT0_SELECTOR = "0x3850c7bd"
+
+
+def sort_tokens(token_a, token_b):
+    a = to_checksum_address(token_a)
+    b = to_checksum_address(token_b)
+    return (a, b) if int(a, 16) < int(b, 16) else (b, a)
+
+
+def compute_pool_address(token_a, token_b, fee, factory=UNISWAP_V3_FACTORY):
+    """
+    Derives a Uniswap V3 pool address offline (CREATE2), no RPC needed.
+    """
+    token0, token1 = sort_tokens(token_a, token_b)
+    salt = keccak(
+        bytes.fromhex(token0[2:].rjust(64, "0"))
+        + bytes.fromhex(token1[2:].rjust(64, "0"))
+        + int(fee).to_bytes(32, "big")
+    )
+    digest = keccak(
+        b"\xff"
+        + bytes.fromhex(to_checksum_address(factory)[2:])
+        + salt
+        + bytes.fromhex(POOL_INIT_CODE_HASH[2:])
+    )
+    return to_checksum_address(digest[12:])
+
+
+def sqrt_price_to_price(sqrt_price_x96, decimals0, decimals1):
+    """Price of token0 in units of token1."""
+    return (sqrt_price_x96 / 2 ** 96) ** 2 * 10 ** (decimals0 - decimals1)
@@ -1,44 +1,80 @@
 import time
+import threading
 from web3 import Web3
+from web3.exceptions import TransactionNotFound
 from decimal import Decimal
-try:
-    from web3.middleware import ExtraDataToPOAMiddleware as POAMiddleware
-except ImportError:
-    from web3.middleware import geth_poa_middleware as POAMiddleware
 
 from config import (
-    RPC_URL, PRIVATE_KEY, WALLET_ADDRESS,
-    UNISWAP_V3_ROUTER, USDC, CHAIN_ID
+    UNISWAP_V3_ROUTER, USDC, CHAIN_ID, CHAIN
 )
+import accounts
 from uniswap_abi import SWAP_ROUTER_ABI, ERC20_ABI
+import metrics
+from rpc_pool import get_w3
+from speculative import StaleSwap
 
 # ================= CONFIG & ABIs =================
-UNISWAP_V3_QUOTER = "0x61ffe014ba17989e743c5f6cb21bf9697530b21e"
-SWAP_ROUTER_ADDRESS = "0xE592427A0AEce92De3Edee1F18E0157C05861564"
+UNISWAP_V3_QUOTER = CHAIN.quoter
+SWAP_ROUTER_ADDRESS = CHAIN.router
+FALLBACK_BASE_FEE_GWEI, FALLBACK_PRIORITY_FEE_GWEI = CHAIN.gas_fallback_gwei
+
+# A just-sent tx may not be in a lagging node's pending count yet; trust our
+# own next nonce for this long after a send (survives restarts via warm_state)
+NONCE_HINT_TTL = 120
+
+FEE_TIERS = [500, 3000, 10000]
+
+
+class PreparedSwap:
+    """A simulated, signed exactInputSingle waiting for send_prepared()."""
+
+    def __init__(self, tx, raw, token_in, token_out, amount_in, fee, block=None):
+        self.tx = tx
+        self.raw = raw
+        self.hash = Web3.to_hex(Web3.keccak(raw))
+        self.token_in = token_in
+        self.token_out = token_out
+        self.amount_in = amount_in      # human units, as passed to prepare_swap
+        self.fee = fee
+        self.block = block
+        self.built_at = time.time()
+
+    def __repr__(self):
+        return f"PreparedSwap({self.token_in}->{self.token_out}, {self.amount_in}, fee={self.fee}, block={self.block})"
+
 
 class UniswapV3Client:
-    def __init__(self):
-        self.w3 = Web3(Web3.HTTPProvider(RPC_URL))
-        # Inject POA middleware for Polygon
-        self.w3.middleware_onion.inject(POAMiddleware, layer=0)
-        
-        self.account = self.w3.eth.account.from_key(PRIVATE_KEY)
+    def __init__(self, account=None):
+        # Shared pooled transport (POA middleware already injected)
+        self.w3 = get_w3()
+
+        # One client per wallet (accounts.py): own key, send lock and nonce
+        account = account or accounts.current()
+        self.wallet = account.wallet
+        self.account = self.w3.eth.account.from_key(account.private_key)
         self.router_address = Web3.to_checksum_address(SWAP_ROUTER_ADDRESS)
         self.router = self.w3.eth.contract(address=self.router_address, abi=SWAP_ROUTER_ABI)
 
+        # Scheduler lanes may trade concurrently; nonce + sign + send must not interleave
+        self._send_lock = threading.Lock()
+
+        # Warm caches (restored by warm_state.py after a restart)
+        self.decimals = {}
+        self.nonce_hint = None      # (next nonce, unix ts of the send)
+
     def _get_gas_params(self):
         """
         Dynamically calculates EIP-1559 gas fees based on current network congestion.
         """
         try:
             latest_block = self.w3.eth.get_block("latest")
-            base_fee = latest_block.get("baseFeePerGas", self.w3.to_wei(50, 'gwei'))
+            base_fee = latest_block.get("baseFeePerGas", self.w3.to_wei(FALLBACK_BASE_FEE_GWEI, 'gwei'))
             
-            # Suggest a priority fee (tip) from the network, fallback to 35 Gwei if it fails
+            # Suggest a priority fee (tip) from the network, chain fallback if it fails
             try:
                 suggested_priority_fee = self.w3.eth.max_priority_fee_per_gas
             except:
-                suggested_priority_fee = self.w3.to_wei(35, 'gwei')
+                suggested_priority_fee = self.w3.to_wei(FALLBACK_PRIORITY_FEE_GWEI, 'gwei')
 
             # We multiply base fee by 2.5 to ensure inclusion during spikes
             # Max Fee = (Base Fee * 2.5) + Priority Fee
@@ -55,87 +91,173 @@ class UniswapV3Client:
 
     def _get_fresh_nonce(self):
         """Always get the most recent nonce from the blockchain."""
-        return self.w3.eth.get_transaction_count(WALLET_ADDRESS, 'pending')
+        nonce = self.w3.eth.get_transaction_count(self.wallet, 'pending')
+        if self.nonce_hint and time.time() - self.nonce_hint[1] < NONCE_HINT_TTL:
+            nonce = max(nonce, self.nonce_hint[0])
+        return nonce
+
+    def _sent(self, tx):
+        self.nonce_hint = (tx["nonce"] + 1, time.time())
+
+    def token_decimals(self, token):
+        token = Web3.to_checksum_address(token)
+        if token not in self.decimals:
+            erc20 = self.w3.eth.contract(address=token, abi=ERC20_ABI)
+            self.decimals[token] = erc20.functions.decimals().call()
+        return self.decimals[token]
 
     def _force_approve(self, token, amount_wei):
         """Ensures the router is allowed to spend your tokens."""
         token_addr = Web3.to_checksum_address(token)
         erc20 = self.w3.eth.contract(address=token_addr, abi=ERC20_ABI)
         
-        current_allowance = erc20.functions.allowance(WALLET_ADDRESS, self.router_address).call()
+        current_allowance = erc20.functions.allowance(self.wallet, self.router_address).call()
         
         if current_allowance < amount_wei:
             print(f"🔓 Approving {token_addr} for Router...")
             gas_params = self._get_gas_params()
             
             # Approve a very large amount to avoid frequent re-approvals
-            approve_tx = erc20.functions.approve(self.router_address, 2**256 - 1).build_transaction({
-                "from": WALLET_ADDRESS,
-                "nonce": self._get_fresh_nonce(),
-                "gas": 70000,
-                "chainId": CHAIN_ID,
-                **gas_params
-            })
-            
-            signed = self.account.sign_transaction(approve_tx)
-            tx_hash = self.w3.eth.send_raw_transaction(signed.rawTransaction)
+            with self._send_lock:
+                approve_tx = erc20.functions.approve(self.router_address, 2**256 - 1).build_transaction({
+                    "from": self.wallet,
+                    "nonce": self._get_fresh_nonce(),
+                    "gas": 70000,
+                    "chainId": CHAIN_ID,
+                    **gas_params
+                })
+
+                signed = self.account.sign_transaction(approve_tx)
+                tx_hash = self.w3.eth.send_raw_transaction(signed.rawTransaction)
+                self._sent(approve_tx)
             print(f"⏳ Approval sent: {tx_hash.hex()}. Waiting...")
             self.w3.eth.wait_for_transaction_receipt(tx_hash)
             time.sleep(5) # Cooldown for network state sync
 
+    def _swap_params(self, token_in, token_out, amount_in_wei, fee_tier):
+        return {
+            "tokenIn": token_in,
+            "tokenOut": token_out,
+            "fee": fee_tier,
+            "recipient": self.wallet,
+            "deadline": int(time.time()) + 600,
+            "amountIn": amount_in_wei,
+            "amountOutMinimum": 0,
+            "sqrtPriceLimitX96": 0
+        }
+
+    def _simulate(self, params):
+        # This 'call()' simulates the TX without spending gas.
+        # If it fails here, we don't send the real TX.
+        with metrics.timer("swap_simulate", fee=params["fee"]):
+            self.router.functions.exactInputSingle(params).call({"from": self.wallet})
+
+    def _sign_swap(self, params, gas_params, nonce):
+        tx = self.router.functions.exactInputSingle(params).build_transaction({
+            "from": self.wallet,
+            "nonce": nonce,
+            "gas": 300000,
+            "chainId": CHAIN_ID,
+            **gas_params
+        })
+        return tx, self.account.sign_transaction(tx).rawTransaction
+
+    def _amount_wei(self, token, amount):
+        return int(Decimal(str(amount)) * (10 ** self.token_decimals(token)))
+
+    @metrics.timed("swap")
     def swap_exact_input(self, token_in, token_out, amount_in):
             """Executes a swap with Pre-flight Simulation to save gas."""
             token_in = Web3.to_checksum_address(token_in)
             token_out = Web3.to_checksum_address(token_out)
-            
-            erc20_in = self.w3.eth.contract(address=token_in, abi=ERC20_ABI)
-            decimals = erc20_in.functions.decimals().call()
-            amount_in_wei = int(Decimal(str(amount_in)) * (10 ** decimals))
+            amount_in_wei = self._amount_wei(token_in, amount_in)
     
             # 1. Approval check
             self._force_approve(token_in, amount_in_wei)
     
             # 2. Try multiple fee tiers to find liquidity
             # 500 = 0.05%, 3000 = 0.3%, 10000 = 1%
-            for fee_tier in [500, 3000, 10000]:
-                params = {
-                    "tokenIn": token_in,
-                    "tokenOut": token_out,
-                    "fee": fee_tier,
-                    "recipient": WALLET_ADDRESS,
-                    "deadline": int(time.time()) + 600,
-                    "amountIn": amount_in_wei,
-                    "amountOutMinimum": 0,
-                    "sqrtPriceLimitX96": 0
-                }
+            for fee_tier in FEE_TIERS:
+                params = self._swap_params(token_in, token_out, amount_in_wei, fee_tier)
     
                 try:
                     gas_params = self._get_gas_params()
                     
                     # --- PRE-FLIGHT SIMULATION ---
-                    # This 'call()' simulates the TX without spending gas.
-                    # If it fails here, we don't send the real TX.
-                    self.router.functions.exactInputSingle(params).call({"from": WALLET_ADDRESS})
+                    self._simulate(params)
                     
                     # If simulation passes, build and send the real transaction
-                    tx = self.router.functions.exactInputSingle(params).build_transaction({
-                        "from": WALLET_ADDRESS,
-                        "nonce": self._get_fresh_nonce(),
-                        "gas": 300000, 
-                        "chainId": CHAIN_ID,
-                        **gas_params
-                    })
-                    
-                    signed = self.account.sign_transaction(tx)
-                    tx_hash = self.w3.eth.send_raw_transaction(signed.rawTransaction)
+                    with self._send_lock, metrics.timer("swap_send"):
+                        tx, raw = self._sign_swap(params, gas_params, self._get_fresh_nonce())
+                        tx_hash = self.w3.eth.send_raw_transaction(raw)
+                        self._sent(tx)
                     return tx_hash.hex()
     
                 except Exception as e:
+                    metrics.inc("swap_simulation_failures", fee=fee_tier)
                     print(f"⚠️ Tier {fee_tier} failed simulation: {e}")
                     continue # Try the next fee tier
     
             raise Exception("❌ All liquidity tiers failed simulation. Trade cancelled to save gas.")
 
+    @metrics.timed("swap_prepare")
+    def prepare_swap(self, token_in, token_out, amount_in, gas_params=None, nonce=None, block=None):
+        """
+        Everything swap_exact_input does short of sending: the first fee tier
+        that simulates is built and signed with the given (or current) gas
+        and nonce. Never approves; returns None when the allowance is short
+        or no tier simulates. send_prepared() submits the result.
+        """
+        token_in = Web3.to_checksum_address(token_in)
+        token_out = Web3.to_checksum_address(token_out)
+        amount_in_wei = self._amount_wei(token_in, amount_in)
+
+        erc20 = self.w3.eth.contract(address=token_in, abi=ERC20_ABI)
+        if erc20.functions.allowance(self.wallet, self.router_address).call() < amount_in_wei:
+            return None
+
+        gas_params = gas_params or self._get_gas_params()
+        nonce = self._get_fresh_nonce() if nonce is None else nonce
+        for fee_tier in FEE_TIERS:
+            params = self._swap_params(token_in, token_out, amount_in_wei, fee_tier)
+            try:
+                self._simulate(params)
+            except Exception:
+                metrics.inc("swap_simulation_failures", fee=fee_tier)
+                continue
+            tx, raw = self._sign_swap(params, gas_params, nonce)
+            return PreparedSwap(tx, raw, token_in, token_out, amount_in, fee_tier, block)
+        return None
+
+    def _known(self, tx_hash):
+        try:
+            return self.w3.eth.get_transaction(tx_hash) is not None
+        except TransactionNotFound:
+            return False
+
+    def send_prepared(self, prepared):
+        """
+        Submits a prepare_swap() result: one send_raw_transaction. Raises
+        StaleSwap only when the tx provably never went out; any other error
+        means it may have, and the swap must not be sent again.
+        """
+        with self._send_lock, metrics.timer("swap_send"):
+            # Another send since it was signed has taken its nonce
+            if self.nonce_hint and self.nonce_hint[0] > prepared.tx["nonce"]:
+                raise StaleSwap(f"nonce {prepared.tx['nonce']} already used")
+            try:
+                tx_hash = self.w3.eth.send_raw_transaction(prepared.raw).hex()
+            except Exception as e:
+                # Timeouts, "already known", errors after broadcast: ask the node
+                if self._known(prepared.hash):
+                    tx_hash = prepared.hash
+                elif self.w3.eth.get_transaction_count(self.wallet, "pending") <= prepared.tx["nonce"]:
+                    raise StaleSwap(f"not broadcast ({e})") from e
+                else:
+                    raise   # nonce taken by a tx we can't see: never send again
+            self._sent(prepared.tx)
+        return tx_hash
+
     def buy_with_usdc(self, token, usdc_amount):
         return self.swap_exact_input(USDC, token, usdc_amount)
 
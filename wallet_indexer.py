@@ -0,0 +1,140 @@
+import threading
+
+import metrics
+from config import CHAIN, NATIVE
+from fills import TRANSFER_TOPIC
+from rpc_pool import get_pool
+from state import get_meta, set_meta, apply_balance_deltas, recorded_fill_txs
+
+# Follows the chain and applies the wallet's ERC20 Transfer logs to
+# `balances` as deltas, so deposits, withdrawals and airdrops show up within
+# a few blocks instead of at the next full resync. Each batch of blocks costs
+# one round trip (logs from + logs to + the end block's hash), independent
+# of how many tokens are tracked.
+#
+# Only blocks CONFIRMATIONS deep are applied; a changed hash at the cursor
+# means a deeper reorg, which falls back to a full reconciliation. Txs whose
+# balances were already moved by an exact fill (fills.py) are skipped.
+# The native gas token moves no logs, so it stays with reconciliation.
+
+CURSOR_KEY = "wallet_index_block"   # meta: last block applied (or reconciled)
+CONFIRMATIONS = CHAIN.confirmations # ~1 minute of blocks (chains.py)
+MAX_RANGE = 2000                    # blocks per eth_getLogs
+MAX_CATCHUP = 50000                 # further behind than this, resync instead
+
+
+def _topic(address):
+    return "0x" + address.lower()[2:].rjust(64, "0")
+
+
+def _address(topic):
+    return "0x" + topic[-40:].lower()
+
+
+class WalletIndexer:
+    def __init__(self, wallet, tokens, reconcile):
+        """
+        `tokens` is [(symbol, address, decimals)] as in bot.TOKENS_TO_TRACK;
+        `reconcile()` is a full balance sync that ends with reconciled(block).
+        """
+        self.wallet = wallet.lower()
+        self.tokens = {addr.lower(): (symbol, decimals) for symbol, addr, decimals in tokens if addr != NATIVE}
+        self.reconcile = reconcile
+        # Held while a range is applied and while a full sync writes, so the
+        # two never interleave (re-entrant: poll() may call reconcile())
+        self.lock = threading.RLock()
+        self.last = None        # (block, hash) of the last applied range end
+        self.fill_block = 0     # newest block of an exact fill applied to balances
+
+    def track(self, symbol, address, decimals):
+        """Follows one more token; its balance so far comes from the next full sync."""
+        with self.lock:
+            self.tokens[address.lower()] = (symbol, decimals)
+
+    def fill_recorded(self, block):
+        """Called, under `lock`, after an exact fill (fills.record) moved the balances."""
+        self.fill_block = max(self.fill_block, block)
+
+    def stale(self, block):
+        """
+        Under `lock`: True if a fill newer than `block` was applied since, so
+        absolute balances read at `block` would erase it (and poll() skips
+        recorded fills, so nothing would bring it back).
+        """
+        return self.fill_block > block
+
+    def reconciled(self, block):
+        """Called by the full sync, under `lock`, after writing balances read at `block`."""
+        set_meta(CURSOR_KEY, block)
+        self.last = None
+
+    def _resync(self, reason):
+        print(f"🔁 Wallet index: {reason}, reconciling balances")
+        metrics.inc("wallet_index_resyncs")
+        self.reconcile()
+
+    def poll(self):
+        """Applies every newly confirmed block; returns the number of transfers applied."""
+        pool = get_pool()
+        with self.lock:
+            cursor = int(get_meta(CURSOR_KEY, 0))
+            head, block = pool.batch([
+                ("eth_blockNumber", []),
+                ("eth_getBlockByNumber", [hex(cursor), False]),
+            ])
+            if isinstance(head, Exception):
+                raise head
+            head = int(head, 16)
+
+            if not cursor or head - cursor > MAX_CATCHUP:
+                self._resync("no recent cursor")
+                return 0
+            if self.last and self.last[0] == cursor and isinstance(block, dict) and block["hash"] != self.last[1]:
+                metrics.inc("wallet_reorgs")
+                self._resync(f"reorg below block {cursor}")
+                return 0
+
+            applied = 0
+            safe = head - CONFIRMATIONS
+            while cursor < safe:
+                end = min(cursor + MAX_RANGE, safe)
+                applied += self._apply_range(pool, cursor + 1, end)
+                cursor = end
+            return applied
+
+    def _apply_range(self, pool, start, end):
+        base = {"fromBlock": hex(start), "toBlock": hex(end), "address": list(self.tokens)}
+        sent, received, end_block = pool.batch([
+            ("eth_getLogs", [{**base, "topics": [TRANSFER_TOPIC, _topic(self.wallet)]}]),
+            ("eth_getLogs", [{**base, "topics": [TRANSFER_TOPIC, None, _topic(self.wallet)]}]),
+            ("eth_getBlockByNumber", [hex(end), False]),
+        ])
+        for result in (sent, received, end_block):
+            if isinstance(result, Exception):
+                raise result
+
+        # A self-transfer matches both filters; keep one copy (it nets to zero)
+        logs = {(log["transactionHash"], log["logIndex"]): log for log in sent + received
+                if not log.get("removed") and len(log["topics"]) == 3}
+        logs = list(logs.values())
+        skip = recorded_fill_txs({log["transactionHash"] for log in logs})
+
+        deltas = {}
+        applied = 0
+        for log in logs:
+            if log["transactionHash"].lower() in skip:
+                continue
+            symbol, decimals = self.tokens[log["address"].lower()]
+            value = int(log["data"], 16) / 10 ** decimals
+            if _address(log["topics"][1]) == self.wallet:
+                deltas[symbol] = deltas.get(symbol, 0.0) - value
+            if _address(log["topics"][2]) == self.wallet:
+                deltas[symbol] = deltas.get(symbol, 0.0) + value
+            applied += 1
+
+        apply_balance_deltas(deltas, CURSOR_KEY, end)
+        self.last = (end, end_block["hash"])
+        if applied:
+            metrics.inc("wallet_transfers", applied)
+            print(f"📥 Wallet index: {applied} transfer(s) applied up to block {end}")
+        return applied
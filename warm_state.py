@@ -0,0 +1,90 @@
+import os
+import json
+import time
+import tempfile
+
+import chains
+import ohlcv
+import price_feed
+
+# Warm snapshot for fast restarts. The bot periodically saves what is
+# expensive to rebuild but cheap to trust: token decimals, recent candles,
+# the last indicator values, the last consensus prices and its own next
+# nonce. After a restart these are restored before the first cycle so only
+# deltas are fetched, and everything is reconciled with the chain in the
+# background.
+
+WARM_FILE = chains.data_path("warm_state.json")
+
+MAX_AGE = 6 * 3600      # older snapshots are ignored entirely
+
+
+def capture(client=None, indicators=None):
+    with price_feed._consensus._lock:
+        quotes = dict(price_feed._consensus._cache)
+    with ohlcv._candles_lock:
+        candles = {f"{symbol}|{tf}": rows for (symbol, tf), rows in ohlcv._candles.items()}
+
+    decimals = dict(price_feed._decimals)
+    nonce = None
+    if client is not None:
+        decimals.update(client.decimals)
+        nonce = client.nonce_hint
+
+    return {
+        "saved_at": time.time(),
+        "decimals": decimals,
+        "candles": candles,
+        "prices": {s: [q.price, q.ts] for s, q in quotes.items() if q.price > 0},
+        "indicators": dict(indicators or {}),
+        "nonce": nonce,
+    }
+
+
+def save(client=None, indicators=None, path=WARM_FILE):
+    """Atomic write (temp file + rename) so a crash never leaves half a snapshot."""
+    data = json.dumps(capture(client, indicators), separators=(",", ":"))
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".warm-")
+    with os.fdopen(fd, "w") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load(path=WARM_FILE):
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - snapshot.get("saved_at", 0) > MAX_AGE:
+        return None
+    return snapshot
+
+
+def restore(snapshot, client=None):
+    """
+    Seeds the in-process caches. Prices are only restored as reference
+    values (unconfident, already expired) so trading always waits for a
+    fresh consensus quote.
+    """
+    price_feed._decimals.update(snapshot.get("decimals", {}))
+
+    with ohlcv._candles_lock:
+        for key, rows in snapshot.get("candles", {}).items():
+            symbol, tf = key.split("|")
+            ohlcv._candles.setdefault((symbol, tf), rows)
+
+    with price_feed._consensus._lock:
+        for symbol, (price, ts) in snapshot.get("prices", {}).items():
+            quote = price_feed.Quote(symbol, price, False, {"warm": price})
+            quote.ts = ts
+            price_feed._consensus._cache.setdefault(symbol, quote)
+
+    if client is not None:
+        restore_client(snapshot, client)
+
+
+def restore_client(snapshot, client):
+    client.decimals.update(snapshot.get("decimals", {}))
+    if snapshot.get("nonce"):
+        client.nonce_hint = tuple(snapshot["nonce"])